@@ -0,0 +1 @@
+"""Shared building blocks for the LLM FAIR evaluation scripts."""
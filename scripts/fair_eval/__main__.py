@@ -0,0 +1,6 @@
+import sys
+
+from fair_eval.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import json
+import os
+import time
+
+from fair_eval.engine import DEFAULT_SCRAPE_CONCURRENCY, run_pipeline
+from fair_eval.llm_cache import prompt_key
+
+# ================================
+# Batch API Mode
+# ================================
+# For overnight re-scoring, every prompt is written to one JSONL request file
+# and submitted to the provider's asynchronous batch endpoint (lower cost,
+# separate quota). Results come back keyed by custom_id (the prompt's content
+# address) and are fed through the same build_result / score parsing as the
+# synchronous path. The batch id is saved next to the request file so an
+# interrupted run picks the job up again with --resume.
+
+BATCH_ENDPOINT = "/chat/completions"  # Azure; api.openai.com uses "/v1/chat/completions"
+DEFAULT_POLL_SECONDS = 60
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def request_line(custom_id, prompt, endpoint=BATCH_ENDPOINT):
+    return json.dumps(
+        {"custom_id": custom_id, "method": "POST", "url": endpoint, "body": prompt},
+        ensure_ascii=False,
+    )
+
+
+def parse_output_lines(text):
+    """
+    Map custom_id -> (response body, error) from a batch output/error file.
+    - body is the chat-completions response dict, None when the request failed
+    """
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get("response") or {}
+        error = entry.get("error")
+        if error is None and response.get("status_code", 200) != 200:
+            error = response.get("body", {}).get("error") or f"HTTP {response.get('status_code')}"
+        results[entry["custom_id"]] = (None if error else response.get("body"), error)
+    return results
+
+
+class BatchJob:
+    """
+    One batch submission: write, upload, create, poll, download.
+    - path: the JSONL request file; the batch id is kept in path + ".state.json"
+    """
+
+    def __init__(self, client, path, endpoint=BATCH_ENDPOINT, completion_window="24h",
+                 poll_seconds=DEFAULT_POLL_SECONDS):
+        self.client = client
+        self.path = path
+        self.state_path = path + ".state.json"
+        self.endpoint = endpoint
+        self.completion_window = completion_window
+        self.poll_seconds = poll_seconds
+
+    def submit(self, requests):
+        """Write (custom_id, prompt) pairs and create the batch; returns the batch id."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            for custom_id, prompt in requests:
+                f.write(request_line(custom_id, prompt, self.endpoint) + "\n")
+        with open(self.path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.endpoint,
+            completion_window=self.completion_window,
+        )
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump({"batch_id": batch.id, "requests": len(requests)}, f)
+        print(f"📦 Submitted batch {batch.id} with {len(requests)} requests")
+        return batch.id
+
+    def saved_batch_id(self):
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, encoding="utf-8") as f:
+            return json.load(f)["batch_id"]
+
+    def wait(self, batch_id):
+        """Poll until the batch reaches a terminal status."""
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            counts = getattr(batch, "request_counts", None)
+            progress = f" ({counts.completed + counts.failed}/{counts.total})" if counts else ""
+            print(f"⏳ Batch {batch_id}: {batch.status}{progress}")
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            time.sleep(self.poll_seconds)
+
+    def results(self, batch):
+        """custom_id -> (body, error) for every request the batch reported on."""
+        if batch.status == "failed":
+            raise RuntimeError(f"Batch {batch.id} failed: {getattr(batch, 'errors', None)}")
+        results = {}
+        # Expired / cancelled batches still return whatever finished
+        for file_id in (batch.error_file_id, batch.output_file_id):
+            if file_id:
+                results.update(parse_output_lines(self.client.files.content(file_id).text))
+        return results
+
+    def _collect(self, batch_id):
+        results = self.results(self.wait(batch_id))
+        os.remove(self.state_path)
+        return results
+
+    def run(self, requests, resume=False):
+        """
+        Submit requests and wait for their results.
+        - resume: first collect the batch saved by an interrupted run, then
+          submit only the requests it did not cover
+        """
+        results = {}
+        batch_id = self.saved_batch_id() if resume else None
+        if batch_id is not None:
+            print(f"⏩ Resuming batch {batch_id}")
+            results.update(self._collect(batch_id))
+            requests = [r for r in requests if r[0] not in results]
+        if requests:
+            results.update(self._collect(self.submit(requests)))
+        return results
+
+
+def run_batch(df, job, build_request, build_result,
+              fetch=None, parse=None, on_scrape_error=None, scrape=None,
+              completion_cache=None, checkpoint=None, on_result=None, variants=None, resume=False, meter=None,
+              scrape_concurrency=DEFAULT_SCRAPE_CONCURRENCY, parse_workers=None, dedup="off"):
+    """
+    Batch counterpart of run_pipeline.
+    - Scrapes the rows still missing from the checkpoint and builds their
+      requests with build_request(name, url, scraped[, variant])
+    - Requests already in completion_cache are not sent; meter (a UsageMeter)
+      records the token usage of each batch response
+    - Failed requests get an empty output row and are left out of the
+      checkpoint, so a --resume run submits them again
+    - on_result(row): as in run_pipeline, once each row is built
+    - dedup: as in run_pipeline; with "content", rows of one dataset with
+      identical pages share one request
+    """
+    variant_list = list(variants) if variants is not None else [None]
+    extra = (lambda variant: (variant,)) if variants is not None else (lambda variant: ())
+    keys = [
+        (name, url, variant)
+        for name, url in zip(df["Dataset Name"], df["Website Link"])
+        for variant in variant_list
+    ]
+    results = [
+        checkpoint.get(name, url, variant) if checkpoint is not None else None
+        for name, url, variant in keys
+    ]
+    if on_result is not None:
+        for result in results:
+            if result is not None:
+                on_result(result)
+    pending_rows = [
+        i for i in range(len(df))
+        if any(r is None for r in results[i * len(variant_list):(i + 1) * len(variant_list)])
+    ]
+
+    # Scrape + build requests for the rows still to do (no LLM calls here)
+    collected = run_pipeline(
+        df.iloc[pending_rows],
+        fetch=fetch, parse=parse, on_scrape_error=on_scrape_error, scrape=scrape,
+        evaluate=build_request,
+        build_result=lambda name, url, scraped, prompt, *variant: (scraped, prompt),
+        scrape_concurrency=scrape_concurrency,
+        llm_concurrency=1,
+        parse_workers=parse_workers,
+        variants=variants,
+        dedup=dedup,
+    )
+    slots = [i * len(variant_list) + j for i in pending_rows for j in range(len(variant_list))]
+    todo = [(slot, *item) for slot, item in zip(slots, collected) if results[slot] is None]
+
+    outputs = {}  # prompt key -> assistant content
+    requests = {}
+    for slot, scraped, prompt in todo:
+        key = prompt_key(prompt)
+        if key in outputs or key in requests:
+            continue
+        cached = completion_cache.get(prompt) if completion_cache is not None else None
+        if cached is not None:
+            outputs[key] = cached.choices[0].message.content
+        else:
+            requests[key] = prompt
+
+    errors = {}
+    batch_results = job.run(list(requests.items()), resume=resume)
+    for key, prompt in requests.items():
+        body, error = batch_results.get(key, (None, "missing from batch output"))
+        if body is None:
+            errors[key] = error
+            continue
+        if completion_cache is not None:
+            completion_cache.put(prompt, body)
+        if meter is not None:
+            meter.record(body.get("usage"))
+        outputs[key] = body["choices"][0]["message"]["content"]
+
+    failed = 0
+    for slot, scraped, prompt in todo:
+        name, url, variant = keys[slot]
+        key = prompt_key(prompt)
+        if key not in outputs:
+            failed += 1
+            print(f"⚠️ Batch request failed for {name}: {errors[key]}")
+            results[slot] = build_result(name, url, scraped, "", *extra(variant))
+        else:
+            results[slot] = build_result(name, url, scraped, outputs[key], *extra(variant))
+            if checkpoint is not None:
+                checkpoint.append(name, url, results[slot], variant)
+        if on_result is not None:
+            on_result(results[slot])
+
+    if failed:
+        print(f"⚠️ {failed} batch requests failed; rerun with --resume to retry them")
+    return results
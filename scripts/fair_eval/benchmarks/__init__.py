@@ -0,0 +1 @@
+"""Benchmarks for the FAIR evaluation pipeline (run with python -m fair_eval.benchmarks.<name>)."""
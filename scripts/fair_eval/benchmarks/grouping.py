@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+from fair_eval.strategies import get_strategy
+
+# ================================
+# Group Size Benchmark
+# ================================
+# Scores the same scraped pages once per group size K and compares each run
+# with single-dataset mode (K=1): requests, tokens and cost per dataset, wall
+# time, parse success, and how often the grouped scores agree with K=1.
+#   python -m fair_eval.benchmarks.grouping SelectData.csv -k 1,2,4,8 --mock
+# Without --mock the Azure credentials come from AZURE_OPENAI_API_KEY /
+# AZURE_OPENAI_ENDPOINT. The completion cache is not used, so every run pays.
+
+SCORES = ["F-Score", "A-Score", "I-Score", "R-Score"]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m fair_eval.benchmarks.grouping",
+        description="Compare cost and score agreement of multi-dataset requests against single-dataset mode.",
+    )
+    parser.add_argument("input_csv")
+    parser.add_argument("-s", "--strategy", default="few-shot-cot")
+    parser.add_argument("-d", "--deployment", default="gpt-4o")
+    parser.add_argument("-k", "--group-sizes", default="1,2,4,8", help="comma-separated K values; 1 is always run")
+    parser.add_argument("-n", "--limit", type=int, default=None, help="only the first N datasets")
+    parser.add_argument("--mock", action="store_true", help="score against a local mock LLM server")
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=int, default=60)
+    parser.add_argument("--tpm", type=int, default=80000)
+    parser.add_argument("--price-input", type=float, default=2.50, help="USD per 1M uncached input tokens")
+    parser.add_argument("--price-cached", type=float, default=1.25, help="USD per 1M cached input tokens")
+    parser.add_argument("--price-output", type=float, default=10.00, help="USD per 1M output tokens")
+    parser.add_argument("--http-cache", default="http_cache.sqlite")
+    parser.add_argument("-o", "--output", default=None, help="write the JSON report here instead of stdout")
+    return parser
+
+
+def agreement(baseline, rows):
+    """Exact-match rate of all four scores and mean absolute difference per score vs. baseline."""
+    pairs = [
+        (b, r) for b, r in zip(baseline, rows)
+        if all(b[k] is not None and r[k] is not None for k in SCORES)
+    ]
+    if not pairs:
+        return {"compared": 0, "exact_match": None, "mean_abs_diff": None}
+    return {
+        "compared": len(pairs),
+        "exact_match": sum(all(b[k] == r[k] for k in SCORES) for b, r in pairs) / len(pairs),
+        "mean_abs_diff": {k: sum(abs(b[k] - r[k]) for b, r in pairs) / len(pairs) for k in SCORES},
+    }
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    group_sizes = sorted({1} | {int(k) for k in args.group_sizes.split(",") if k.strip()})
+
+    import openai
+    import pandas as pd
+
+    from fair_eval.engine import run_pipeline
+    from fair_eval.http_cache import HttpCache
+    from fair_eval.http_client import PooledClient
+    from fair_eval.ratelimit import create_completion, get_rate_limiter
+    from fair_eval.scraper import Scraper
+    from fair_eval.tokens import UsageMeter
+
+    server = None
+    if args.mock:
+        from fair_eval.mock_server import MockLLMServer
+        server = MockLLMServer().start()
+        client = openai.AzureOpenAI(azure_endpoint=server.url, api_key="mock", api_version="2024-02-01")
+    else:
+        client = openai.AzureOpenAI(
+            api_key=os.environ["AZURE_OPENAI_API_KEY"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            api_version=os.environ.get("AZURE_API_VERSION", "2024-02-01")
+        )
+
+    strategy = get_strategy(args.strategy)
+    limiter = get_rate_limiter(args.deployment, rpm=args.rpm, tpm=args.tpm)
+    df = pd.read_csv(args.input_csv)
+    if args.limit:
+        df = df.head(args.limit)
+
+    # Scrape once; every K scores the same pages
+    scraper = Scraper(HttpCache(args.http_cache), PooledClient())
+    pages = {}
+    run_pipeline(
+        df, **scraper.stages(), parse_workers=0,
+        evaluate=lambda name, url, scraped: None,
+        build_result=lambda name, url, scraped, output: pages.setdefault(url, scraped),
+    )
+
+    runs = []
+    baseline = None
+    for k in group_sizes:
+        meter = UsageMeter()
+        singles = [0]
+        lock = threading.Lock()
+
+        def evaluate(name, url, scraped):
+            with lock:
+                singles[0] += 1
+            prompt = strategy.request(args.deployment, name, url, scraped)
+            return strategy.answer(
+                prompt, name,
+                lambda p: create_completion(client, p, limiter, meter=meter).choices[0].message.content,
+            )
+
+        def evaluate_group(items):
+            prompt = strategy.group_request(args.deployment, items)
+            response = create_completion(client, prompt, limiter, meter=meter)
+            return strategy.split_group_answer(response.choices[0].message.content, [item[0] for item in items])
+
+        start = time.perf_counter()
+        rows = run_pipeline(
+            df,
+            scrape=pages.__getitem__,
+            evaluate=evaluate,
+            evaluate_group=evaluate_group,
+            group_size=k,
+            build_result=lambda name, url, scraped, output: strategy.long_row(
+                args.deployment, name, url, scraped, output),
+            llm_concurrency=args.llm_concurrency,
+        )
+        wall = time.perf_counter() - start
+        if baseline is None:
+            baseline = rows
+
+        usage = meter.stats()
+        cost = (
+            usage["uncached_prompt_tokens"] * args.price_input
+            + usage["cached_prompt_tokens"] * args.price_cached
+            + usage["completion_tokens"] * args.price_output
+        ) / 1e6
+        runs.append({
+            "group_size": k,
+            "datasets": len(rows),
+            "requests": usage["requests"],
+            "single_retries": singles[0] if k > 1 else 0,
+            "wall_seconds": round(wall, 3),
+            "prompt_tokens_per_dataset": usage["prompt_tokens"] / len(rows),
+            "completion_tokens_per_dataset": usage["completion_tokens"] / len(rows),
+            "cost_per_dataset_usd": cost / len(rows),
+            "parse_success": sum(bool(r["Parse Success"]) for r in rows) / len(rows),
+            "agreement_with_k1": agreement(baseline, rows),
+            "usage": usage,
+        })
+        print(f"📊 K={k}: {usage['requests']} requests, "
+              f"{runs[-1]['prompt_tokens_per_dataset']:.0f} prompt tokens/dataset, "
+              f"${runs[-1]['cost_per_dataset_usd']:.5f}/dataset, "
+              f"agreement {runs[-1]['agreement_with_k1']['exact_match']}")
+
+    if server is not None:
+        server.stop()
+
+    report = {
+        "benchmark": "grouping",
+        "strategy": strategy.name,
+        "deployment": args.deployment,
+        "mock": args.mock,
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print("✅ Report saved to:", args.output)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
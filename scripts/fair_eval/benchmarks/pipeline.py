@@ -0,0 +1,377 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from fair_eval.parsing import extract_scores
+from fair_eval.strategies import STRATEGIES, get_strategy
+
+# ================================
+# Pipeline Throughput Benchmark
+# ================================
+# Times each stage on its own, then the whole pipeline, all offline:
+#   scrape       Scraper.scrape_website against a corpus of saved pages served
+#                by mock_server.PageStub (fetch + parse per row, no cache hits)
+#   parse:*      parse_html on the same pages, streaming and BeautifulSoup
+#   prompt:*     Strategy.request for every strategy
+#   extract:*    extract_scores over synthetic CoT answers of growing length
+#   pipeline     run_pipeline against the mock LLM server and page stub
+# Each stage reports latency percentiles, rows per second and how far it raised
+# the process's peak RSS (ru_maxrss only grows, so a stage that stays below an
+# earlier stage's peak shows 0); the report's peak_rss_mb is the process-wide
+# peak. The JSON report can be compared with an earlier one to catch regressions:
+#   python -m fair_eval.benchmarks.pipeline --pages http_cache.sqlite -o bench.json
+#   python -m fair_eval.benchmarks.pipeline --compare bench.json
+# Without --pages / --html-dir a synthetic corpus is generated.
+
+DEFAULT_ROWS = 200
+DEFAULT_COT_WORDS = "0,200,1000,5000"
+DEFAULT_THRESHOLD = 0.2
+CORPUS_HOST = "https://corpus.invalid"
+
+PARAGRAPH = (
+    "This dataset provides monitoring results for unregulated contaminants in public water systems. "
+    "Data are available for download as CSV and XLSX files under the Creative Commons CC-BY 4.0 license. "
+    "Each record carries a persistent identifier (doi:10.5066/F7P55KJN) and follows the EPA data standard. "
+)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m fair_eval.benchmarks.pipeline",
+        description="Per-stage latency, throughput and memory of scraping, prompt building and score parsing.",
+    )
+    parser.add_argument("--pages", default=None, help="corpus: the pages of an http_cache.sqlite")
+    parser.add_argument("--html-dir", default=None, help="corpus: a directory of saved *.html pages")
+    parser.add_argument("-n", "--rows", type=int, default=DEFAULT_ROWS,
+                        help="rows per stage; the corpus is cycled to reach it (default: %(default)s)")
+    parser.add_argument("-d", "--deployment", default="gpt-4o")
+    parser.add_argument("--cot-words", default=DEFAULT_COT_WORDS,
+                        help="reasoning lengths (words) of the synthetic answers (default: %(default)s)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="mock LLM seconds per call")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--parse-workers", type=int, default=0, help="parse processes in the pipeline stage")
+    parser.add_argument("--skip", default="", help="comma-separated stages to skip (scrape,parse,prompt,extract,pipeline)")
+    parser.add_argument("--label", default=None, help="version label stored in the report (default: git describe)")
+    parser.add_argument("-o", "--output", default=None, help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", default=None, metavar="REPORT",
+                        help="earlier report to compare against; exits 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown counted as a regression (default: %(default)s)")
+    return parser
+
+
+# ---------- Measurement ----------
+def peak_rss_mb():
+    """Peak resident set size of this process so far (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentiles(latencies):
+    """count / mean / p50 / p90 / p99 / max in milliseconds (nearest rank)."""
+    if not latencies:
+        return {"count": 0}
+    ordered = sorted(latencies)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(rank(50), 3),
+        "p90_ms": round(rank(90), 3),
+        "p99_ms": round(rank(99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def time_each(fn, items):
+    """Results of fn(item) for every item, per-call latencies and total wall seconds."""
+    results, latencies = [], []
+    start = time.perf_counter()
+    for item in items:
+        t = time.perf_counter()
+        results.append(fn(item))
+        latencies.append(time.perf_counter() - t)
+    return results, latencies, time.perf_counter() - start
+
+
+def _growth(before, after):
+    return None if before is None or after is None else round(after - before, 1)
+
+
+def stage_report(name, latencies, wall, rows, rss_before, **extra):
+    """Stage entry; rss_before is peak_rss_mb() taken just before the stage ran."""
+    report = {
+        "stage": name,
+        "rows": rows,
+        "wall_seconds": round(wall, 4),
+        "rows_per_second": round(rows / wall, 2) if wall else None,
+        "latency": percentiles(latencies),
+        "peak_rss_growth_mb": _growth(rss_before, peak_rss_mb()),
+    }
+    report.update(extra)
+    latency = report["latency"]
+    print(f"⏱️ {name}: {report['rows_per_second']} rows/s, p50 {latency.get('p50_ms')} ms, "
+          f"p99 {latency.get('p99_ms')} ms, peak RSS +{report['peak_rss_growth_mb']} MB")
+    return report
+
+
+# ---------- Inputs ----------
+def synthetic_page(i):
+    """A catalog-like landing page; every fifth one is large (a long table of files)."""
+    links = "".join(f'<li><a href="/files/part-{k}.csv">part {k} (CSV)</a></li>' for k in range(5 + i % 7))
+    rows = 400 if i % 5 == 0 else 10
+    table = "".join(f"<tr><td>site {k}</td><td>{k * 0.1:.1f} ug/L</td></tr>" for k in range(rows))
+    return (
+        f"<html><head><title>Dataset {i}</title>"
+        f'<meta name="description" content="Synthetic benchmark dataset {i}"></head>'
+        f"<body><h1>Dataset {i}</h1><p>{PARAGRAPH * (1 + i % 4)}</p>"
+        f"<ul>{links}</ul><table>{table}</table></body></html>"
+    )
+
+
+def load_corpus(pages=None, html_dir=None, size=25):
+    """url -> html from an http_cache.sqlite, a directory of saved pages, or synthetic pages."""
+    if pages:
+        from fair_eval.mock_server import load_pages
+        return {url: page["body"] for url, page in load_pages(pages).items()}
+    if html_dir:
+        corpus = {}
+        for path in sorted(glob.glob(os.path.join(html_dir, "*.htm*"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                corpus[f"{CORPUS_HOST}/{os.path.basename(path)}"] = f.read()
+        return corpus
+    return {f"{CORPUS_HOST}/dataset-{i}.html": synthetic_page(i) for i in range(size)}
+
+
+def synthetic_cot_output(dataset_name, words, seed=0):
+    """Chain-of-thought style answer: `words` words of reasoning, then the score table."""
+    scores = [(seed + k) % (top + 1) for k, top in enumerate((17, 10, 8, 7))]
+    reasoning = []
+    vocabulary = PARAGRAPH.split()
+    for k in range(words):
+        reasoning.append(vocabulary[(seed + k) % len(vocabulary)])
+        if k % 60 == 59:
+            reasoning.append(f"\n\n**Step {k // 60 + 1}:** F-Score so far ({scores[0]}/17).\n")
+    return (
+        " ".join(reasoning)
+        + "\n\n| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |\n"
+        + "|---|---|---|---|---|\n"
+        + f"| {dataset_name} | F-Score ({scores[0]}/17) | A-Score ({scores[1]}/10) "
+        + f"| I-Score ({scores[2]}/8) | R-Score ({scores[3]}/7) |"
+    )
+
+
+def _cycle(items, rows):
+    return [items[i % len(items)] for i in range(rows)]
+
+
+# ---------- Stages ----------
+def bench_scrape(urls, stub):
+    from fair_eval.http_cache import HttpCache
+    from fair_eval.http_client import PooledClient
+    from fair_eval.scraper import Scraper
+
+    # TTL 0 and no validators: every row is a full fetch + parse
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(os.path.join(tmp, "pages.sqlite"), ttl_seconds=0)
+        client = PooledClient(politeness_delay=0, rewrite=stub.rewrite)
+        scraper = Scraper(cache, client)
+        try:
+            rss_before = peak_rss_mb()
+            scraped, latencies, wall = time_each(scraper.scrape_website, urls)
+        finally:
+            client.close()
+            cache.close()
+    errors = sum(s["title"] == "Error scraping website" for s in scraped)
+    return stage_report("scrape", latencies, wall, len(urls), rss_before, errors=errors), scraped
+
+
+def bench_parse(pages):
+    from fair_eval.scraper import parse_html
+
+    size = sum(len(html) for html in pages)
+    reports = []
+    for name, streaming in (("parse:streaming", True), ("parse:bs4", False)):
+        rss_before = peak_rss_mb()
+        _, latencies, wall = time_each(lambda html: parse_html(html, streaming=streaming), pages)
+        reports.append(stage_report(name, latencies, wall, len(pages), rss_before,
+                                    mb_per_second=round(size / wall / 1e6, 2) if wall else None))
+    return reports
+
+
+def bench_prompts(scraped, model):
+    reports = []
+    items = [(f"Dataset {i}", f"{CORPUS_HOST}/dataset-{i}.html", s) for i, s in enumerate(scraped)]
+    for strategy in STRATEGIES.values():
+        rss_before = peak_rss_mb()
+        _, latencies, wall = time_each(lambda item: strategy.request(model, *item), items)
+        reports.append(stage_report(f"prompt:{strategy.name}", latencies, wall, len(items), rss_before))
+    return reports
+
+
+def bench_extract(rows, word_counts):
+    reports = []
+    for words in word_counts:
+        outputs = [synthetic_cot_output(f"Dataset {i}", words, seed=i) for i in range(rows)]
+        rss_before = peak_rss_mb()
+        parsed, latencies, wall = time_each(extract_scores, outputs)
+        failures = sum(not p["Parse Success"] for p in parsed)
+        reports.append(stage_report(f"extract:{words}w", latencies, wall, rows, rss_before,
+                                    answer_chars=round(sum(map(len, outputs)) / rows), parse_failures=failures))
+    return reports
+
+
+def bench_pipeline(urls, stub, args):
+    import openai
+    import pandas as pd
+
+    from fair_eval.engine import run_pipeline
+    from fair_eval.http_cache import HttpCache
+    from fair_eval.http_client import PooledClient
+    from fair_eval.mock_server import MockLLMServer
+    from fair_eval.ratelimit import create_completion, get_rate_limiter
+    from fair_eval.scraper import Scraper
+
+    strategy = get_strategy("few-shot-cot")
+    df = pd.DataFrame({"Dataset Name": [f"Dataset {i}" for i in range(len(urls))], "Website Link": urls})
+    limiter = get_rate_limiter("benchmark-mock", rpm=10 ** 6, tpm=10 ** 9)
+    llm_latencies = []
+
+    with MockLLMServer(latency=args.llm_latency) as server, tempfile.TemporaryDirectory() as tmp:
+        client = openai.AzureOpenAI(azure_endpoint=server.url, api_key="mock", api_version="2024-02-01")
+        http_cache = HttpCache(os.path.join(tmp, "pages.sqlite"), ttl_seconds=0)
+        http_client = PooledClient(politeness_delay=0, rewrite=stub.rewrite)
+        scraper = Scraper(http_cache, http_client)
+
+        def evaluate(name, url, scraped):
+            t = time.perf_counter()
+            response = create_completion(client, strategy.request(args.deployment, name, url, scraped), limiter)
+            llm_latencies.append(time.perf_counter() - t)
+            return response.choices[0].message.content
+
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        rows = run_pipeline(
+            df, **scraper.stages(), evaluate=evaluate,
+            build_result=lambda name, url, scraped, output: strategy.long_row(
+                args.deployment, name, url, scraped, output),
+            llm_concurrency=args.llm_concurrency, parse_workers=args.parse_workers,
+        )
+        wall = time.perf_counter() - start
+        http_client.close()
+        http_cache.close()
+    parsed = sum(bool(r["Parse Success"]) for r in rows)
+    return stage_report("pipeline", llm_latencies, wall, len(rows), rss_before, latency_of="llm call",
+                        llm_latency_seconds=args.llm_latency, llm_concurrency=args.llm_concurrency,
+                        parse_success=parsed / len(rows) if rows else None)
+
+
+# ---------- Report ----------
+def version_label():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Stage-by-stage comparison with an earlier report.
+    - A regression is rows/s down or p50 up by more than threshold
+    """
+    before = {s["stage"]: s for s in baseline["stages"]}
+    changes = []
+    for stage in report["stages"]:
+        old = before.get(stage["stage"])
+        if old is None or not old.get("rows_per_second") or not old["latency"].get("p50_ms"):
+            continue
+        speed = stage["rows_per_second"] / old["rows_per_second"]
+        p50 = stage["latency"]["p50_ms"] / old["latency"]["p50_ms"] if old["latency"]["p50_ms"] else None
+        regressed = speed < 1 - threshold or (p50 is not None and p50 > 1 + threshold)
+        changes.append({"stage": stage["stage"], "rows_per_second_ratio": round(speed, 3),
+                        "p50_ratio": round(p50, 3) if p50 is not None else None, "regressed": regressed})
+        print(f"{'🔻' if regressed else '✅'} {stage['stage']}: rows/s x{speed:.2f}"
+              + (f", p50 x{p50:.2f}" if p50 is not None else ""))
+    return changes
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    skip = {s.strip() for s in args.skip.split(",") if s.strip()}
+    word_counts = [int(w) for w in args.cot_words.split(",") if w.strip()]
+
+    from fair_eval.mock_server import PageStub
+
+    corpus = load_corpus(args.pages, args.html_dir)
+    if not corpus:
+        raise SystemExit("The page corpus is empty.")
+    urls = _cycle(list(corpus), args.rows)
+    print(f"📚 Corpus: {len(corpus)} pages, {sum(map(len, corpus.values())) / 1e6:.1f} MB; {args.rows} rows per stage")
+
+    stages = []
+    scraped = None
+    with PageStub({url: {"body": html, "etag": None, "last_modified": None} for url, html in corpus.items()}) as stub:
+        if "scrape" not in skip:
+            report, scraped = bench_scrape(urls, stub)
+            stages.append(report)
+        if "parse" not in skip:
+            stages.extend(bench_parse([corpus[url] for url in urls]))
+        if "prompt" not in skip:
+            if scraped is None:
+                from fair_eval.scraper import parse_html
+                scraped = [parse_html(corpus[url]) for url in urls]
+            stages.extend(bench_prompts(scraped, args.deployment))
+        if "extract" not in skip:
+            stages.extend(bench_extract(args.rows, word_counts))
+        if "pipeline" not in skip:
+            stages.append(bench_pipeline(urls, stub, args))
+
+    report = {
+        "benchmark": "pipeline",
+        "version": args.label or version_label(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus_pages": len(corpus),
+        "rows": args.rows,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+    }
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f), args.threshold)
+        status = 1 if any(c["regressed"] for c in report["comparison"]) else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print("✅ Report saved to:", args.output)
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+
+from fair_eval.telemetry import telemetry
+
+# ================================
+# Checkpoint Log
+# ================================
+# Every finished row is appended to a JSONL log as soon as it is scored, keyed
+# by (dataset name, website link, strategy, model). A crashed or interrupted
+# run restarted with --resume skips the keys already in the log, and the final
+# CSV is compacted from the log (latest entry per key). A fresh run (no
+# --resume) never truncates an earlier log: it is moved aside to a backup.
+
+
+def row_key(dataset_name, website_link, strategy, model):
+    return json.dumps([str(dataset_name), str(website_link), strategy, model])
+
+
+def side_path(output, suffix):
+    """
+    Path of a side file (checkpoint log, batch state) next to the output:
+    output with its extension replaced by suffix, e.g. results.checkpoint.jsonl
+    - Raises ValueError if that would be the output itself
+    """
+    path = os.path.splitext(output)[0] + suffix
+    if os.path.abspath(path) == os.path.abspath(output):
+        raise ValueError(f"{suffix} side file would overwrite the output {output}")
+    return path
+
+
+def backup_path(path):
+    """First unused path.1.bak, path.2.bak, ... for moving an old log aside."""
+    n = 1
+    while os.path.exists(f"{path}.{n}.bak"):
+        n += 1
+    return f"{path}.{n}.bak"
+
+
+class CheckpointLog:
+    """
+    Append-only JSONL log of result rows.
+    - strategy / model: defaults for single-strategy scripts; fanned-out runs
+      pass the (strategy, model) variant per row instead
+    - Without resume, a non-empty log from an earlier run is renamed to a
+      backup (see backup_path) instead of being overwritten
+    """
+
+    def __init__(self, path, strategy=None, model=None, resume=False):
+        self.path = path
+        self.strategy = strategy
+        self.model = model
+        self.entries = {}
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self._load()
+        elif not resume and os.path.exists(path) and os.path.getsize(path) > 0:
+            backup = backup_path(path)
+            os.replace(path, backup)
+            print(f"🗄️ Existing checkpoint log moved to {backup} (pass --resume to continue it)")
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash
+                self.entries[entry["key"]] = entry["result"]
+
+    def key(self, dataset_name, website_link, variant=None):
+        strategy, model = variant or (self.strategy, self.model)
+        return row_key(dataset_name, website_link, strategy, model)
+
+    def get(self, dataset_name, website_link, variant=None):
+        """Stored result row, or None if this dataset still has to run."""
+        return self.entries.get(self.key(dataset_name, website_link, variant))
+
+    def append(self, dataset_name, website_link, result, variant=None):
+        key = self.key(dataset_name, website_link, variant)
+        line = json.dumps({"key": key, "result": result}, ensure_ascii=False, default=str)
+        with telemetry.span("write", target="checkpoint"), self._lock:
+            self.entries[key] = result
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def compact(self):
+        """Rewrite the log with one line per key."""
+        with self._lock:
+            self._file.close()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, result in self.entries.items():
+                    f.write(json.dumps({"key": key, "result": result}, ensure_ascii=False, default=str) + "\n")
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,279 @@
+import argparse
+import json
+import os
+
+from fair_eval.batch import BATCH_ENDPOINT, DEFAULT_POLL_SECONDS, BatchJob, run_batch
+from fair_eval.checkpoint import CheckpointLog, side_path
+from fair_eval.consistency import AGGREGATES, DEFAULT_TOLERANCE, SelfConsistency
+from fair_eval.dedup import DEDUP_MODES, DEFAULT_DEDUP
+from fair_eval.engine import DEFAULT_LLM_CONCURRENCY, DEFAULT_SCRAPE_CONCURRENCY, run_pipeline
+from fair_eval.snippet import SNIPPET_TOKENS
+from fair_eval.strategies import DEFAULT_LAYOUT, LAYOUTS, PROVIDER_CACHE_MIN_TOKENS, STRATEGIES, get_strategy
+from fair_eval.tokens import UsageMeter
+
+# ================================
+# Unified CLI
+# ================================
+# One run scrapes and parses each page once, then fans it out to every
+# selected (strategy, deployment) pair and writes a single long-format table
+# with Strategy and Model columns:
+#   python -m fair_eval SelectData.csv -s all -d gpt-4o,gpt-4o-mini
+# Azure credentials come from AZURE_OPENAI_API_KEY / AZURE_OPENAI_ENDPOINT
+# (and optionally AZURE_API_VERSION).
+
+DEFAULT_API_VERSION = "2024-02-01"
+
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m fair_eval",
+        description="Scrape each dataset page once and score it with several prompting strategies and models.",
+    )
+    parser.add_argument("input_csv", help="CSV with 'Dataset Name' and 'Website Link' columns")
+    parser.add_argument("-o", "--output", default="fair_scores_long.csv",
+                        help="long-format output CSV (default: %(default)s)")
+    parser.add_argument("-s", "--strategies", default="all",
+                        help=f"comma-separated strategies or 'all' ({', '.join(STRATEGIES)})")
+    parser.add_argument("-d", "--deployments", default="gpt-4o",
+                        help="comma-separated Azure deployment names (default: %(default)s)")
+    parser.add_argument("--routes", metavar="JSON", default=None,
+                        help="JSON list of deployments per model ({model, deployment, endpoint, api_key_env, "
+                             "rpm, tpm, price}); calls are spread over them with failover on 429/5xx")
+    parser.add_argument("--easy-model", default=None,
+                        help="cheaper model that short pages with a detected license try first, "
+                             "escalating to the -d model on unparseable or invalid scores")
+    parser.add_argument("--parquet", metavar="DIR", default=None,
+                        help="also append the results to a partitioned Parquet dataset in DIR (needs pyarrow)")
+    parser.add_argument("--resume", action="store_true", help="skip results already in the checkpoint log")
+    parser.add_argument("--batch", action="store_true",
+                        help="submit all prompts as one Batch API job instead of per-row calls")
+    parser.add_argument("--batch-endpoint", default=BATCH_ENDPOINT,
+                        help="batch request url (default: %(default)s; api.openai.com uses /v1/chat/completions)")
+    parser.add_argument("--batch-poll-seconds", type=float, default=DEFAULT_POLL_SECONDS)
+    parser.add_argument("--scrape-concurrency", type=int, default=DEFAULT_SCRAPE_CONCURRENCY)
+    parser.add_argument("--llm-concurrency", type=int, default=None,
+                        help=f"parallel LLM calls (default: {DEFAULT_LLM_CONCURRENCY} per deployment of a model)")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default=DEFAULT_DEDUP,
+                        help="'url': fetch each canonical URL once; 'content': also score identical pages of one dataset once "
+                             "and share the answer (default: %(default)s)")
+    parser.add_argument("--group-size", type=int, default=1,
+                        help="datasets per LLM call; >1 packs several behind one rubric/examples prefix")
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="parse processes; default auto (large runs), 0 = in-process")
+    parser.add_argument("--rpm", type=int, default=60, help="requests/minute quota per deployment (without --routes)")
+    parser.add_argument("--tpm", type=int, default=80000, help="tokens/minute quota per deployment (without --routes)")
+    parser.add_argument("--llm-cache", default="llm_cache.sqlite", help="completion cache path")
+    parser.add_argument("--llm-cache-max-mb", type=int, default=512)
+    parser.add_argument("--http-cache", default="http_cache.sqlite", help="page cache path")
+    parser.add_argument("--http-cache-ttl-hours", type=float, default=24)
+    parser.add_argument("--http-max-per-host", type=int, default=4)
+    parser.add_argument("--http-politeness-delay", type=float, default=0.5)
+    parser.add_argument("--metrics", default=None, metavar="PATH",
+                        help="write stage timings and counters here (*.json, else Prometheus text)")
+    parser.add_argument("--trace", default=None, metavar="PATH", help="write per-stage spans here as JSON lines")
+    parser.add_argument("--otel", action="store_true",
+                        help="also emit spans through opentelemetry (needs the opentelemetry SDK configured)")
+    parser.add_argument("--page-stub", default=None, metavar="URL",
+                        help="scrape recorded pages from a mock_server page stub instead of the live sites")
+    parser.add_argument("--prompt-layout", choices=LAYOUTS, default=DEFAULT_LAYOUT,
+                        help="'inline' (default): one user message; 'prefix' puts the static rubric/examples "
+                             "first for provider prompt caching (pays off once they reach 1024 tokens)")
+    parser.add_argument("--structured-output", action="store_true",
+                        help="request JSON score objects via response_format (api-version 2024-08-01-preview+)")
+    parser.add_argument("--samples", type=int, default=1,
+                        help="self-consistency: up to this many samples per dataset (default: %(default)s = off)")
+    parser.add_argument("--sample-tolerance", type=int, default=DEFAULT_TOLERANCE,
+                        help="stop sampling once every score agrees within this many points")
+    parser.add_argument("--sample-aggregate", choices=AGGREGATES, default="median")
+    parser.add_argument("--no-n", action="store_true",
+                        help="one call per sample, for endpoints that do not support n > 1")
+    parser.add_argument("--snippet-tokens", type=int, default=SNIPPET_TOKENS,
+                        help="token budget for the page-text snippet; 0 = first 2000 characters")
+    parser.add_argument("--no-streaming-extract", action="store_true",
+                        help="parse pages with the BeautifulSoup tree instead of the streaming extractor")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    strategy_names = list(STRATEGIES) if args.strategies == "all" else _split(args.strategies)
+    try:
+        strategies = [get_strategy(name) for name in strategy_names]
+    except ValueError as e:
+        parser.error(str(e))
+    deployments = _split(args.deployments)
+    if not strategies or not deployments:
+        parser.error("need at least one strategy and one deployment")
+    if args.samples > 1 and (args.group_size > 1 or args.batch):
+        parser.error("--samples cannot be combined with --group-size or --batch")
+    try:
+        checkpoint_path = side_path(args.output, ".checkpoint.jsonl")
+        batch_path = side_path(args.output, ".batch.jsonl")
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Heavy imports only once the arguments are known to be good
+    import openai
+    import pandas as pd
+
+    from fair_eval.http_cache import HttpCache
+    from fair_eval.http_client import PooledClient, page_stub_rewrite
+    from fair_eval.llm_cache import CompletionCache
+    from fair_eval.router import build_router
+    from fair_eval.scraper import Scraper
+    from fair_eval.telemetry import telemetry
+
+    api_version = os.environ.get("AZURE_API_VERSION", DEFAULT_API_VERSION)
+    try:
+        client = openai.AzureOpenAI(
+            api_key=os.environ["AZURE_OPENAI_API_KEY"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            api_version=api_version
+        )
+    except KeyError as e:
+        raise SystemExit(f"Set {e.args[0]} in the environment.") from None
+
+    telemetry.configure(trace=bool(args.trace), otel=args.otel)
+    if args.routes:
+        with open(args.routes, encoding="utf-8") as f:
+            routes = json.load(f)
+    else:
+        routes = [{"model": d, "rpm": args.rpm, "tpm": args.tpm} for d in deployments]
+    try:
+        router = build_router(routes, client, api_version, easy_model=args.easy_model)
+    except (KeyError, ValueError) as e:
+        parser.error(f"bad deployment routes: {e}")
+    missing = [d for d in deployments if d not in router.pools]
+    if missing:
+        parser.error(f"no route for {', '.join(missing)}; add it to --routes")
+    llm_concurrency = args.llm_concurrency or DEFAULT_LLM_CONCURRENCY * router.width
+    completion_cache = CompletionCache(args.llm_cache, max_bytes=args.llm_cache_max_mb * 1024 * 1024)
+    http_cache = HttpCache(args.http_cache, ttl_seconds=args.http_cache_ttl_hours * 3600)
+    http_client = PooledClient(max_per_host=args.http_max_per_host, politeness_delay=args.http_politeness_delay,
+                               rewrite=page_stub_rewrite(args.page_stub) if args.page_stub else None)
+    scraper = Scraper(http_cache, http_client, streaming=not args.no_streaming_extract,
+                      snippet_tokens=args.snippet_tokens or None, model=deployments[0])
+    usage_meter = UsageMeter()
+    sampler = SelfConsistency(args.samples, tolerance=args.sample_tolerance,
+                              aggregate=args.sample_aggregate, n_supported=not args.no_n)
+
+    def build_request(dataset_name, website_link, scraped, variant):
+        strategy_name, model = variant
+        return get_strategy(strategy_name).request(model, dataset_name, website_link, scraped,
+                                                   layout=args.prompt_layout, structured=args.structured_output)
+
+    def respond(prompt):
+        return completion_cache.get_or_create(
+            prompt, lambda: router.create(prompt, meter=usage_meter)
+        )
+
+    def complete(prompt):
+        return respond(prompt).choices[0].message.content
+
+    def evaluate(dataset_name, website_link, scraped, variant):
+        strategy_name, model = variant
+
+        def attempt(routed_model):
+            prompt = build_request(dataset_name, website_link, scraped, (strategy_name, routed_model))
+            if sampler.enabled:
+                return sampler.answer(prompt, dataset_name, respond)
+            return get_strategy(strategy_name).answer(prompt, dataset_name, complete)
+
+        return router.cascade(model, scraped, attempt)
+
+    def evaluate_group(items, variant):
+        strategy_name, model = variant
+        strategy = get_strategy(strategy_name)
+        prompt = strategy.group_request(model, items, structured=args.structured_output)
+        return strategy.split_group_answer(complete(prompt), [item[0] for item in items])
+
+    def build_result(dataset_name, website_link, scraped, fair_output, variant):
+        strategy_name, model = variant
+        return get_strategy(strategy_name).long_row(model, dataset_name, website_link, scraped, fair_output)
+
+    variants = [(s.name, d) for s in strategies for d in deployments]
+    df = pd.read_csv(args.input_csv)
+    checkpoint = CheckpointLog(checkpoint_path, resume=args.resume)
+    print(f"📋 {len(df)} datasets x {len(variants)} strategy/model pairs")
+    if args.prompt_layout == "prefix":
+        for strategy in strategies:
+            tokens = strategy.prefix_tokens(deployments[0])
+            note = "" if tokens >= PROVIDER_CACHE_MIN_TOKENS else f" (< {PROVIDER_CACHE_MIN_TOKENS}, not cacheable)"
+            print(f"📐 {strategy.name}: static prefix {tokens} tokens{note}")
+
+    parquet_sink = None
+    if args.parquet:
+        from fair_eval.columnar import ParquetDatasetWriter
+
+        # Rows stream into the Parquet dataset as they are finished
+        parquet_sink = ParquetDatasetWriter(args.parquet)
+    on_result = parquet_sink.write if parquet_sink else None
+
+    try:
+        if args.batch:
+            batch_job = BatchJob(client, batch_path,
+                                 endpoint=args.batch_endpoint, poll_seconds=args.batch_poll_seconds)
+            results = run_batch(
+                df,
+                batch_job,
+                build_request=build_request,
+                build_result=build_result,
+                **scraper.stages(),
+                completion_cache=completion_cache,
+                checkpoint=checkpoint,
+                on_result=on_result,
+                variants=variants,
+                resume=args.resume,
+                meter=usage_meter,
+                scrape_concurrency=args.scrape_concurrency,
+                parse_workers=args.parse_workers,
+                dedup=args.dedup,
+            )
+        else:
+            results = run_pipeline(
+                df,
+                **scraper.stages(),
+                evaluate=evaluate,
+                build_result=build_result,
+                scrape_concurrency=args.scrape_concurrency,
+                llm_concurrency=llm_concurrency,
+                parse_workers=args.parse_workers,
+                checkpoint=checkpoint,
+                on_result=on_result,
+                variants=variants,
+                group_size=args.group_size,
+                evaluate_group=evaluate_group,
+                dedup=args.dedup,
+            )
+    finally:
+        # Close the Parquet writers after a crash too, so the rows so far stay readable
+        if parquet_sink is not None:
+            parquet_sink.close()
+
+    with telemetry.span("write", target="results"):
+        results_df = pd.DataFrame(results)
+        results_df.to_csv(args.output, index=False)
+    checkpoint.compact()
+
+    print("\n✅ All done! Output saved to:", args.output)
+    from fair_eval.summary import summarize
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print("📊 Per strategy / model:\n", summarize(results_df)[
+            ["Strategy", "Model", "rows", "valid_rate", "FAIR % mean", "FAIR % std"]])
+    print("🧮 Prompt tokens:", usage_meter.stats())
+    print("💾 Completion cache:", completion_cache.stats())
+    print("💾 HTTP cache:", http_cache.stats())
+    print("🔌 HTTP connections:", http_client.stats())
+    print("🔀 Router:", router.stats())
+    telemetry.report()
+    if args.metrics:
+        telemetry.write_metrics(args.metrics)
+    if args.trace:
+        telemetry.write_trace(args.trace)
+    return 0
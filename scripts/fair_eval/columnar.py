@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+import urllib.parse
+
+from fair_eval.telemetry import telemetry
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+# ================================
+# Partitioned Parquet Output
+# ================================
+# Result rows can also be written as a Hive-partitioned Parquet dataset:
+#   <root>/run=<run id>/strategy=<strategy>/model=<model>/part-00000.parquet
+# Every run adds a new run= directory and never rewrites earlier files, so one
+# root collects all runs. Score columns are typed (int / bool / float), file
+# formats become list<string>, and free text such as the raw LLM output stays
+# in its own column, so readers that only need the scores never decode it.
+# Every file has the same schema (RESULT_COLUMNS, whatever the strategy or
+# options of the run), so the partitions always read back as one table.
+# A ParquetDatasetWriter takes rows as the engine finishes them and writes
+# them in record batches of batch_rows through one ParquetWriter per
+# partition. pyarrow is optional and only needed when this output is used.
+
+DEFAULT_BATCH_ROWS = 10000
+DEFAULT_COMPRESSION = "zstd"
+PARTITION_COLUMNS = ("Strategy", "Model")
+SCORE_COLUMNS = ["Dataset Name", "F-Score", "A-Score", "I-Score", "R-Score"]
+
+INT_COLUMNS = {"F-Score", "A-Score", "I-Score", "R-Score", "Samples", "Extra Tokens", "Snippet Tokens"}
+BOOL_COLUMNS = {
+    "Parse Success", "Valid Scores", "Early Stop", "Agreed",
+    "F-Score Valid", "A-Score Valid", "I-Score Valid", "R-Score Valid", "All Valid",
+}
+LIST_COLUMNS = {"Scraped File Formats"}
+
+# Every column a result row can have (legacy script rows and the CLI's long
+# rows, with self-consistency and cascade columns); Strategy / Model are the
+# partition directories instead
+RESULT_COLUMNS = [
+    "Dataset Name", "Website Link", "FAIR Raw Output", "FAIR Evaluation Raw Output",
+    "Scraped Title", "Scraped License", "Scraped File Formats", "Snippet Tokens",
+    "Parse Success", "Valid Scores", "Parsed Dataset Name", "Dataset Name (Parsed)",
+    "F-Score", "A-Score", "I-Score", "R-Score",
+    "F-Score Valid", "A-Score Valid", "I-Score Valid", "R-Score Valid", "All Valid",
+    "Samples", "Early Stop", "Agreed",
+    "F-Score Variance", "A-Score Variance", "I-Score Variance", "R-Score Variance",
+    "Extra Tokens", "Aggregate", "Sample Outputs", "Answered By",
+]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+
+
+def column_type(name):
+    if name in INT_COLUMNS:
+        return pa.int32()
+    if name in BOOL_COLUMNS:
+        return pa.bool_()
+    if name.endswith(" Variance"):
+        return pa.float64()
+    if name in LIST_COLUMNS:
+        return pa.list_(pa.string())
+    return pa.string()
+
+
+def _cell(value, name):
+    if value is None or (isinstance(value, float) and value != value):  # None / NaN
+        return None
+    if name in LIST_COLUMNS:
+        if isinstance(value, str):
+            # Joined with ", " by the long / zero-shot rows
+            return [item for item in value.split(", ") if item]
+        return [str(item) for item in value]
+    if name in INT_COLUMNS:
+        return int(value)
+    if name in BOOL_COLUMNS:
+        return bool(value)
+    if name.endswith(" Variance"):
+        return float(value)
+    return str(value)
+
+
+def result_schema():
+    """The one schema of every file in the dataset."""
+    _require_pyarrow()
+    return pa.schema([(name, column_type(name)) for name in RESULT_COLUMNS])
+
+
+def record_batch(rows, schema):
+    """Record batch of result rows (dicts) in schema; missing cells are null."""
+    return pa.record_batch(
+        [pa.array([_cell(row.get(field.name), field.name) for row in rows], type=field.type) for field in schema],
+        schema=schema,
+    )
+
+
+def new_run_id():
+    """UTC timestamp used as the run= partition of one run."""
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+
+
+def _partition_dir(root, run_id, strategy, model):
+    parts = [("run", run_id), ("strategy", strategy), ("model", model)]
+    return os.path.join(root, *(f"{key}={urllib.parse.quote(str(value), safe='')}" for key, value in parts))
+
+
+class ParquetDatasetWriter:
+    """
+    Streams result rows into one new run of the partitioned dataset under root.
+    - write(row) as each row is finished; rows with Strategy / Model columns
+      (the CLI's long table) are partitioned by them, single-strategy rows
+      use strategy / model
+    - Full batches of batch_rows are written right away; close() writes the
+      rest and finishes the files (use it as a context manager)
+    """
+
+    def __init__(self, root, strategy=None, model=None, run_id=None,
+                 batch_rows=DEFAULT_BATCH_ROWS, compression=DEFAULT_COMPRESSION):
+        self.schema = result_schema()
+        self.root = root
+        self.strategy = strategy
+        self.model = model
+        self.run_id = run_id or new_run_id()
+        self.batch_rows = batch_rows
+        self.compression = compression
+        self.rows = 0
+        self.paths = []
+        self._pending = {}  # partition -> rows not yet written
+        self._writers = {}
+        self._lock = threading.Lock()
+
+    def write(self, row):
+        unknown = [name for name in row if name not in self.schema.names and name not in PARTITION_COLUMNS]
+        if unknown:
+            raise ValueError(f"Result columns {unknown} are not in columnar.RESULT_COLUMNS")
+        key = (row.get("Strategy", self.strategy), row.get("Model", self.model))
+        with self._lock:
+            pending = self._pending.setdefault(key, [])
+            pending.append(row)
+            self.rows += 1
+            if len(pending) >= self.batch_rows:
+                self._flush(key)
+
+    def _flush(self, key):
+        rows = self._pending.pop(key, None)
+        if not rows:
+            return
+        writer = self._writers.get(key)
+        if writer is None:
+            directory = _partition_dir(self.root, self.run_id, *key)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, "part-00000.parquet")
+            writer = self._writers[key] = pq.ParquetWriter(path, self.schema, compression=self.compression)
+            self.paths.append(path)
+        with telemetry.span("write", target="parquet"):
+            writer.write_batch(record_batch(rows, self.schema))
+
+    def close(self):
+        with self._lock:
+            for key in list(self._pending):
+                self._flush(key)
+            for writer in self._writers.values():
+                writer.close()
+            self._writers.clear()
+        print(f"🗄️ Wrote {self.rows} rows to {len(self.paths)} Parquet partitions under {self.root} "
+              f"(run {self.run_id})")
+        return self.paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_parquet_dataset(rows, root, strategy=None, model=None, run_id=None,
+                          batch_rows=DEFAULT_BATCH_ROWS, compression=DEFAULT_COMPRESSION):
+    """Write finished result rows as one new run under root; returns the paths of the files written."""
+    with ParquetDatasetWriter(root, strategy, model, run_id, batch_rows, compression) as writer:
+        for row in rows:
+            writer.write(row)
+    return writer.paths
+
+
+def load_results(root, columns=SCORE_COLUMNS, filters=None):
+    """
+    DataFrame from the partitioned dataset, reading only the given columns.
+    - run / strategy / model come from the directory names and work in filters,
+      e.g. filters=[("strategy", "=", "few-shot-cot")]; columns=None reads all
+    """
+    _require_pyarrow()
+    if columns is not None:
+        columns = list(columns) + [c for c in ("run", "strategy", "model") if c not in columns]
+    return pq.read_table(root, columns=columns, filters=filters, partitioning="hive").to_pandas()
+
+
+def map_parquet_file(src, dst, map_batches, batch_rows=DEFAULT_BATCH_ROWS, compression=DEFAULT_COMPRESSION):
+    """
+    Stream the Parquet file src into dst with src's schema, one record batch at a time.
+    - map_batches(iterable of row-dict lists) yields the rows to write, batch by
+      batch; columns the rows gain are dropped
+    - Returns the number of rows written
+    """
+    _require_pyarrow()
+    source = pq.ParquetFile(src)
+    schema = source.schema_arrow
+    written = 0
+    with pq.ParquetWriter(dst, schema, compression=compression) as writer:
+        batches = (batch.to_pylist() for batch in source.iter_batches(batch_size=batch_rows))
+        for rows in map_batches(batches):
+            writer.write_batch(record_batch(rows, schema))
+            written += len(rows)
+    return written
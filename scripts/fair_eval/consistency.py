@@ -0,0 +1,192 @@
+import json
+import statistics
+from collections import Counter
+
+from fair_eval.parsing import JSON_FIELDS, parse_scores
+
+# ================================
+# Self-consistency Sampling
+# ================================
+# Scores drift from run to run even at temperature 0.2. Instead of rerunning
+# whole scripts, a dataset can be sampled several times and its scores
+# aggregated (median or majority vote). Sampling stops early: a first round of
+# min_samples answers is drawn, and more are only requested while some score
+# still spreads by more than `tolerance` points, up to max_samples.
+#   - n_supported: draw a round with one call using n=...; otherwise one call
+#     per sample
+#   - every call carries a distinct seed, so rounds have distinct cache keys
+#     and reruns replay the same samples from the completion cache
+# The result row keeps every raw sample (SAMPLES_COLUMN, a JSON list) next to
+# the first sample's text in the raw answer column; only the score columns
+# carry the consensus, so reparse can re-aggregate the samples.
+
+SCORES = tuple(JSON_FIELDS)
+AGGREGATES = ("median", "majority")
+DEFAULT_MIN_SAMPLES = 3
+DEFAULT_TOLERANCE = 1
+SAMPLES_COLUMN = "Sample Outputs"
+AGGREGATE_COLUMN = "Aggregate"
+
+
+class ConsensusAnswer(str):
+    """
+    The first sample's raw text, plus:
+    - .samples: every raw sample; .stats: sampling statistics for the result row
+    - .table: consensus score table the score columns are built from (None
+      when no sample parsed)
+    """
+
+    def __new__(cls, samples, table, stats):
+        answer = super().__new__(cls, samples[0])
+        answer.samples = samples
+        answer.table = table
+        answer.stats = stats
+        return answer
+
+
+def scored_text(fair_output):
+    """Text the score columns come from: a ConsensusAnswer's consensus table, else the answer itself."""
+    table = getattr(fair_output, "table", None)
+    return fair_output if table is None else table
+
+
+def consistency_columns(fair_output):
+    """Self-consistency columns for a result row ({} for a plain single-sample answer)."""
+    stats = getattr(fair_output, "stats", None)
+    if stats is None:
+        return {}
+    columns = {"Samples": stats["samples"], "Early Stop": stats["early_stop"], "Agreed": stats["agreed"]}
+    columns.update({f"{score} Variance": stats["variance"][score] for score in SCORES})
+    columns["Extra Tokens"] = stats["extra_tokens"]
+    columns[AGGREGATE_COLUMN] = stats["aggregate"]
+    columns[SAMPLES_COLUMN] = json.dumps(fair_output.samples, ensure_ascii=False)
+    return columns
+
+
+def _majority(values):
+    # Ties go to the tied value closest to the median (lowest on a draw)
+    counts = Counter(values)
+    top = max(counts.values())
+    tied = [v for v in counts if counts[v] == top]
+    middle = statistics.median(values)
+    return min(tied, key=lambda v: (abs(v - middle), v))
+
+
+_AGGREGATE_FUNCTIONS = {"median": statistics.median_low, "majority": _majority}
+
+
+def consensus_table(dataset_name, parsed, aggregate="median"):
+    """Markdown score table aggregating parsed samples (parse_scores dicts), or None if there are none."""
+    if not parsed:
+        return None
+    scores = {s: _AGGREGATE_FUNCTIONS[aggregate]([p[s] for p in parsed]) for s in SCORES}
+    return (
+        "| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |\n"
+        "|---|---|---|---|---|\n"
+        f"| {dataset_name} | F-Score ({scores['F-Score']}/17) | A-Score ({scores['A-Score']}/10) "
+        f"| I-Score ({scores['I-Score']}/8) | R-Score ({scores['R-Score']}/7) |"
+    )
+
+
+def rescore_samples(dataset_name, samples_json, aggregate="median"):
+    """Consensus table re-aggregated from a stored SAMPLES_COLUMN value (for reparse)."""
+    parsed = [p for p in map(parse_scores, json.loads(samples_json)) if p["Parse Success"]]
+    return consensus_table(dataset_name, parsed, aggregate if aggregate in AGGREGATES else "median")
+
+
+def _fetched_tokens(response):
+    """(prompt, completion) tokens the API charged for response; completion-cache hits cost nothing."""
+    if getattr(response, "from_cache", False):
+        return 0, 0
+    usage = getattr(response, "usage", None)
+    return (getattr(usage, "prompt_tokens", None) or 0), (getattr(usage, "completion_tokens", None) or 0)
+
+
+class SelfConsistency:
+    """
+    Early-stopping self-consistency for single-dataset requests.
+    - max_samples: upper bound per dataset; 1 turns sampling off
+    - aggregate: "median" (median_low, so scores stay integers) or "majority"
+    """
+
+    def __init__(self, max_samples=1, min_samples=DEFAULT_MIN_SAMPLES, tolerance=DEFAULT_TOLERANCE,
+                 aggregate="median", n_supported=True):
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate {aggregate!r}; choose from {', '.join(AGGREGATES)}")
+        self.max_samples = max_samples
+        self.min_samples = max(1, min(min_samples, max_samples))
+        self.tolerance = tolerance
+        self.aggregate = aggregate
+        self.n_supported = n_supported
+
+    @property
+    def enabled(self):
+        return self.max_samples > 1
+
+    def _agree(self, parsed):
+        return len(parsed) >= self.min_samples and all(
+            max(p[s] for p in parsed) - min(p[s] for p in parsed) <= self.tolerance for s in SCORES
+        )
+
+    def _draw(self, request, count, seed, respond):
+        """count samples as (contents, [(prompt_tokens, completion_tokens, choices) fetched per call])."""
+        if self.n_supported:
+            calls = [dict(request, n=count, seed=seed)] if count > 1 else [dict(request, seed=seed)]
+        else:
+            calls = [dict(request, seed=seed + k) for k in range(count)]
+        contents, usage = [], []
+        for call in calls:
+            response = respond(call)
+            contents.extend(choice.message.content for choice in response.choices)
+            usage.append((*_fetched_tokens(response), len(response.choices)))
+        return contents, usage
+
+    def answer(self, request, dataset_name, respond):
+        """
+        ConsensusAnswer for request, where respond(request) -> chat-completions response.
+        - Unparseable samples are left out; if none parses, the first one gets
+          the same single re-ask as Strategy.answer
+        """
+        samples, parsed, usage = [], [], []
+        agreed = False
+        while len(samples) < self.max_samples:
+            count = self.min_samples if not samples else min(self.min_samples, self.max_samples - len(samples))
+            contents, drawn = self._draw(request, count, len(samples), respond)
+            samples.extend(contents)
+            usage.extend(drawn)
+            parsed = [s for s in map(parse_scores, samples) if s["Parse Success"]]
+            agreed = self._agree(parsed)
+            if agreed:
+                break
+
+        if not parsed:
+            from fair_eval.strategies import reask_request  # strategies imports this module
+
+            print(f"🔁 Could not parse scores for {dataset_name}; asking once more")
+            response = respond(reask_request(request, dataset_name, samples[0]))
+            samples.append(response.choices[0].message.content)
+            usage.append((*_fetched_tokens(response), 1))
+            parsed = [s for s in map(parse_scores, samples[-1:]) if s["Parse Success"]]
+
+        # Extra cost over one single-sample call, counting only responses fetched
+        # from the API: everything but the first call's prompt and the first
+        # call's average completion (nothing is saved if that one was cached)
+        first_prompt, first_completion, first_choices = usage[0]
+        single = first_prompt + first_completion / first_choices
+        fetched = sum(p + c for p, c, _ in usage)
+        stats = {
+            "samples": len(samples),
+            "parsed": len(parsed),
+            "calls": len(usage),
+            "early_stop": len(samples) < self.max_samples,
+            # Scores within the tolerance; early_stop alone misses agreement on the last round
+            "agreed": agreed,
+            "variance": {
+                s: statistics.pvariance([p[s] for p in parsed]) if parsed else None for s in SCORES
+            },
+            "extra_tokens": round(fetched - single),
+            "aggregate": self.aggregate,
+        }
+        print(f"🎲 {dataset_name}: {len(samples)} samples in {len(usage)} calls"
+              f"{' (stopped early)' if stats['early_stop'] else ''}{'' if agreed else ' (no agreement)'}")
+        return ConsensusAnswer(samples, consensus_table(dataset_name, parsed, self.aggregate), stats)
@@ -0,0 +1,66 @@
+import hashlib
+import json
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# ================================
+# URL / Page Deduplication
+# ================================
+# Input CSVs list the same landing page under several rows: with a #fragment
+# (the UCMR3 "...rule#3" links), trailing spaces, tracking parameters or
+# different host casing. canonical_url() maps those to one URL so each page is
+# fetched and parsed once. page_key() hashes a parsed page, so rows of the
+# same dataset whose pages have identical content (mirrors) are scored once
+# and the answer is fanned back out to every one of them. The prompt names the
+# dataset, so rows of different datasets on one page still get their own call.
+#   "url":     one fetch + parse per canonical URL
+#   "content": additionally one LLM call per identical page, dataset name (and variant)
+
+DEDUP_MODES = ("off", "url", "content")
+DEFAULT_DEDUP = "content"
+
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid", "yclid"}
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _tracking(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url):
+    """
+    URL with surrounding whitespace, the fragment, tracking parameters and a
+    default port removed, and scheme / host lower-cased.
+    - Path and the order of the remaining query parameters are kept
+    - Non-URL values (NaN, empty cells) come back unchanged
+    """
+    if not isinstance(url, str):
+        return url
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if "@" in parts.netloc:
+        host = parts.netloc.rsplit("@", 1)[0] + "@" + host
+    query = parts.query
+    if query:
+        params = parse_qsl(query, keep_blank_values=True)
+        kept = [(k, v) for k, v in params if not _tracking(k)]
+        if len(kept) != len(params):
+            query = urlencode(kept)
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def page_key(scraped):
+    """Content hash of a parsed page (the scraped dict the prompts are built from)."""
+    blob = json.dumps(scraped, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
@@ -0,0 +1,323 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fair_eval.dedup import DEDUP_MODES, canonical_url, page_key
+from fair_eval.telemetry import telemetry
+
+# ================================
+# Concurrent Evaluation Engine
+# ================================
+# Rows flow through network- and CPU-bound stages run as worker pools joined
+# by bounded queues, so many rows are in flight at once while memory stays
+# flat on large inputs:
+#   fetch (threads) -> parse (process pool or in-process) -> LLM (threads)
+# Scripts that only pass `scrape` get a two-stage scrape -> LLM pipeline.
+# With `variants` (strategy, model) pairs, each page is scraped once and fanned
+# out to one LLM call per variant. With group_size > 1 a grouping stage packs up
+# to that many scraped rows (of the same variant) into one LLM call.
+# With dedup, rows sharing a canonical URL are fetched and parsed as one page,
+# and ("content") rows of the same dataset whose pages parse identically share
+# one LLM answer.
+
+DEFAULT_SCRAPE_CONCURRENCY = 8
+DEFAULT_LLM_CONCURRENCY = 4
+PROCESS_POOL_MIN_ROWS = 100  # below this, pool start-up costs more than it saves
+
+_DONE = object()
+_PENDING = object()
+
+
+def _parse_process_count(parse_workers, n_rows):
+    """
+    Processes for the parse stage; 0 parses in-process.
+    - parse_workers=None: one per CPU, but only for runs of PROCESS_POOL_MIN_ROWS+
+    - Needs the fork start method: forked workers inherit the loaded parser
+      modules instead of re-importing them per process
+    """
+    if parse_workers is None:
+        parse_workers = (os.cpu_count() or 1) if n_rows >= PROCESS_POOL_MIN_ROWS else 0
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return 0
+    return max(0, parse_workers)
+
+
+def _in_span(stage, fn, **attributes):
+    """fn wrapped in a telemetry span, for running on an executor thread."""
+    def run(*args):
+        with telemetry.span(stage) as span:
+            span.update(attributes)
+            return fn(*args)
+    return run
+
+
+def _process_pool(parse_workers):
+    pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("fork"))
+    # Fork every worker now, before the stage threads exist
+    for future in [pool.submit(int) for _ in range(parse_workers)]:
+        future.result()
+    return pool
+
+
+async def _run_rows(pages, results, evaluate, build_result, scrape, fetch, parse, on_scrape_error,
+                    scrape_concurrency, llm_concurrency, parse_workers, queue_size, checkpoint, on_result,
+                    fanned_out, group_size, evaluate_group, share_answers, dedup_stats):
+    loop = asyncio.get_running_loop()
+    staged = fetch is not None
+    parse_processes = _parse_process_count(parse_workers, len(pages)) if staged else 0
+    parse_pool = _process_pool(parse_processes) if parse_processes else None
+    parse_concurrency = parse_processes or 1
+    executor = ThreadPoolExecutor(
+        max_workers=scrape_concurrency + llm_concurrency + (0 if parse_pool else parse_concurrency)
+    )
+    pending = iter(pages)
+    fetched_queue = asyncio.Queue(maxsize=queue_size)
+    scraped_queue = asyncio.Queue(maxsize=queue_size)
+    grouped = group_size > 1
+    llm_queue = asyncio.Queue(maxsize=queue_size) if grouped else scraped_queue
+
+    # (page key, dataset name, variant) -> [answer (_PENDING until scored), tasks waiting for it]
+    shared = {}
+
+    def finish(slot, variant, dataset_name, website_link, scraped, fair_output):
+        extra = (variant,) if fanned_out else ()
+        results[slot] = build_result(dataset_name, website_link, scraped, fair_output, *extra)
+        if checkpoint is not None:
+            checkpoint.append(dataset_name, website_link, results[slot], variant)
+        if on_result is not None:
+            on_result(results[slot])
+
+    def claim(share, task):
+        """True for the first task of a page content + dataset + variant, which gets scored; later ones wait."""
+        entry = shared.get(share)
+        if entry is None:
+            shared[share] = [_PENDING, []]
+            return True
+        dedup_stats["reused"] += 1
+        if entry[0] is _PENDING:
+            entry[1].append(task)
+        else:
+            print(f"♻️ Same page content, reusing the answer for: {task[2]}")
+            finish(*task, entry[0])
+        return False
+
+    def settle(share, fair_output):
+        entry = shared[share]
+        entry[0] = fair_output
+        for slot, variant, dataset_name, website_link, scraped in entry[1]:
+            print(f"♻️ Same page content, reusing the answer for: {dataset_name}")
+            finish(slot, variant, dataset_name, website_link, scraped, fair_output)
+        entry[1].clear()
+
+    async def emit(page, scraped, parsed=True):
+        # One LLM task per (result slot, variant) still missing for the page's rows
+        url, rows = page
+        if isinstance(scraped, dict) and "snippet_tokens" in scraped:
+            print(f"✂️ Snippet for {url}: {scraped['snippet_tokens']} tokens")
+        # Failed fetches are not shared: their error pages say nothing about the content.
+        # The dataset name is part of the prompt, so only rows of one dataset share an answer
+        key = page_key(scraped) if share_answers and parsed else None
+        for dataset_name, website_link, todo in rows:
+            for slot, variant in todo:
+                task = (slot, variant, dataset_name, website_link, scraped)
+                share = (key, dataset_name, variant) if key is not None else None
+                if share is None or claim(share, task):
+                    await scraped_queue.put((*task, share))
+
+    def scraping(page):
+        url, rows = page
+        print(f"🔍 Scraping: {url}" + (f" ({len(rows)} rows)" if len(rows) > 1 else ""))
+        return url
+
+    async def scrape_worker():
+        for page in pending:
+            try:
+                scraped = await loop.run_in_executor(executor, scrape, scraping(page))
+                error = None
+            except Exception as e:
+                if on_scrape_error is None:
+                    raise
+                scraped, error = on_scrape_error(e), e
+            await emit(page, scraped, parsed=error is None)
+
+    async def fetch_worker():
+        for page in pending:
+            try:
+                html = await loop.run_in_executor(executor, fetch, scraping(page))
+                error = None
+            except Exception as e:
+                html, error = None, e
+            await fetched_queue.put((page, html, error))
+
+    async def parse_worker():
+        while True:
+            item = await fetched_queue.get()
+            if item is _DONE:
+                return
+            page, html, error = item
+            if error is None:
+                try:
+                    # Timed here: spans inside pool processes would not reach this one's telemetry
+                    with telemetry.span("parse"):
+                        scraped = await loop.run_in_executor(parse_pool or executor, parse, html)
+                except Exception as e:
+                    error = e
+            if error is not None:
+                scraped = on_scrape_error(error)
+            await emit(page, scraped, parsed=error is None)
+
+    async def group_worker():
+        # Up to group_size rows of the same variant per LLM task; flush the rest at the end
+        groups = {}
+        while True:
+            item = await scraped_queue.get()
+            if item is _DONE:
+                break
+            group = groups.setdefault(item[1], [])
+            group.append(item)
+            if len(group) == group_size:
+                await llm_queue.put(groups.pop(item[1]))
+        for group in groups.values():
+            await llm_queue.put(group)
+
+    async def llm_worker():
+        while True:
+            item = await llm_queue.get()
+            if item is _DONE:
+                return
+            group = item if grouped else [item]
+            variant = group[0][1]
+            extra = (variant,) if fanned_out else ()
+            label = f" {variant}" if fanned_out else ""
+            outputs = [None] * len(group)
+            if len(group) > 1:
+                names = ", ".join(str(entry[2]) for entry in group)
+                print(f"🤖 FAIR evaluation for {len(group)} datasets{label}: {names}")
+                items = [entry[2:5] for entry in group]  # (dataset_name, website_link, scraped)
+                outputs = await loop.run_in_executor(
+                    executor, _in_span("evaluate", evaluate_group, datasets=names), items, *extra)
+            for (slot, _, dataset_name, website_link, scraped, share), fair_output in zip(group, outputs):
+                args = (dataset_name, website_link, scraped)
+                if fair_output is None:
+                    if len(group) > 1:
+                        print(f"↩️ Not in the group answer, scoring alone: {dataset_name}{label}")
+                    else:
+                        print(f"🤖 FAIR evaluation for: {dataset_name}{label}")
+                    fair_output = await loop.run_in_executor(
+                        executor, _in_span("evaluate", evaluate, dataset=dataset_name), *args, *extra)
+                finish(slot, variant, *args, fair_output)
+                if share is not None:
+                    settle(share, fair_output)
+
+    async def stage(workers, count, queue, consumers):
+        # Run a worker pool, then tell each downstream consumer to stop
+        await asyncio.gather(*(workers() for _ in range(count)))
+        for _ in range(consumers):
+            await queue.put(_DONE)
+
+    scraped_consumers = 1 if grouped else llm_concurrency
+    if staged:
+        stages = [
+            stage(fetch_worker, scrape_concurrency, fetched_queue, parse_concurrency),
+            stage(parse_worker, parse_concurrency, scraped_queue, scraped_consumers),
+        ]
+    else:
+        stages = [stage(scrape_worker, scrape_concurrency, scraped_queue, scraped_consumers)]
+    if grouped:
+        stages.append(stage(group_worker, 1, llm_queue, llm_concurrency))
+
+    try:
+        await asyncio.gather(*stages, *(llm_worker() for _ in range(llm_concurrency)))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if parse_pool:
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_pipeline(df, scrape=None, evaluate=None, build_result=None,
+                 fetch=None, parse=None, on_scrape_error=None,
+                 scrape_concurrency=DEFAULT_SCRAPE_CONCURRENCY,
+                 llm_concurrency=DEFAULT_LLM_CONCURRENCY,
+                 parse_workers=None,
+                 queue_size=None,
+                 checkpoint=None,
+                 on_result=None,
+                 variants=None,
+                 group_size=1,
+                 evaluate_group=None,
+                 dedup="off"):
+    """
+    Run every row of df through scraping, evaluate and build_result concurrently.
+    - scrape(url) -> scraped dict, or fetch(url) -> html + parse(html) -> scraped
+      dict for a separate parse stage; on_scrape_error(exc) -> scraped dict turns
+      a failed scrape / fetch / parse into that row's page (needed with fetch;
+      without it a raising scrape stops the run)
+    - evaluate(name, url, scraped) and build_result(name, url, scraped, fair_output)
+      are the script's own functions
+    - parse_workers: processes for the parse stage; None = auto, 0 = in-process
+    - checkpoint: a CheckpointLog; rows already in it are not re-run and every
+      new row is appended to it as soon as it is built
+    - on_result(row): called with every result row as soon as it is built
+      (rows restored from the checkpoint right away), e.g. to stream them out
+    - variants: (strategy, model) pairs; each page is scraped once and
+      evaluate / build_result get the variant as an extra last argument
+    - group_size > 1: evaluate_group(items[, variant]) scores a list of
+      (name, url, scraped) in one call and returns one output per item;
+      items it returns None for are scored alone with evaluate
+    - dedup: "url" fetches and parses each canonical URL once for all its
+      rows; "content" also scores rows of the same dataset with identical
+      parsed pages once (per variant) and builds every row's result from that
+      answer; "off" handles each row on its own
+    - Results come back in input order (row-major over variants), so the
+      output CSV matches the serial loop
+    """
+    if "Website Link" not in df.columns or "Dataset Name" not in df.columns:
+        raise ValueError("CSV must contain 'Dataset Name' and 'Website Link' columns.")
+    if scrape_concurrency < 1 or llm_concurrency < 1:
+        raise ValueError("Concurrency limits must be at least 1.")
+    if fetch is not None and (parse is None or on_scrape_error is None):
+        raise ValueError("fetch needs both parse and on_scrape_error.")
+    if fetch is None and scrape is None:
+        raise ValueError("Pass either scrape or fetch + parse.")
+    if group_size > 1 and evaluate_group is None:
+        raise ValueError("group_size > 1 needs evaluate_group.")
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"Unknown dedup mode {dedup!r}; choose from {', '.join(DEDUP_MODES)}")
+
+    fanned_out = variants is not None
+    variant_list = list(variants) if fanned_out else [None]
+    results = []
+    pages = {}  # fetch key -> (url, [(dataset_name, website_link, todo), ...])
+    for dataset_name, website_link in zip(df["Dataset Name"], df["Website Link"]):
+        todo = []
+        for variant in variant_list:
+            done = checkpoint.get(dataset_name, website_link, variant) if checkpoint is not None else None
+            if done is None:
+                todo.append((len(results), variant))
+            elif on_result is not None:
+                on_result(done)
+            results.append(done)
+        if todo:
+            url = website_link if dedup == "off" else canonical_url(website_link)
+            key = url if dedup != "off" and isinstance(url, str) else len(pages)
+            pages.setdefault(key, (url, []))[1].append((dataset_name, website_link, todo))
+    pages = list(pages.values())
+    rows = [row for _, page_rows in pages for row in page_rows]
+    if len(pages) < len(rows):
+        print(f"🧬 {len(rows)} rows point at {len(pages)} distinct pages; fetching each once")
+    remaining = sum(len(todo) for _, _, todo in rows)
+    if remaining < len(results):
+        print(f"⏩ Resuming: {len(results) - remaining} results already in checkpoint, {remaining} to run")
+
+    if queue_size is None:
+        queue_size = 2 * llm_concurrency
+    dedup_stats = {"reused": 0}
+    asyncio.run(_run_rows(
+        pages, results, evaluate, build_result, scrape, fetch, parse, on_scrape_error,
+        scrape_concurrency, llm_concurrency, parse_workers, queue_size, checkpoint, on_result,
+        fanned_out, group_size, evaluate_group, dedup == "content", dedup_stats,
+    ))
+    if dedup_stats["reused"]:
+        print(f"🧬 {dedup_stats['reused']} results reused the answer for an identical page")
+    return results
@@ -0,0 +1,142 @@
+from lxml import etree
+
+from fair_eval.matchers import HTML_CUES, OVERLAP, TEXT_CUES, is_download_link
+from fair_eval.snippet import SnippetSelector
+from fair_eval.tokens import count_tokens
+
+# ================================
+# Streaming Page Extractor
+# ================================
+# Collects everything scrape_website needs (title, meta description, license
+# and identifier cues, file formats, download links, text snippet) in ONE
+# pass of lxml's SAX-style target parser, fed in chunks. No tree is built and
+# only bounded state is kept, so multi-MB catalog pages stay cheap in CPU and
+# memory.
+# Output matches the BeautifulSoup path in the scripts.
+
+CHUNK_SIZE = 64 * 1024
+SNIPPET_CHARS = 2000
+MAX_DOWNLOAD_LINKS = 1000
+
+# Text inside these tags is not part of BeautifulSoup's get_text()
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+class _PageHandler:
+    """lxml parser target: receives start/end/data events."""
+
+    def __init__(self, snippet_chars, selector=None):
+        self.snippet_chars = snippet_chars
+        self.selector = selector
+        self._has_text = False
+        self.title = None
+        self.description = None
+        self.download_links = []
+        self.snippet = []
+        self.snippet_len = 0
+        self.text_cues = {}
+        self._text_tail = ""
+        self._pending = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._title_parts = []
+
+    def _flush_text(self):
+        if not self._pending:
+            return
+        piece = "".join(self._pending).strip()
+        self._pending = []
+        if not piece:
+            return
+        if self._in_title:
+            self._title_parts.append(piece)
+
+        # Snippet: the selector sees the same text as get_text(" ", strip=True)
+        if self.selector is not None:
+            self.selector.feed(" " + piece if self._has_text else piece)
+            self._has_text = True
+        elif self.snippet_len < self.snippet_chars:
+            if self.snippet:
+                self.snippet.append(" ")
+                self.snippet_len += 1
+            self.snippet.append(piece)
+            self.snippet_len += len(piece)
+
+        # Text cues: scan with a short tail so cues spanning pieces are found
+        window = self._text_tail + " " + piece
+        TEXT_CUES.scan(window, found=self.text_cues)
+        self._text_tail = window[-OVERLAP:]
+
+    def start(self, tag, attrib):
+        self._flush_text()
+        if tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag == "title" and self.title is None:
+            self._in_title = True
+        elif tag == "meta" and self.description is None and attrib.get("name") == "description":
+            self.description = (attrib.get("content") or "").strip()
+        elif tag == "a" and len(self.download_links) < MAX_DOWNLOAD_LINKS:
+            href = attrib.get("href")
+            if href is not None and is_download_link(href):
+                self.download_links.append(href)
+
+    def end(self, tag):
+        if self._skip_depth:
+            if tag in SKIP_TEXT_TAGS:
+                self._skip_depth -= 1
+                self._pending = []
+            return
+        self._flush_text()
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = " ".join(self._title_parts)
+
+    def data(self, data):
+        if not self._skip_depth:
+            self._pending.append(data)
+
+    def close(self):
+        self._flush_text()
+
+
+def extract_page(html, snippet_chars=SNIPPET_CHARS, chunk_size=CHUNK_SIZE, snippet_tokens=None, model="gpt-4o"):
+    """
+    Single-pass equivalent of the BeautifulSoup extraction in scrape_website.
+    - snippet_tokens: pick the snippet with a SnippetSelector of this budget;
+      None keeps the first snippet_chars characters
+    """
+    selector = SnippetSelector(snippet_tokens, model) if snippet_tokens else None
+    handler = _PageHandler(snippet_chars, selector)
+    parser = etree.HTMLParser(target=handler)
+    html_cues = {}
+    for start in range(0, len(html), chunk_size):
+        chunk = html[start:start + chunk_size]
+        parser.feed(chunk)
+        # Format and identifier cues come from the raw HTML. Cues starting in
+        # this chunk may run up to OVERLAP chars into the next one.
+        end = start + chunk_size
+        HTML_CUES.scan(html, start, end + OVERLAP, found=html_cues, start_before=end)
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        # Blank input has no root element; like BeautifulSoup, treat it as an empty page
+        handler.close()
+
+    found_license = TEXT_CUES.ordered("license", handler.text_cues)
+    identifiers = HTML_CUES.ordered("identifier", html_cues)
+    formats = html_cues.get("format")
+    if selector is not None:
+        snippet, tokens = selector.finish()
+    else:
+        snippet = "".join(handler.snippet)[:snippet_chars]
+        tokens = count_tokens(snippet, model)
+    return {
+        "title": handler.title if handler.title is not None else "Not found",
+        "description": handler.description if handler.description is not None else "Not found",
+        "license_info": ", ".join(found_license) if found_license else "Not detected",
+        "identifier_info": ", ".join(identifiers) if identifiers else "Not detected",
+        "file_formats": list(formats) if formats else ["None detected"],
+        "download_links": handler.download_links if handler.download_links else ["None detected"],
+        "raw_text_snippet": snippet,
+        "snippet_tokens": tokens,
+    }
@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+import time
+
+# ================================
+# HTTP Response Cache
+# ================================
+# Scraped pages are stored in SQLite together with their ETag/Last-Modified
+# validators. Within the TTL a page is served straight from disk; after that
+# it is revalidated with a conditional GET, so an unchanged page costs a 304
+# instead of a full download. All strategies share one cache file, so a URL
+# list is fetched at most once across experiments.
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+
+class HttpCache:
+    """SQLite-backed page cache keyed by URL."""
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.revalidated = 0
+        self.fetched = 0
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " body TEXT NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def url_lock(self, url):
+        """Per-URL lock so concurrent rows never download the same page twice."""
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def lookup(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"body": row[0], "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+
+    def store(self, url, body, etag=None, last_modified=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, url):
+        """Mark a cached page as fresh again after a 304."""
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def stats(self):
+        return {"hits": self.hits, "revalidated": self.revalidated, "fetched": self.fetched}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cached_get(url, cache, session=None, timeout=10):
+    """
+    Page text for url, going through the cache.
+    - Fresh entry (younger than the TTL): no request at all
+    - Stale entry: conditional GET with If-None-Match / If-Modified-Since
+    - Only 200 responses are stored; other statuses are returned uncached
+    """
+    if session is None:
+        import requests  # deferred: parse-only users never fetch
+
+        session = requests
+    http = session
+    with cache.url_lock(url):
+        entry = cache.lookup(url)
+        if entry and time.time() - entry["fetched_at"] < cache.ttl_seconds:
+            cache.hits += 1
+            return entry["body"]
+
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = http.get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and entry:
+            cache.revalidated += 1
+            cache.touch(url)
+            return entry["body"]
+
+        cache.fetched += 1
+        if response.status_code == 200:
+            cache.store(
+                url,
+                response.text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return response.text
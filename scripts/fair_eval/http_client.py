@@ -0,0 +1,91 @@
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+# ================================
+# Pooled Scraping Client
+# ================================
+# One requests.Session with keep-alive connection pools, so repeated hosts
+# (epa.gov, docs.google.com, arcgis.com, ...) reuse TLS connections. Each host
+# gets a cap on in-flight requests and a minimum delay between request starts
+# to stay polite under the concurrent engine. rewrite(url) can send every
+# request elsewhere (e.g. to mock_server.PageStub for offline runs) while the
+# per-host limits still follow the original URL.
+
+DEFAULT_MAX_PER_HOST = 4
+DEFAULT_POLITENESS_DELAY = 0.5  # seconds between requests to the same host
+MAX_HOSTS = 100
+
+
+def page_stub_rewrite(stub_url):
+    """rewrite function sending every page to a mock_server.PageStub at stub_url."""
+    stub_url = stub_url.rstrip("/")
+    return lambda url: f"{stub_url}/pages/{quote(url, safe='')}"
+
+
+class PooledClient:
+    """Drop-in for requests.get with pooling and per-host limits."""
+
+    def __init__(self, max_per_host=DEFAULT_MAX_PER_HOST,
+                 politeness_delay=DEFAULT_POLITENESS_DELAY, headers=None, rewrite=None):
+        self.max_per_host = max_per_host
+        self.politeness_delay = politeness_delay
+        self.rewrite = rewrite
+        # Deferred so importing fair_eval does not load requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        self.adapter = HTTPAdapter(pool_connections=MAX_HOSTS, pool_maxsize=max_per_host)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._host_next_start = {}
+
+    def _slot(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def _wait_turn(self, host):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._host_next_start.get(host, now))
+            self._host_next_start[host] = start + self.politeness_delay
+        if start > now:
+            time.sleep(start - now)
+
+    def get(self, url, timeout=10, headers=None):
+        host = urlsplit(url).hostname or ""
+        with self._slot(host):
+            self._wait_turn(host)
+            target = self.rewrite(url) if self.rewrite else url
+            return self.session.get(target, timeout=timeout, headers=headers)
+
+    def stats(self):
+        """Per-host request and connection counts from the urllib3 pools."""
+        pools = self.adapter.poolmanager.pools
+        hosts = {}
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            entry = hosts.setdefault(pool.host, {"requests": 0, "connections": 0})
+            entry["requests"] += pool.num_requests
+            entry["connections"] += pool.num_connections
+        total_requests = sum(h["requests"] for h in hosts.values())
+        total_connections = sum(h["connections"] for h in hosts.values())
+        return {
+            "requests": total_requests,
+            "connections": total_connections,
+            "reused": total_requests - total_connections,
+            "reuse_rate": 1 - total_connections / total_requests if total_requests else 0.0,
+            "hosts": hosts,
+        }
+
+    def close(self):
+        self.session.close()
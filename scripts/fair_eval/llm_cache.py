@@ -0,0 +1,137 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+# ================================
+# Persistent LLM Completion Cache
+# ================================
+# Completions are stored in SQLite under a SHA-256 of the full request dict
+# (model, messages, temperature, max_tokens, ...). A rerun with byte-identical
+# prompts is answered from disk without touching the API. The file is kept
+# under max_bytes by evicting the least recently used entries.
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def prompt_key(prompt):
+    """Content address of a chat-completions request."""
+    payload = json.dumps(prompt, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _to_namespace(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(v) for v in value]
+    return value
+
+
+def _response_json(response):
+    if hasattr(response, "model_dump_json"):
+        return response.model_dump_json()
+    return json.dumps(response, default=lambda o: vars(o))
+
+
+class CompletionCache:
+    """SQLite-backed completion cache with size-based LRU eviction."""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS completions_last_access ON completions (last_access)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()[0]
+
+    def get(self, prompt):
+        """
+        Cached response for prompt, or None.
+        - Attribute access like the SDK object; from_cache=True tells it apart
+          from a fresh API response
+        """
+        key = prompt_key(prompt)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        response = _to_namespace(json.loads(row[0]))
+        response.from_cache = True
+        return response
+
+    def put(self, prompt, response):
+        key = prompt_key(prompt)
+        body = _response_json(response)
+        size = len(body.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, size, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, body, size, time.time()),
+            )
+            self._size += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def get_or_create(self, prompt, create):
+        """Return the cached response, or call create() and store its result."""
+        response = self.get(prompt)
+        if response is None:
+            response = create()
+            self.put(prompt, response)
+        return response
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, size FROM completions ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (row[0],))
+            self._size -= row[1]
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "size_bytes": self._size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
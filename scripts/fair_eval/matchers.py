@@ -0,0 +1,90 @@
+import re
+
+# ================================
+# Compiled Rubric Cue Matchers
+# ================================
+# All cues of one source (visible page text or raw HTML) are compiled into a
+# single alternation regex, so one finditer pass finds every license, format
+# and identifier cue at once instead of one scan (and one lowercase copy) per
+# keyword. New rubric cues are added with register() and ride the same scan.
+
+OVERLAP = 32  # longer than any cue match; carried across chunks when streaming
+
+
+class CueMatcher:
+    """Named regex cues grouped by category, matched in one pass."""
+
+    def __init__(self, flags=re.IGNORECASE):
+        self.flags = flags
+        self._cues = []
+        self._regex = None
+
+    def register(self, category, pattern, name=None):
+        """
+        Add a cue.
+        - name: reported when the cue matches; None reports the matched text
+        - Cues that match at the same position resolve to the first registered
+        """
+        self._cues.append((category, name, pattern))
+        self._regex = None
+        return self
+
+    @property
+    def regex(self):
+        if self._regex is None:
+            self._regex = re.compile(
+                "|".join(f"(?P<c{i}>{pattern})" for i, (_, _, pattern) in enumerate(self._cues)),
+                self.flags,
+            )
+        return self._regex
+
+    def scan(self, text, pos=0, endpos=None, found=None, start_before=None):
+        """
+        Add cues in text[pos:endpos] to found ({category: set of names}).
+        - start_before: ignore matches starting at or after this index, so a
+          chunk can be scanned with lookahead without counting cut-off matches
+        """
+        if found is None:
+            found = {}
+        if endpos is None:
+            endpos = len(text)
+        for match in self.regex.finditer(text, pos, endpos):
+            if start_before is not None and match.start() >= start_before:
+                break
+            category, name, _ = self._cues[int(match.lastgroup[1:])]
+            found.setdefault(category, set()).add(name if name is not None else match.group())
+        return found
+
+    def ordered(self, category, found):
+        """Named cues of a category that were found, in registration order."""
+        hits = found.get(category, ())
+        return [name for cat, name, _ in self._cues if cat == category and name in hits]
+
+
+# Visible text: license cues (plain substring semantics, like the rubric keywords)
+TEXT_CUES = CueMatcher()
+for _keyword in ["license", "creativecommons", "CC-BY", "public domain", "creative commons"]:
+    TEXT_CUES.register("license", re.escape(_keyword), name=_keyword)
+
+# Raw HTML: file formats (reported as the extension) and persistent identifiers
+HTML_CUES = CueMatcher()
+HTML_CUES.register("format", r"(?<=\.)(?:csv|xlsx?|json|xml|zip|shp|kml|txt|pdf)")
+HTML_CUES.register("identifier", r"\b10\.\d{4,9}/[^\s\"'<>]", name="DOI")
+HTML_CUES.register("identifier", r"\bark:/?\d{5,9}/", name="ARK")
+HTML_CUES.register("identifier", r"\bhdl\.handle\.net/", name="Handle")
+HTML_CUES.register("identifier", r"\bpurl\.(?:org|oclc\.org)/", name="PURL")
+
+# Page sentences worth keeping in the prompt snippet, one category per rubric area
+SENTENCE_CUES = CueMatcher()
+SENTENCE_CUES.register("license", r"\blicen[cs]e|creative\s*commons|\bCC[- ]?(?:BY|0)\b|public domain|terms of use")
+SENTENCE_CUES.register("identifier", r"\bdoi\b|\b10\.\d{4,9}/|\bark:|\bhandle\b|\bpurl\b|persistent identifier")
+SENTENCE_CUES.register("access", r"\bAPI\b|\bREST\b|endpoint|download|\baccess")
+SENTENCE_CUES.register("metadata", r"metadata|schema|\bDCAT\b|data dictionary|codebook|ontolog|vocabular")
+SENTENCE_CUES.register("provenance", r"provenance|methodolog|collected|\bsource|\bversion|citation|\bcite\b")
+
+# <a href> values that point at a downloadable data file
+DOWNLOAD_LINK_PATTERN = re.compile(r"\.(?:csv|json|zip|xlsx|xml)", re.IGNORECASE)
+
+
+def is_download_link(href):
+    return DOWNLOAD_LINK_PATTERN.search(href) is not None
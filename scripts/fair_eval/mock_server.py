@@ -0,0 +1,534 @@
+import argparse
+import email.parser
+import email.policy
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fair_eval.llm_cache import prompt_key
+
+# ================================
+# Local Mock LLM Server
+# ================================
+# A stand-in for the Azure OpenAI / OpenAI HTTP API, for running the pipeline
+# and the batch mode without a live endpoint. It answers chat completions and
+# the batch flow (file upload, batch create / retrieve, file content) with
+# recorded completions (replayed from an llm_cache.sqlite or a JSONL file) or
+# synthetic FAIR score tables. Latency, 429s and malformed answers can be
+# injected with a seeded RNG, so failure handling is reproducible.
+# PageStub serves recorded pages (an http_cache.sqlite) the same way, so a
+# whole run works on an offline machine. Point a client at the mock with:
+#   openai.AzureOpenAI(azure_endpoint=server.url, api_key="x", api_version="2024-02-01")
+#   openai.OpenAI(base_url=server.url + "/v1", api_key="x")
+# or run it standalone: python -m fair_eval.mock_server --port 8000
+
+_DATASET_PATTERN = re.compile(r'Dataset: "(.*?)"')
+CHARS_PER_TOKEN = 4
+PREFIX_CACHE_MIN_TOKENS = 1024  # provider prompt caching starts here...
+PREFIX_CACHE_STEP_TOKENS = 128  # ...and grows in these increments
+
+# Injected malformed answers: a cut-off table, prose only, out-of-range scores
+MALFORMED = (
+    lambda content: content[:len(content) // 2],
+    lambda content: "The dataset appears to be reasonably FAIR; scores are given above.",
+    lambda content: re.sub(r"\((\d+)/17\)", "(99/17)", content),
+)
+
+
+def _prompt_text(request):
+    return "".join(f"{m.get('role')}\n{m.get('content') or ''}\n" for m in request.get("messages", []))
+
+
+def synthetic_content(request):
+    """
+    Deterministic markdown score table for a chat-completions request.
+    - One row per dataset named after the scraped content (worked examples
+      come before it), so grouped requests get one row per dataset
+    - Scores depend only on the dataset name, so single and grouped runs agree
+    - Requests with a json_schema response_format get JSON score objects
+    """
+    messages = request.get("messages") or [{}]
+    text = messages[-1].get("content") or ""
+    start = text.find("### Extracted Website Content")
+    names = _DATASET_PATTERN.findall(text[start:] if start >= 0 else text) or ["Dataset"]
+    scores = []
+    for name in names:
+        digest = hashlib.sha256(name.encode("utf-8")).digest()
+        scores.append((name, *(digest[k] % (top + 1) for k, top in enumerate((17, 10, 8, 7)))))
+    response_format = request.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        objects = [
+            {"dataset_name": name, "f_score": f, "a_score": a, "i_score": i, "r_score": r}
+            for name, f, a, i, r in scores
+        ]
+        group = response_format["json_schema"].get("name") == "fair_scores_group"
+        return json.dumps({"datasets": objects} if group else objects[0])
+    rows = [
+        f"| {name} | F-Score ({f}/17) | A-Score ({a}/10) | I-Score ({i}/8) | R-Score ({r}/7) |"
+        for name, f, a, i, r in scores
+    ]
+    return (
+        "| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |\n"
+        "|---|---|---|---|---|\n"
+        + "\n".join(rows)
+    )
+
+
+def completion_body(request, contents, cached_tokens=0):
+    """Chat-completions response with one choice per content (a single str is one choice)."""
+    if isinstance(contents, str):
+        contents = [contents]
+    prompt_tokens = len(_prompt_text(request)) // CHARS_PER_TOKEN
+    completion_tokens = sum(len(content) // CHARS_PER_TOKEN for content in contents)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "mock"),
+        "choices": [
+            {
+                "index": index,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+            for index, content in enumerate(contents)
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        },
+    }
+
+
+def load_recorded(path):
+    """
+    prompt key -> recorded chat-completions response body.
+    - *.sqlite: a completion cache (llm_cache.sqlite) from an earlier live run
+    - otherwise JSONL lines of {"request": {...}, "response": {...}}
+    """
+    if path.endswith((".sqlite", ".db")):
+        conn = sqlite3.connect(path)
+        try:
+            return {key: json.loads(body) for key, body in conn.execute("SELECT key, response FROM completions")}
+        finally:
+            conn.close()
+    recorded = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recorded[prompt_key(entry["request"])] = entry["response"]
+    return recorded
+
+
+def _latency_seconds(latency, rng):
+    if isinstance(latency, (tuple, list)):
+        return rng.uniform(*latency)
+    return latency
+
+
+class _LocalServer:
+    """Threaded HTTP server on host:port (0 = any free port) with start / stop."""
+
+    def __init__(self, host, port):
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        # shutdown() waits for serve_forever(), so it would hang on a server never started
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        raise NotImplementedError
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    # Headers and body go out in separate writes; without this, keep-alive
+    # clients wait ~40 ms for the delayed ACK on every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload, content_type="application/json", headers=None):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+
+class MockLLMServer(_LocalServer):
+    """
+    Threaded mock of the chat-completions and batch endpoints.
+    - respond(request) -> assistant content; defaults to synthetic_content,
+      called once per choice when the request asks for n > 1
+    - batch_polls: retrieve calls a batch stays "in_progress" before completing
+    - Prompt caching is simulated: usage reports the longest prefix (1024+
+      tokens, 128-token steps) already sent in an earlier request as cached
+    - recorded: load_recorded() path or dict; matching requests get the
+      recorded response, others a synthetic one (or a 404 with replay_only)
+    - latency: seconds (or a (low, high) range) added to each HTTP completion
+    - rate_limit_rate: share of HTTP completions answered with a 429 and
+      Retry-After: retry_after
+    - malformed_rate: share of answers replaced by a MALFORMED variant
+    - seed: makes the injected faults reproducible
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, respond=synthetic_content, batch_polls=1,
+                 recorded=None, replay_only=False, latency=0.0, rate_limit_rate=0.0, retry_after=1.0,
+                 malformed_rate=0.0, seed=None):
+        self.respond = respond
+        self.batch_polls = batch_polls
+        self.recorded = load_recorded(recorded) if isinstance(recorded, str) else (recorded or {})
+        self.replay_only = replay_only
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.malformed_rate = malformed_rate
+        self.files = {}
+        self.batches = {}
+        self.requests = 0
+        self.counts = {"replayed": 0, "synthetic": 0, "missing": 0, "rate_limited": 0, "malformed": 0}
+        self._rng = random.Random(seed)
+        self._prefixes = set()
+        self._lock = threading.Lock()
+        super().__init__(host, port)
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, **self.counts}
+
+    # ---------- API ----------
+    def _cached_tokens(self, request):
+        text = _prompt_text(request)
+        cached = 0
+        with self._lock:
+            for tokens in range(PREFIX_CACHE_MIN_TOKENS, len(text) // CHARS_PER_TOKEN + 1,
+                                PREFIX_CACHE_STEP_TOKENS):
+                digest = hashlib.sha256(text[:tokens * CHARS_PER_TOKEN].encode("utf-8")).digest()
+                if digest in self._prefixes:
+                    cached = tokens
+                self._prefixes.add(digest)
+        return cached
+
+    def _roll(self, rate):
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _malform(self, body):
+        for choice in body["choices"]:
+            if self._roll(self.malformed_rate):
+                with self._lock:
+                    variant = self._rng.choice(MALFORMED)
+                    self.counts["malformed"] += 1
+                choice["message"]["content"] = variant(choice["message"]["content"] or "")
+        return body
+
+    def complete(self, request):
+        """Response body for a chat-completions request; None if replay_only and nothing was recorded."""
+        with self._lock:
+            self.requests += 1
+        recorded = self.recorded.get(prompt_key(request))
+        if recorded is not None:
+            self._count("replayed")
+            body = json.loads(json.dumps(recorded))
+            body["id"] = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            return self._malform(body)
+        if self.replay_only:
+            self._count("missing")
+            return None
+        self._count("synthetic")
+        contents = [self.respond(request) for _ in range(request.get("n") or 1)]
+        return self._malform(completion_body(request, contents, self._cached_tokens(request)))
+
+    def handle_completion(self, request):
+        """(status, payload, headers) for one HTTP chat-completions call, with injected latency and 429s."""
+        delay = _latency_seconds(self.latency, self._rng)
+        if delay:
+            time.sleep(delay)
+        if self._roll(self.rate_limit_rate):
+            self._count("rate_limited")
+            return 429, {"error": {"code": "429", "message": "Rate limit reached (mock)"}}, {
+                "Retry-After": str(self.retry_after)}
+        body = self.complete(request)
+        if body is None:
+            return 404, {"error": {"code": "not_recorded", "message": "No recorded response for this request"}}, {}
+        return 200, body, {}
+
+    def _new_file(self, data, filename, purpose):
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self.files[file_id] = data
+        return {
+            "id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+            "filename": filename, "purpose": purpose, "status": "processed",
+        }
+
+    def create_batch(self, params):
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        batch = {
+            "id": batch_id, "object": "batch", "endpoint": params["endpoint"],
+            "input_file_id": params["input_file_id"],
+            "completion_window": params.get("completion_window", "24h"),
+            "status": "validating", "output_file_id": None, "error_file_id": None,
+            "created_at": int(time.time()), "errors": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "_polls": 0,
+        }
+        with self._lock:
+            self.batches[batch_id] = batch
+        return self._public(batch)
+
+    def retrieve_batch(self, batch_id):
+        with self._lock:
+            batch = self.batches[batch_id]
+            batch["_polls"] += 1
+            if batch["status"] == "validating":
+                batch["status"] = "in_progress"
+            ready = batch["status"] == "in_progress" and batch["_polls"] > self.batch_polls
+            if ready:
+                batch["status"] = "finalizing"
+        if ready:
+            self._run_batch(batch)
+        return self._public(batch)
+
+    def _run_batch(self, batch):
+        output, errors = [], []
+        for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            try:
+                body = self.complete(entry["body"])
+                if body is None:
+                    raise KeyError("no recorded response for this request")
+            except Exception as e:
+                errors.append({"id": f"req_{uuid.uuid4().hex[:8]}", "custom_id": entry["custom_id"],
+                               "response": None, "error": {"code": "server_error", "message": str(e)}})
+                continue
+            output.append({"id": f"req_{uuid.uuid4().hex[:8]}", "custom_id": entry["custom_id"],
+                           "response": {"status_code": 200, "body": body}, "error": None})
+        batch["request_counts"] = {"total": len(output) + len(errors),
+                                   "completed": len(output), "failed": len(errors)}
+        if output:
+            batch["output_file_id"] = self._new_file(
+                "".join(json.dumps(o) + "\n" for o in output).encode("utf-8"), "output.jsonl", "batch_output")["id"]
+        if errors:
+            batch["error_file_id"] = self._new_file(
+                "".join(json.dumps(e) + "\n" for e in errors).encode("utf-8"), "errors.jsonl", "batch_output")["id"]
+        batch["status"] = "completed"
+
+    @staticmethod
+    def _public(batch):
+        return {k: v for k, v in batch.items() if not k.startswith("_")}
+
+    # ---------- HTTP ----------
+    def _handler_class(self):
+        server = self
+
+        class Handler(_JSONHandler):
+            def do_POST(self):
+                path = self.path.split("?")[0].rstrip("/")
+                if path.endswith("/chat/completions"):
+                    status, payload, headers = server.handle_completion(json.loads(self._body()))
+                    return self._send(status, payload, headers=headers)
+                if path.endswith("/files"):
+                    return self._send(200, self._upload())
+                if path.endswith("/batches"):
+                    return self._send(200, server.create_batch(json.loads(self._body())))
+                self._send(404, {"error": {"message": f"No route for POST {path}"}})
+
+            def do_GET(self):
+                path = self.path.split("?")[0].rstrip("/")
+                match = re.search(r"/batches/([^/]+)$", path)
+                if match and match.group(1) in server.batches:
+                    return self._send(200, server.retrieve_batch(match.group(1)))
+                match = re.search(r"/files/([^/]+)/content$", path)
+                if match and match.group(1) in server.files:
+                    return self._send(200, server.files[match.group(1)], "application/octet-stream")
+                self._send(404, {"error": {"message": f"No route for GET {path}"}})
+
+            def _upload(self):
+                header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+                form = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + self._body())
+                fields, data, filename = {}, b"", "input.jsonl"
+                for part in form.iter_parts():
+                    name = part.get_param("name", header="content-disposition")
+                    if part.get_filename():
+                        data, filename = part.get_payload(decode=True), part.get_filename()
+                    else:
+                        fields[name] = part.get_content().strip()
+                return server._new_file(data, filename, fields.get("purpose", "batch"))
+
+        return Handler
+
+
+def load_pages(path):
+    """url -> {"body", "etag", "last_modified"} from an http_cache.sqlite pages table."""
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT url, body, etag, last_modified FROM pages").fetchall()
+    finally:
+        conn.close()
+    return {url: {"body": body, "etag": etag, "last_modified": last_modified}
+            for url, body, etag, last_modified in rows}
+
+
+class PageStub(_LocalServer):
+    """
+    Offline stand-in for the scraped websites.
+    - pages: load_pages() path or dict; GET /pages/<quoted url> returns the
+      recorded body (304 when If-None-Match matches its ETag), 404 otherwise
+    - latency / error_rate / seed: injected delay and 503s, as for MockLLMServer
+    - Point a scraper at it with PooledClient(rewrite=stub.rewrite)
+    """
+
+    def __init__(self, pages, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, seed=None):
+        self.pages = load_pages(pages) if isinstance(pages, str) else pages
+        self.latency = latency
+        self.error_rate = error_rate
+        self.counts = {"served": 0, "not_modified": 0, "missing": 0, "errors": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        super().__init__(host, port)
+
+    def rewrite(self, url):
+        return f"{self.url}/pages/{urllib.parse.quote(url, safe='')}"
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+    def lookup(self, path, etag=None):
+        """(status, body, headers) for a /pages/<quoted url> path."""
+        with self._lock:
+            delay = _latency_seconds(self.latency, self._rng)
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        page = self.pages.get(urllib.parse.unquote(path[len("/pages/"):])) if path.startswith("/pages/") else None
+        with self._lock:
+            if failed:
+                self.counts["errors"] += 1
+                return 503, b"Service Unavailable (stub)", {"Retry-After": "1"}
+            if page is None:
+                self.counts["missing"] += 1
+                return 404, b"Not recorded", {}
+            headers = {name: page[key] for name, key in (("ETag", "etag"), ("Last-Modified", "last_modified"))
+                       if page[key]}
+            if etag and etag == page["etag"]:
+                self.counts["not_modified"] += 1
+                return 304, b"", headers
+            self.counts["served"] += 1
+            return 200, page["body"].encode("utf-8"), headers
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(_JSONHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real sites
+
+            def do_GET(self):
+                status, body, headers = stub.lookup(self.path, self.headers.get("If-None-Match"))
+                if status == 304:
+                    self.send_response(304)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", "0")
+                    return self.end_headers()
+                self._send(status, body, "text/html; charset=utf-8", headers=headers)
+
+        return Handler
+
+
+def _latency_arg(value):
+    low, _, high = value.partition(",")
+    return (float(low), float(high)) if high else float(low)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local mock of the chat-completions and batch endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--batch-polls", type=int, default=1,
+                        help="retrieve calls before a batch completes (default: %(default)s)")
+    parser.add_argument("--replay", default=None,
+                        help="recorded completions: an llm_cache.sqlite or a JSONL file of request / response pairs")
+    parser.add_argument("--replay-only", action="store_true",
+                        help="answer unrecorded requests with a 404 instead of a synthetic table")
+    parser.add_argument("--latency", type=_latency_arg, default=0.0,
+                        help="seconds added to each completion, or a LOW,HIGH range")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of completions answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of malformed answers")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the injected faults")
+    parser.add_argument("--pages", default=None, help="also serve the pages of this http_cache.sqlite")
+    parser.add_argument("--pages-port", type=int, default=8001)
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer(
+        args.host, args.port, batch_polls=args.batch_polls, recorded=args.replay, replay_only=args.replay_only,
+        latency=args.latency, rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        malformed_rate=args.malformed_rate, seed=args.seed,
+    )
+    print(f"🧪 Mock LLM server on {server.url} ({len(server.recorded)} recorded completions)")
+    stub = None
+    if args.pages:
+        stub = PageStub(args.pages, args.host, args.pages_port, latency=args.latency, seed=args.seed).start()
+        print(f"🧪 Page stub on {stub.url} ({len(stub.pages)} pages); pass --page-stub {stub.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("📊 Mock stats:", server.stats(), stub.stats() if stub else "")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+import json
+import re
+
+from fair_eval.rubric import SCORE_MAXIMA
+from fair_eval.telemetry import telemetry
+
+# ================================
+# Score Extraction
+# ================================
+# One parser for every strategy. Answers are tried in this order:
+#   1. a JSON score object (structured-output mode, no markdown involved)
+#   2. the first table row holding all four score cells, e.g.
+#        | UCMR5 | F-Score (12/17) | A-Score (8/10) | I-Score (5/8) | R-Score (6/7) |
+#      bold labels, "F-Score: 12/17", "F Score (12 / 17)" and bare "12/17" cells
+#      are accepted too
+#   3. the last "F-Score ... 12/17"-style mention of each score anywhere
+# All patterns are precompiled and match line by line without nested or
+# DOTALL wildcards, so long chain-of-thought answers parse in linear time.
+
+SCORE_FIELDS = tuple((score, score[0], top) for score, top in SCORE_MAXIMA.items())
+JSON_FIELDS = {"F-Score": "f_score", "A-Score": "a_score", "I-Score": "i_score", "R-Score": "r_score"}
+
+
+def _score_cell(letter, top):
+    # Runs of spaces / "*" are matched by exactly one [ \t*]* each, and optional
+    # pieces start with a literal, so no run can be split two ways (no backtracking)
+    return (
+        rf"[ \t*]*(?:{letter}[- ]?Score[ \t*]*(?::[ \t*]*)?)?"
+        rf"(?:\([ \t]*)?(\d+)[ \t]*/[ \t]*{top}(?:[ \t]*\))?[ \t*]*\|"
+    )
+
+
+# The name cell keeps its padding; _clean_name strips it
+SCORE_ROW_PATTERN = re.compile(
+    r"^\|?([^|\n]*)\|" + "".join(_score_cell(letter, top) for _, letter, top in SCORE_FIELDS),
+    re.MULTILINE | re.IGNORECASE,
+)
+
+SCORE_MENTION_PATTERNS = {
+    field: re.compile(
+        rf"\b{letter}[- ]?Score[ \t*]*(?:[:=(][ \t*]*)?(\d+)[ \t]*(?:/|out of)[ \t]*{top}\b",
+        re.IGNORECASE,
+    )
+    for field, letter, top in SCORE_FIELDS
+}
+
+_CODE_FENCE = re.compile(r"^```[a-zA-Z]*[ \t]*\n?|\n?```[ \t]*$")
+
+
+def _empty_scores():
+    return {
+        "Dataset Name (Parsed)": None,
+        "F-Score": None,
+        "A-Score": None,
+        "I-Score": None,
+        "R-Score": None,
+        "Parse Success": False
+    }
+
+
+def _clean_name(name):
+    return name.strip().strip("*`").strip() if name is not None else None
+
+
+def load_json_answer(text):
+    """The JSON value of a structured-output answer (code fences allowed), or None."""
+    text = _CODE_FENCE.sub("", text.strip())
+    if not text.startswith(("{", "[")):
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _json_scores(entry):
+    parsed = _empty_scores()
+    if not isinstance(entry, dict):
+        return parsed
+    for field, key in JSON_FIELDS.items():
+        value = entry.get(key)
+        # bool is an int subclass; "true" is not a score
+        if not isinstance(value, int) or isinstance(value, bool):
+            return _empty_scores()
+        parsed[field] = value
+    name = entry.get("dataset_name")
+    parsed["Dataset Name (Parsed)"] = _clean_name(name) if isinstance(name, str) else None
+    parsed["Parse Success"] = True
+    return parsed
+
+
+def parse_scores(answer):
+    """Dataset name, the four scores and "Parse Success" from an LLM answer (JSON or markdown)."""
+    with telemetry.span("extract"):
+        return _parse_answer(answer or "")
+
+
+def _parse_answer(answer):
+    data = load_json_answer(answer)
+    if data is not None:
+        return _json_scores(data)
+
+    parsed = _empty_scores()
+    match = SCORE_ROW_PATTERN.search(answer)
+    if match:
+        parsed["Dataset Name (Parsed)"] = _clean_name(match.group(1))
+        for k, (field, _, _) in enumerate(SCORE_FIELDS, 2):
+            parsed[field] = int(match.group(k))
+        parsed["Parse Success"] = True
+        return parsed
+
+    for field, pattern in SCORE_MENTION_PATTERNS.items():
+        mentions = pattern.findall(answer)
+        if not mentions:
+            return _empty_scores()
+        parsed[field] = int(mentions[-1])
+    parsed["Parse Success"] = True
+    return parsed
+
+
+def extract_scores(markdown_str):
+    """parse_scores, as used by zero-shot CoT (includes "Parse Success")."""
+    return parse_scores(markdown_str)
+
+
+def extract_scores_from_markdown(markdown_str):
+    """parse_scores without the "Parse Success" key, as used by the one-shot / few-shot strategies."""
+    parsed = parse_scores(markdown_str)
+    del parsed["Parse Success"]
+    return parsed
+
+
+# ================================
+# Multi-dataset Answers
+# ================================
+# A grouped request asks for one table row (or, in structured-output mode, one
+# JSON object) per dataset. Rows are handed back to their datasets by
+# (normalized) name.
+
+
+def normalize_dataset_name(name):
+    """Case-, quote- and markdown-insensitive form of a dataset name for matching."""
+    return re.sub(r"[\s*_`\"']+", " ", str(name)).strip().casefold()
+
+
+def split_score_rows(markdown_str, dataset_names):
+    """
+    Per-dataset answer for each dataset name, or None where the answer has no row for it.
+    - Each returned answer is a one-line table row (or JSON object) that parse_scores accepts
+    - Names that occur more than once in dataset_names always get None
+    """
+    keys = [normalize_dataset_name(name) for name in dataset_names]
+    rows = {}
+    data = load_json_answer(markdown_str or "")
+    if data is not None:
+        entries = data.get("datasets") if isinstance(data, dict) else data
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, dict) and isinstance(entry.get("dataset_name"), str):
+                rows.setdefault(normalize_dataset_name(entry["dataset_name"]), json.dumps(entry))
+    else:
+        for match in SCORE_ROW_PATTERN.finditer(markdown_str or ""):
+            rows.setdefault(normalize_dataset_name(match.group(1)), match.group(0).strip())
+    # Two datasets with the same name cannot be told apart in the answer
+    return [rows.get(key) if keys.count(key) == 1 else None for key in keys]
+
+
+# ================================
+# Score Validation
+# ================================
+# Per-row checks used while building result rows; fair_eval.summary validates
+# whole result tables at once.
+def check_valid(row):
+    if not row.get("Parse Success"):
+        return False
+    return all(0 <= row[score] <= top for score, top in SCORE_MAXIMA.items())
+
+
+def check_fair_score_consistency(row):
+    checks = {
+        f"{score} Valid": row[score] is not None and 0 <= row[score] <= top
+        for score, top in SCORE_MAXIMA.items()
+    }
+    checks["All Valid"] = all(checks.values())
+    return checks
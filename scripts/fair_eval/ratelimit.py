@@ -0,0 +1,173 @@
+import email.utils
+import threading
+import time
+
+from fair_eval.telemetry import telemetry
+from fair_eval.tokens import estimate_prompt_tokens
+
+# ================================
+# Deployment Rate Limiter
+# ================================
+# Azure OpenAI enforces a requests-per-minute (RPM) and a tokens-per-minute
+# (TPM) quota per deployment, counting prompt tokens + max_tokens at request
+# time and checking them over short (~10 s) windows. Each deployment gets one
+# limiter with a token bucket per quota, shared by every worker thread.
+
+DEFAULT_WINDOW_SECONDS = 10
+DEFAULT_MAX_RETRIES = 5
+
+
+class TokenBucket:
+    """Refills at capacity / window_seconds per second, up to capacity."""
+
+    def __init__(self, per_minute, window_seconds=DEFAULT_WINDOW_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * window_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount can be taken (amounts above capacity wait for a full bucket)."""
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+    def take(self, amount):
+        # May go negative for oversized requests; the debt is paid off by refill.
+        self.level -= amount
+
+
+class RateLimiter:
+    """RPM + TPM limiter for a single deployment."""
+
+    def __init__(self, rpm, tpm, window_seconds=DEFAULT_WINDOW_SECONDS):
+        self.requests = TokenBucket(rpm, window_seconds)
+        self.tokens = TokenBucket(tpm, window_seconds)
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens):
+        """Block until one request carrying `tokens` fits both budgets."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return
+            time.sleep(wait)
+
+    def wait_time(self, tokens):
+        """Seconds acquire(tokens) would block right now (without taking anything)."""
+        with self._lock:
+            now = time.monotonic()
+            return max(
+                self.paused_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(tokens, now),
+            )
+
+    def settle(self, reserved, actual):
+        """Correct the TPM bucket once the real token count is known."""
+        with self._lock:
+            self.tokens.take(actual - reserved)
+
+    def pause(self, seconds):
+        """Hold every caller of this deployment, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(deployment, rpm, tpm, window_seconds=DEFAULT_WINDOW_SECONDS):
+    """Shared limiter for a deployment (created on first use)."""
+    with _limiters_lock:
+        if deployment not in _limiters:
+            _limiters[deployment] = RateLimiter(rpm, tpm, window_seconds)
+        return _limiters[deployment]
+
+
+# ================================
+# Rate-limited Chat Completion
+# ================================
+def _status_code(exc):
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def retry_after_seconds(exc):
+    """Parse retry-after-ms / Retry-After from an API error, or None."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None  # neither seconds nor an HTTP date, e.g. "soon"
+    return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def create_completion(client, prompt, limiter, max_retries=DEFAULT_MAX_RETRIES, meter=None):
+    """
+    client.chat.completions.create(**prompt), paced by the deployment limiter.
+    - Reserves estimated prompt tokens + max_tokens before sending
+    - On 429, pauses the whole deployment for Retry-After (or backoff) and retries
+    - meter: a UsageMeter that records the response's token usage
+    """
+    # n > 1 returns n completions, each up to max_tokens
+    max_tokens = prompt.get("max_tokens", 0) * prompt.get("n", 1)
+    reserved = estimate_prompt_tokens(prompt["messages"], prompt["model"]) + max_tokens
+
+    deployment = prompt["model"]
+    for attempt in range(max_retries + 1):
+        waited = time.perf_counter()
+        limiter.acquire(reserved)
+        telemetry.observe("rate_limit_wait_seconds", time.perf_counter() - waited, deployment=deployment)
+        try:
+            with telemetry.span("llm", deployment=deployment) as span:
+                span["attempt"] = attempt
+                response = client.chat.completions.create(**prompt)
+        except Exception as e:
+            status = _status_code(e)
+            telemetry.count("llm_errors_total", deployment=deployment, status=status)
+            if status != 429 or attempt == max_retries:
+                raise
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = min(2 ** attempt, 60)
+            print(f"⏳ Rate limited on {prompt['model']}, retrying in {delay:.1f}s")
+            limiter.pause(delay)
+            continue
+
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+            limiter.settle(reserved, usage.prompt_tokens + max_tokens)
+        if meter is not None:
+            meter.record(usage)
+        telemetry.record_usage(usage, deployment)
+        return response
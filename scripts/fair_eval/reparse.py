@@ -0,0 +1,236 @@
+import argparse
+import math
+import multiprocessing
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from fair_eval.consistency import AGGREGATE_COLUMN, SAMPLES_COLUMN, rescore_samples
+from fair_eval.rubric import SCORE_MAXIMA
+from fair_eval.strategies import example_checks, get_strategy, zero_shot_score
+
+# ================================
+# Re-parse Stored Answers
+# ================================
+# Every result row keeps the model's raw answer ("FAIR Raw Output" or, in the
+# one-/few-shot scripts' tables, "FAIR Evaluation Raw Output"), so improved
+# parsers or validators can be applied to finished runs without a single LLM
+# call. Self-consistency rows are re-scored from all their stored samples
+# (SAMPLES_COLUMN), re-aggregated the way the run did (AGGREGATE_COLUMN).
+# Result files are streamed in chunks of rows, the chunks are re-scored
+# in a process pool, and a copy with updated score columns is written:
+#   python -m fair_eval.reparse fair_scores_long.csv -o fair_scores_reparsed.csv
+#   python -m fair_eval.reparse fair_scores_parquet -o fair_scores_reparsed
+# A Parquet dataset keeps its layout (run= / strategy= / model= directories).
+
+RAW_COLUMNS = ("FAIR Raw Output", "FAIR Evaluation Raw Output")
+STRATEGY_COLUMNS = ("Strategy", "strategy")
+DEFAULT_CHUNK_ROWS = 5000
+SCORES = list(SCORE_MAXIMA)
+
+
+def _columns_for(raw_column, strategy):
+    """Score-column builder for rows of this layout (raw column + strategy, if known)."""
+    if raw_column == "FAIR Evaluation Raw Output":
+        return example_checks
+    if strategy:
+        return get_strategy(strategy).score
+    return zero_shot_score
+
+
+def rescore_rows(rows):
+    """Rows (dicts) with their score columns rebuilt from the stored raw answer."""
+    out = []
+    for row in rows:
+        raw_column = next((c for c in RAW_COLUMNS if c in row), None)
+        if raw_column is None:
+            raise ValueError(f"No raw answer column ({' / '.join(RAW_COLUMNS)}) in the result rows")
+        strategy = next((row[c] for c in STRATEGY_COLUMNS if isinstance(row.get(c), str)), None)
+        raw = row[raw_column] if isinstance(row[raw_column], str) else ""
+        samples = row.get(SAMPLES_COLUMN)
+        if isinstance(samples, str) and samples:
+            raw = rescore_samples(row.get("Dataset Name"), samples, row.get(AGGREGATE_COLUMN)) or raw
+        out.append({**row, **_columns_for(raw_column, strategy)(raw)})
+    return out
+
+
+def _score(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+class Changes:
+    """Counts of rows whose parsed scores changed."""
+
+    def __init__(self):
+        self.rows = 0
+        self.newly_parsed = 0
+        self.lost = 0
+        self.changed = 0
+
+    def add(self, old_rows, new_rows):
+        for old, new in zip(old_rows, new_rows):
+            before = [_score(old.get(s)) for s in SCORES]
+            after = [_score(new.get(s)) for s in SCORES]
+            self.rows += 1
+            self.newly_parsed += before[0] is None and after[0] is not None
+            self.lost += before[0] is not None and after[0] is None
+            self.changed += before != after
+
+    def stats(self):
+        return {"rows": self.rows, "changed": self.changed,
+                "newly_parsed": self.newly_parsed, "no_longer_parsed": self.lost}
+
+
+def _map_chunks(chunks, workers, changes):
+    """
+    rescore_rows over an iterable of row lists, in order.
+    - workers > 1: a fork process pool with at most 2 * workers chunks in
+      flight, so large files stream through in constant memory
+    """
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        for rows in chunks:
+            new_rows = rescore_rows(rows)
+            changes.add(rows, new_rows)
+            yield new_rows
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+        pending = deque()
+        for rows in chunks:
+            pending.append((rows, pool.submit(rescore_rows, rows)))
+            if len(pending) >= 2 * workers:
+                rows, future = pending.popleft()
+                new_rows = future.result()
+                changes.add(rows, new_rows)
+                yield new_rows
+        while pending:
+            rows, future = pending.popleft()
+            new_rows = future.result()
+            changes.add(rows, new_rows)
+            yield new_rows
+
+
+# ================================
+# CSV / Parquet Streaming
+# ================================
+def reparse_csv(src, dst, workers, chunk_rows=DEFAULT_CHUNK_ROWS, changes=None):
+    import pandas as pd
+
+    changes = changes if changes is not None else Changes()
+    columns = None
+    chunks = (chunk.to_dict("records") for chunk in pd.read_csv(src, chunksize=chunk_rows))
+    for rows in _map_chunks(chunks, workers, changes):
+        frame = pd.DataFrame(rows)
+        if columns is None:
+            columns = list(frame.columns)
+        frame.reindex(columns=columns).to_csv(dst, mode="a" if os.path.exists(dst) else "w",
+                                              header=not os.path.exists(dst), index=False)
+    return changes
+
+
+def _parquet_files(root):
+    if not os.path.isdir(root):
+        return [""]
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(root) for name in names if name.endswith(".parquet")
+    )
+
+
+def _strategy_from_path(relpath):
+    for part in relpath.split(os.sep):
+        if part.startswith("strategy="):
+            return unquote(part[len("strategy="):])
+    return None
+
+
+def reparse_parquet(src, dst, workers, chunk_rows=DEFAULT_CHUNK_ROWS, changes=None):
+    """Re-score every file of a Parquet file / dataset directory into the same layout under dst."""
+    from fair_eval.columnar import map_parquet_file
+
+    changes = changes if changes is not None else Changes()
+    for relpath in _parquet_files(src):
+        source = os.path.join(src, relpath) if relpath else src
+        target = os.path.join(dst, relpath) if relpath else dst
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        # The strategy is a partition directory, not a column, in the dataset files
+        strategy = _strategy_from_path(relpath)
+
+        def with_strategy(batches):
+            for rows in batches:
+                yield [dict(row, strategy=strategy) for row in rows] if strategy else rows
+
+        map_parquet_file(source, target, lambda batches: _map_chunks(with_strategy(batches), workers, changes),
+                         batch_rows=chunk_rows)
+    return changes
+
+
+def reparse(src, dst, workers=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Re-score the result table at src (CSV, Parquet file or dataset directory) into dst.
+    - dst == src replaces the results once the new copy is complete
+    - workers: processes (default one per CPU; 0 or 1 re-scores in-process)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parquet = os.path.isdir(src) or src.endswith(".parquet")
+    in_place = os.path.abspath(src) == os.path.abspath(dst)
+    target = dst + ".reparse-tmp" if in_place else dst
+    if os.path.exists(target):
+        raise FileExistsError(f"{target} already exists; remove it or choose another output")
+
+    if parquet:
+        changes = reparse_parquet(src, target, workers, chunk_rows)
+    else:
+        changes = reparse_csv(src, target, workers, chunk_rows)
+
+    if in_place:
+        if os.path.isdir(src):
+            shutil.rmtree(src)
+        os.replace(target, dst)
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m fair_eval.reparse",
+        description="Re-parse and re-validate the stored raw LLM answers of a result table, without LLM calls.",
+    )
+    parser.add_argument("results", help="result CSV, or a Parquet file / dataset directory")
+    parser.add_argument("-o", "--output", default=None,
+                        help="where to write the re-scored copy (default: <results>.reparsed[.csv])")
+    parser.add_argument("--in-place", action="store_true", help="replace the results once the copy is complete")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="parse processes (default: one per CPU; 0 = in-process)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="rows per chunk read, re-scored and written at a time (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.in_place and args.output:
+        parser.error("--in-place and --output are mutually exclusive")
+
+    if args.in_place:
+        output = args.results
+    elif args.output:
+        output = args.output
+    else:
+        stem, ext = os.path.splitext(args.results.rstrip(os.sep))
+        output = stem + ".reparsed" + (ext if ext in (".csv", ".parquet") else "")
+    try:
+        changes = reparse(args.results, output, workers=args.workers, chunk_rows=args.chunk_rows)
+    except (FileExistsError, ValueError) as e:
+        raise SystemExit(f"❌ {e}") from None
+    stats = changes.stats()
+    print(f"🔁 Re-parsed {stats['rows']} rows: {stats['changed']} with changed scores, "
+          f"{stats['newly_parsed']} newly parsed, {stats['no_longer_parsed']} no longer parsed")
+    print("✅ Re-scored results saved to:", output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from fair_eval.consistency import scored_text
+from fair_eval.parsing import check_valid, parse_scores
+from fair_eval.ratelimit import (
+    DEFAULT_MAX_RETRIES,
+    _status_code,
+    create_completion,
+    get_rate_limiter,
+    retry_after_seconds,
+)
+from fair_eval.telemetry import telemetry
+from fair_eval.tokens import estimate_prompt_tokens
+
+# ================================
+# Multi-deployment Router
+# ================================
+# A model (the "model" of a request, e.g. gpt-4o) can be served by several
+# deployments, on one or more endpoints, each with its own RPM/TPM quota.
+# Every call goes to the deployment expected to answer first (quota wait plus
+# recent latency, times the calls already in flight there); among those within
+# `slack` seconds of the fastest, the cheapest wins. On 429, 5xx or a
+# connection error that deployment is paused and the call fails over to the
+# next one, so throughput grows with the number of deployments.
+# Requests keep their model name, so completion-cache keys do not depend on
+# which deployment answered.
+#
+# Optional cascade: "easy" pages (short snippet, license detected) are scored
+# by easy_model first and escalated to the requested model when that answer
+# does not parse, has out-of-range scores, or its self-consistency samples
+# never agreed.
+
+DEFAULT_SLACK_SECONDS = 1.0
+DEFAULT_LATENCY_SECONDS = 5.0  # assumed for a deployment before its first answer
+LATENCY_SMOOTHING = 0.3
+EASY_SNIPPET_TOKENS = 300
+FAILURE_BACKOFF_MAX = 60
+
+
+def _failover_status(status):
+    # No status: connection error or timeout
+    return status is None or status == 429 or status >= 500
+
+
+class Deployment:
+    """One deployment of a model on one endpoint, with its own quota."""
+
+    def __init__(self, model, name, client, rpm, tpm, price=None, endpoint=None):
+        self.model = model
+        self.name = name
+        self.client = client
+        self.price = price or 0.0
+        self.label = f"{urlsplit(endpoint).hostname}/{name}" if endpoint else name
+        self.limiter = get_rate_limiter(self.label, rpm=rpm, tpm=tpm)
+        self.latency = None
+        self.in_flight = 0
+        self.failures = 0
+        self.calls = 0
+        self.errors = 0
+
+    def eta(self, tokens):
+        """Expected seconds until a call carrying `tokens` would be answered."""
+        latency = DEFAULT_LATENCY_SECONDS if self.latency is None else self.latency
+        return self.limiter.wait_time(tokens) + latency * (1 + self.in_flight)
+
+
+def easy_page(scraped, max_snippet_tokens=EASY_SNIPPET_TOKENS):
+    """Short page with a detected license: worth trying on the cheaper model first."""
+    return (scraped.get("snippet_tokens") or 0) <= max_snippet_tokens and \
+        scraped.get("license_info") not in ("Not detected", "N/A", None)
+
+
+def confident(fair_output):
+    """Parsed, in-range scores (and, for self-consistency answers, samples that agreed)."""
+    stats = getattr(fair_output, "stats", None)
+    if stats is not None and not stats["agreed"]:
+        return False
+    return check_valid(parse_scores(scored_text(fair_output)))
+
+
+class RoutedAnswer(str):
+    """Answer text from a cascade; .model is the model that produced it."""
+
+
+def _answered_by(fair_output, model):
+    if not hasattr(fair_output, "__dict__"):
+        fair_output = RoutedAnswer(fair_output)
+    fair_output.model = model
+    return fair_output
+
+
+def routing_columns(fair_output):
+    """Cascade column for a result row ({} when the cascade is off)."""
+    model = getattr(fair_output, "model", None)
+    return {} if model is None else {"Answered By": model}
+
+
+class Router:
+    """
+    Spreads chat-completion calls over the deployments of each model.
+    - pools: {model: [Deployment, ...]}
+    - easy_model: model that easy pages try first (None = no cascade)
+    """
+
+    def __init__(self, pools, easy_model=None, slack=DEFAULT_SLACK_SECONDS, max_retries=DEFAULT_MAX_RETRIES):
+        if easy_model is not None and easy_model not in pools:
+            raise ValueError(f"No deployment serves the easy model {easy_model!r}")
+        self.pools = pools
+        self.easy_model = easy_model
+        self.slack = slack
+        self.max_retries = max_retries
+        self.failovers = 0
+        self.escalations = 0
+        self._lock = threading.Lock()
+
+    @property
+    def width(self):
+        """Deployments of the largest pool (scale LLM concurrency by this)."""
+        return max(len(pool) for pool in self.pools.values())
+
+    def _pick(self, pool, tokens):
+        with self._lock:
+            etas = [(deployment.eta(tokens), deployment) for deployment in pool]
+            fastest = min(eta for eta, _ in etas)
+            _, deployment = min(
+                ((eta, d) for eta, d in etas if eta <= fastest + self.slack),
+                key=lambda item: (item[1].price, item[0]),
+            )
+            deployment.in_flight += 1
+            return deployment
+
+    def _done(self, deployment, seconds=None, failed=False):
+        with self._lock:
+            deployment.in_flight -= 1
+            deployment.calls += 1
+            if failed:
+                deployment.errors += 1
+                deployment.failures += 1
+            else:
+                deployment.failures = 0
+                deployment.latency = seconds if deployment.latency is None else (
+                    LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * deployment.latency)
+
+    def create(self, prompt, meter=None):
+        """
+        Chat-completions response for prompt from one of its model's deployments.
+        - 429 / 5xx / connection errors pause that deployment (Retry-After, or
+          exponential backoff) and the call moves on; other errors are raised
+        - Gives up after max_retries failovers beyond one try per deployment
+        """
+        model = prompt["model"]
+        try:
+            pool = self.pools[model]
+        except KeyError:
+            raise ValueError(f"No deployment serves model {model!r}; add one to the deployments") from None
+        tokens = estimate_prompt_tokens(prompt["messages"], model) + prompt.get("max_tokens", 0) * prompt.get("n", 1)
+
+        for attempt in range(len(pool) + self.max_retries):
+            deployment = self._pick(pool, tokens)
+            start = time.perf_counter()
+            try:
+                response = create_completion(deployment.client, dict(prompt, model=deployment.name),
+                                             deployment.limiter, max_retries=0, meter=meter)
+            except Exception as e:
+                self._done(deployment, failed=True)
+                status = _status_code(e)
+                if not _failover_status(status) or attempt == len(pool) + self.max_retries - 1:
+                    raise
+                delay = retry_after_seconds(e) if status == 429 else None
+                if delay is None:
+                    delay = min(2 ** (deployment.failures - 1), FAILURE_BACKOFF_MAX)
+                deployment.limiter.pause(delay)
+                with self._lock:
+                    self.failovers += 1
+                telemetry.count("router_failovers_total", deployment=deployment.label, status=status)
+                print(f"🔀 {deployment.label} failed ({status or type(e).__name__}); "
+                      f"pausing it {delay:.1f}s and failing over")
+                continue
+            self._done(deployment, time.perf_counter() - start)
+            return response
+
+    def cascade(self, model, scraped, attempt):
+        """
+        attempt(model) -> answer, tried on easy_model first for easy pages.
+        - Escalates to `model` when the cheap answer is not confident()
+        - Answers carry the model that produced them (see routing_columns)
+        """
+        if self.easy_model is None:
+            return attempt(model)
+        if self.easy_model != model and easy_page(scraped):
+            fair_output = attempt(self.easy_model)
+            if confident(fair_output):
+                return _answered_by(fair_output, self.easy_model)
+            with self._lock:
+                self.escalations += 1
+            telemetry.count("router_escalations_total", model=self.easy_model)
+            print(f"⬆️ Low-confidence answer from {self.easy_model}; escalating to {model}")
+        return _answered_by(attempt(model), model)
+
+    def stats(self):
+        deployments = {
+            d.label: {"calls": d.calls, "errors": d.errors,
+                      "latency_s": round(d.latency, 2) if d.latency is not None else None}
+            for pool in self.pools.values() for d in pool
+        }
+        return {"deployments": deployments, "failovers": self.failovers, "escalations": self.escalations}
+
+
+def build_router(entries, client, api_version, easy_model=None):
+    """
+    Router from deployment entries (dicts):
+    - model, deployment (defaults to model), rpm, tpm, price (per 1M prompt tokens)
+    - endpoint, api_key_env, api_version: another Azure endpoint; without an
+      endpoint the entry uses `client`
+    """
+    pools, clients = {}, {}
+    for entry in entries:
+        endpoint = entry.get("endpoint")
+        deployment_client = client
+        if endpoint:
+            key = (endpoint, entry.get("api_key_env", "AZURE_OPENAI_API_KEY"))
+            if key not in clients:
+                import openai
+
+                try:
+                    api_key = os.environ[key[1]]
+                except KeyError:
+                    raise SystemExit(f"Set {key[1]} in the environment for {endpoint}.") from None
+                clients[key] = openai.AzureOpenAI(api_key=api_key, azure_endpoint=endpoint,
+                                                  api_version=entry.get("api_version", api_version))
+            deployment_client = clients[key]
+        model = entry["model"]
+        pools.setdefault(model, []).append(Deployment(
+            model, entry.get("deployment", model), deployment_client, rpm=entry["rpm"], tpm=entry["tpm"],
+            price=entry.get("price"), endpoint=endpoint,
+        ))
+    return Router(pools, easy_model=easy_model)
@@ -0,0 +1,152 @@
+# ================================
+# FAIR Scoring Rubric
+# ================================
+SCORING_RULES = """
+Evaluate the FAIR (Findable, Accessible, Interoperable, Reusable) principles using the scoring rubric:
+
+### 1. Findable (Max: 17)
+- Identifiers:
+  - 8: DOI, PURL, ARK, Handle
+  - 3: URL
+  - 1: Local ID
+  - 0: None
+- Identifier in metadata: 1 or 0
+- Metadata description:
+  - 4: Comprehensive, machine-readable
+  - 3: Comprehensive, non-standard
+  - 2: Basic title/desc
+  - 0: None
+- Repository inclusion:
+  - 4: Multiple repos
+  - 2: General/domain-specific
+  - 0: None
+
+### 2. Accessible (Max: 10)
+- Data access:
+  - 5: Public or stated conditions
+  - 4: De-identified subset
+  - 3: Embargoed
+  - 2: Unclear
+  - 1: Metadata only
+  - 0: No access
+- Online availability:
+  - 4: Standard API
+  - 3: Non-standard API
+  - 2: File download
+  - 1: On request
+  - 0: None
+- Metadata persistence: 1 or 0
+
+### 3. Interoperable (Max: 8)
+- Format:
+  - 2: Open machine-readable
+  - 1: Structured non-machine-readable
+  - 0: Proprietary
+- Vocab/ontologies:
+  - 3: Open & resolvable
+  - 2: Standardized only
+  - 1: No standard
+  - 0: No description
+- Metadata linking:
+  - 3: Linked data (e.g., RDF)
+  - 2: URI links
+  - 0: None
+
+### 4. Reusable (Max: 7)
+- License:
+  - 4: Machine-readable (e.g., CC)
+  - 3: Standard text
+  - 2: Non-standard
+  - 0: No license
+- Provenance:
+  - 3: Machine-readable
+  - 2: Full, text format
+  - 1: Partial
+  - 0: None
+"""
+
+# Maximum points per principle in SCORING_RULES (42 in total)
+SCORE_MAXIMA = {"F-Score": 17, "A-Score": 10, "I-Score": 8, "R-Score": 7}
+
+# ================================
+# Worked Examples
+# ================================
+# One-shot CoT with the EPA UCMR3 example
+ONESHOT_EXAMPLE_EPA = """
+Example:
+
+Dataset: "EPA UCMR3 PFAS Data"
+Link: https://www.epa.gov/dwucmr/occurrence-data-unregulated-contaminant-monitoring-rule#3
+
+Step-by-step evaluation:
+- Findable: URL (3), identifier in metadata (1), basic metadata (3), listed in EPA repo (2) → F-Score = 9/17
+- Accessible: Public access (5), direct file download (2), persistent metadata (1) → A-Score = 8/10
+- Interoperable: Open CSV format (2), uses standardized vocabularies (3), no linked metadata (2) → I-Score = 7/8
+- Reusable: Machine-readable license missing (2), provenance described in text (2) → R-Score = 4/7
+
+Final score:
+| Dataset Name | F-Score (9/17) | A-Score (8/10) | I-Score (7/8) | R-Score (4/7) |
+
+---
+
+Now evaluate the following dataset:
+"""
+
+# One-shot CoT with the National Earthquake Information Database example
+ONESHOT_EXAMPLE_NE = """
+
+Example:
+
+Dataset: "National Earthquake Information Database"
+Link: https://www.gns.cri.nz/data-and-resources/national-earthquake-information-database/
+
+Step-by-step evaluation:
+- Findable: 12/17
+- Accessible: 8/10
+- Interoperable: 5/8
+- Reusable: 5/7
+
+Final score:
+| Dataset Name | F-Score (12/17) | A-Score (8/10) | I-Score (5/8) | R-Score (5/7) |
+
+---
+
+Now evaluate the following dataset:
+"""
+
+# Few-shot CoT with both examples
+FEWSHOT_EXAMPLE = """
+Example:
+
+Dataset: "EPA UCMR3 PFAS Data"
+Link: https://www.epa.gov/dwucmr/occurrence-data-unregulated-contaminant-monitoring-rule#3
+
+Step-by-step evaluation:
+- Findable: URL (3), identifier in metadata (1), basic metadata (3), listed in EPA repo (2) → F-Score = 9/17
+- Accessible: Public access (5), direct file download (2), persistent metadata (1) → A-Score = 8/10
+- Interoperable: Open CSV format (2), uses standardized vocabularies (3), no linked metadata (2) → I-Score = 7/8
+- Reusable: Machine-readable license missing (2), provenance described in text (2) → R-Score = 4/7
+
+Final score:
+| Dataset Name | F-Score (9/17) | A-Score (8/10) | I-Score (7/8) | R-Score (4/7) |
+
+---
+
+Example:
+
+Dataset: "National Earthquake Information Database"
+Link: https://www.gns.cri.nz/data-and-resources/national-earthquake-information-database/
+
+Step-by-step evaluation:
+- Findable: 12/17
+- Accessible: 8/10
+- Interoperable: 5/8
+- Reusable: 5/7
+
+Final score:
+| Dataset Name | F-Score (12/17) | A-Score (8/10) | I-Score (5/8) | R-Score (5/7) |
+
+---
+
+Now evaluate the following dataset:
+"""
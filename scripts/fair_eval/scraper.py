@@ -0,0 +1,125 @@
+import functools
+from urllib.parse import urlsplit
+
+from fair_eval.http_cache import cached_get
+from fair_eval.matchers import HTML_CUES, TEXT_CUES, is_download_link
+from fair_eval.snippet import select_snippet
+from fair_eval.telemetry import telemetry
+from fair_eval.tokens import count_tokens
+
+# ================================
+# Website Scraper
+# ================================
+# Fetching goes through the shared HTTP cache and pooled client; parsing is a
+# plain module-level function so the engine can ship it to a process pool.
+# lxml and BeautifulSoup are imported on the first parse, not with the module.
+
+
+def parse_html(html, streaming=True, snippet_tokens=None, model="gpt-4o"):
+    """
+    Extract key metadata from a fetched page (runs in the parse stage).
+    - snippet_tokens: token budget for the cue-prioritized text snippet;
+      None keeps the first 2000 characters
+    """
+    if streaming:
+        from fair_eval.extract import extract_page
+
+        return extract_page(html, snippet_tokens=snippet_tokens, model=model)
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+
+    # Title
+    title = soup.title.string.strip() if soup.title else "Not found"
+
+    # Meta description
+    meta_desc = soup.find("meta", attrs={"name": "description"})
+    description = meta_desc["content"].strip() if meta_desc else "Not found"
+
+    # Page text for license cues + context
+    text = soup.get_text(" ", strip=True)
+    text_cues = TEXT_CUES.scan(text)
+    found_license = TEXT_CUES.ordered("license", text_cues)
+    license_info = ", ".join(found_license) if found_license else "Not detected"
+
+    # Identifiers + file formats from the raw HTML (one scan)
+    html_cues = HTML_CUES.scan(html)
+    identifiers = HTML_CUES.ordered("identifier", html_cues)
+    identifier_info = ", ".join(identifiers) if identifiers else "Not detected"
+    file_formats = list(html_cues["format"]) if "format" in html_cues else ["None detected"]
+
+    # Downloadable links
+    download_links = [
+        a["href"] for a in soup.find_all("a", href=True)
+        if is_download_link(a["href"])
+    ]
+    download_links = download_links if download_links else ["None detected"]
+
+    # Text snippet for the prompt
+    if snippet_tokens:
+        snippet, tokens = select_snippet(text, snippet_tokens, model)
+    else:
+        snippet = text[:2000]  # trim for token control
+        tokens = count_tokens(snippet, model)
+
+    return {
+        "title": title,
+        "description": description,
+        "license_info": license_info,
+        "identifier_info": identifier_info,
+        "file_formats": file_formats,
+        "download_links": download_links,
+        "raw_text_snippet": snippet,
+        "snippet_tokens": tokens
+    }
+
+
+def scrape_error(e):
+    return {
+        "title": "Error scraping website",
+        "description": str(e),
+        "license_info": "N/A",
+        "identifier_info": "N/A",
+        "file_formats": ["N/A"],
+        "download_links": ["N/A"],
+        "raw_text_snippet": "",
+        "snippet_tokens": 0
+    }
+
+
+class Scraper:
+    """Fetch + parse configuration shared by the scripts and the CLI."""
+
+    def __init__(self, http_cache, http_client, streaming=True, timeout=10, snippet_tokens=None,
+                 model="gpt-4o"):
+        self.http_cache = http_cache
+        self.http_client = http_client
+        self.streaming = streaming
+        self.snippet_tokens = snippet_tokens
+        self.model = model
+        self.timeout = timeout
+
+    def fetch_html(self, url):
+        with telemetry.span("fetch", host=urlsplit(url).hostname) as span:
+            span["url"] = url
+            return cached_get(url, self.http_cache, session=self.http_client, timeout=self.timeout)
+
+    @property
+    def parse(self):
+        # partial of a module-level function pickles cleanly for the process pool
+        return functools.partial(parse_html, streaming=self.streaming,
+                                 snippet_tokens=self.snippet_tokens, model=self.model)
+
+    def scrape_website(self, url):
+        """Fetch HTML content and extract key metadata for FAIR evaluation."""
+        try:
+            html = self.fetch_html(url)
+            with telemetry.span("parse"):
+                return self.parse(html)
+        except Exception as e:
+            return scrape_error(e)
+
+    def stages(self):
+        """fetch / parse / on_scrape_error arguments for run_pipeline."""
+        return {"fetch": self.fetch_html, "parse": self.parse, "on_scrape_error": scrape_error}
@@ -0,0 +1,180 @@
+import argparse
+
+from fair_eval.checkpoint import side_path
+from fair_eval.strategies import get_strategy
+
+# ================================
+# Single-strategy Script Runner
+# ================================
+# The LLM_FAIR_Final_* scripts differ only in their strategy, output paths and
+# messages. Each keeps its settings as module constants (Azure configuration,
+# caches, extraction, evaluation and pipeline knobs) and hands them here:
+#   run_script("few-shot-cot", input_csv, output_csv, globals(), description=...)
+# The API client, caches and heavy imports are only set up once run_script()
+# is called, so importing a script stays cheap.
+
+
+def run_script(strategy_name, input_csv, output_csv, settings, description,
+               done_message="✅ All done! Output saved to:", argv=None):
+    """
+    Parse --resume / --batch and run one strategy over input_csv into output_csv.
+    - settings: the script's configuration constants (e.g. its globals())
+    - Side files (checkpoint log, batch state) are named after output_csv and
+      the strategy, since several scripts write the same output_csv
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--resume", action="store_true", help="skip rows already in the checkpoint log")
+    parser.add_argument("--batch", action="store_true", help="submit all prompts as one Batch API job")
+    args = parser.parse_args(argv)
+    if settings["SELF_CONSISTENCY_SAMPLES"] > 1 and (args.batch or settings["GROUP_SIZE"] > 1):
+        # Batch requests and grouped calls carry one sample per dataset
+        parser.error("SELF_CONSISTENCY_SAMPLES > 1 cannot be combined with --batch or GROUP_SIZE > 1")
+
+    strategy = get_strategy(strategy_name)
+    checkpoint_path = side_path(output_csv, f".{strategy.name}.checkpoint.jsonl")
+    batch_path = side_path(output_csv, f".{strategy.name}.batch.jsonl")
+    model = settings["AZURE_DEPLOYMENT_NAME"]
+    layout = settings["PROMPT_LAYOUT"]
+    structured = settings["STRUCTURED_OUTPUT"]
+    group_size = settings["GROUP_SIZE"]
+    output_parquet = settings.get("output_parquet")
+    metrics_path = settings.get("metrics_path")
+    trace_path = settings.get("trace_path")
+
+    import openai
+    import pandas as pd
+
+    from fair_eval.batch import BatchJob, run_batch
+    from fair_eval.checkpoint import CheckpointLog
+    from fair_eval.consistency import SelfConsistency
+    from fair_eval.engine import run_pipeline
+    from fair_eval.http_cache import HttpCache
+    from fair_eval.http_client import PooledClient, page_stub_rewrite
+    from fair_eval.llm_cache import CompletionCache
+    from fair_eval.router import build_router
+    from fair_eval.scraper import Scraper
+    from fair_eval.telemetry import telemetry
+    from fair_eval.tokens import UsageMeter
+
+    # ✅ Configure Azure OpenAI client
+    client = openai.AzureOpenAI(
+        api_key=settings["AZURE_OPENAI_API_KEY"],
+        azure_endpoint=settings["AZURE_OPENAI_ENDPOINT"],
+        api_version=settings["AZURE_API_VERSION"]
+    )
+    router = build_router(settings["AZURE_DEPLOYMENTS"], client, settings["AZURE_API_VERSION"],
+                          easy_model=settings["EASY_MODEL"])
+    completion_cache = CompletionCache(settings["LLM_CACHE_PATH"],
+                                       max_bytes=settings["LLM_CACHE_MAX_MB"] * 1024 * 1024)
+    http_cache = HttpCache(settings["HTTP_CACHE_PATH"], ttl_seconds=settings["HTTP_CACHE_TTL_HOURS"] * 3600)
+    page_stub_url = settings.get("PAGE_STUB_URL")
+    http_client = PooledClient(
+        max_per_host=settings["HTTP_MAX_PER_HOST"], politeness_delay=settings["HTTP_POLITENESS_DELAY"],
+        rewrite=page_stub_rewrite(page_stub_url) if page_stub_url else None,
+    )
+    scraper = Scraper(http_cache, http_client, streaming=settings["STREAMING_EXTRACT"],
+                      snippet_tokens=settings["SNIPPET_TOKENS"], model=model)
+    sampler = SelfConsistency(settings["SELF_CONSISTENCY_SAMPLES"], tolerance=settings["SELF_CONSISTENCY_TOLERANCE"],
+                              aggregate=settings["SELF_CONSISTENCY_AGGREGATE"])
+    usage_meter = UsageMeter()
+    telemetry.configure(trace=bool(trace_path))
+
+    def build_request(dataset_name, website_link, scraped_data):
+        return strategy.request(model, dataset_name, website_link, scraped_data,
+                                layout=layout, structured=structured)
+
+    def respond(prompt):
+        return completion_cache.get_or_create(
+            prompt, lambda: router.create(prompt, meter=usage_meter)
+        )
+
+    def complete(prompt):
+        return respond(prompt).choices[0].message.content
+
+    def evaluate_fair_principles(dataset_name, website_link, scraped_data):
+        def attempt(routed_model):
+            prompt = strategy.request(routed_model, dataset_name, website_link, scraped_data,
+                                      layout=layout, structured=structured)
+            if sampler.enabled:
+                return sampler.answer(prompt, dataset_name, respond)
+            # Unparseable answers get one follow-up asking for just the scores
+            return strategy.answer(prompt, dataset_name, complete)
+
+        # Easy pages try EASY_MODEL first when it is set
+        return router.cascade(model, scraped_data, attempt)
+
+    def evaluate_group(items):
+        """Score several (dataset_name, website_link, scraped_data) items in one call."""
+        prompt = strategy.group_request(model, items, structured=structured)
+        return strategy.split_group_answer(complete(prompt), [item[0] for item in items])
+
+    df = pd.read_csv(input_csv)
+    checkpoint = CheckpointLog(checkpoint_path, strategy=strategy.name, model=model, resume=args.resume)
+
+    build_result = strategy.legacy_row
+    parquet_sink = None
+    if output_parquet:
+        from fair_eval.columnar import ParquetDatasetWriter
+
+        # Rows stream into the Parquet dataset as they are finished
+        parquet_sink = ParquetDatasetWriter(output_parquet, strategy=strategy.name, model=model)
+    on_result = parquet_sink.write if parquet_sink else None
+
+    try:
+        if args.batch:
+            # Asynchronous Batch API job (needs a batch deployment); --resume re-polls it
+            batch_job = BatchJob(client, batch_path)
+            results = run_batch(
+                df,
+                batch_job,
+                build_request=build_request,
+                build_result=build_result,
+                **scraper.stages(),
+                completion_cache=completion_cache,
+                checkpoint=checkpoint,
+                on_result=on_result,
+                resume=args.resume,
+                meter=usage_meter,
+                scrape_concurrency=settings["SCRAPE_CONCURRENCY"],
+                parse_workers=settings["PARSE_WORKERS"],
+                dedup=settings["DEDUP"],
+            )
+        else:
+            results = run_pipeline(
+                df,
+                **scraper.stages(),
+                evaluate=evaluate_fair_principles,
+                build_result=build_result,
+                scrape_concurrency=settings["SCRAPE_CONCURRENCY"],
+                llm_concurrency=settings["LLM_CONCURRENCY"] * router.width,
+                parse_workers=settings["PARSE_WORKERS"],
+                checkpoint=checkpoint,
+                on_result=on_result,
+                group_size=group_size,
+                evaluate_group=evaluate_group,
+                dedup=settings["DEDUP"],
+            )
+    finally:
+        # Finish the Parquet files even if the run stops early
+        if parquet_sink is not None:
+            parquet_sink.close()
+
+    # ================================
+    # Save Results
+    # ================================
+    with telemetry.span("write", target="results"):
+        pd.DataFrame(results).to_csv(output_csv, index=False)
+    checkpoint.compact()
+
+    print("\n" + done_message, output_csv)
+    print("🧮 Prompt tokens:", usage_meter.stats())
+    print("💾 Completion cache:", completion_cache.stats())
+    print("💾 HTTP cache:", http_cache.stats())
+    print("🔌 HTTP connections:", http_client.stats())
+    print("🔀 Router:", router.stats())
+    telemetry.report()
+    if metrics_path:
+        telemetry.write_metrics(metrics_path)
+    if trace_path:
+        telemetry.write_trace(trace_path)
+    return results
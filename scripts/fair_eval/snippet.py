@@ -0,0 +1,115 @@
+import heapq
+import re
+
+from fair_eval.matchers import SENTENCE_CUES
+from fair_eval.tokens import count_tokens
+
+# ================================
+# Token-budget Snippet Selector
+# ================================
+# Instead of the first 2000 characters of page text, the prompt gets the
+# sentences that fit a token budget, chosen in this order:
+#   1. the leading sentences, up to LEAD_SHARE of the budget (page context)
+#   2. sentences with rubric cues (license, identifiers, API / access,
+#      metadata, provenance), most cue categories first, earlier first
+#   3. the remaining sentences in page order
+# Chosen sentences are emitted in page order; gaps are marked with " … ".
+# Text is fed piece by piece and only about two budgets' worth of sentences
+# are held, so the streaming extractor stays bounded on huge pages.
+
+SNIPPET_TOKENS = 500  # about the old 2000-character slice
+LEAD_SHARE = 0.25
+MAX_SENTENCE_CHARS = 400  # longer runs without punctuation are cut into pieces
+GAP = " … "
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class SnippetSelector:
+    """Streaming sentence selector: feed() text, then finish() -> (snippet, tokens)."""
+
+    def __init__(self, budget_tokens=SNIPPET_TOKENS, model="gpt-4o", lead_share=LEAD_SHARE):
+        self.budget = budget_tokens
+        self.model = model
+        self.lead_budget = int(budget_tokens * lead_share)
+        self._carry = ""
+        self._index = 0
+        self._lead = []  # (index, sentence, tokens)
+        self._lead_tokens = 0
+        self._lead_open = True
+        self._cues = []  # min-heap of (priority, -index, sentence, tokens)
+        self._cue_tokens = 0
+        self._fill = []  # (index, sentence, tokens)
+        self._fill_tokens = 0
+
+    def feed(self, text):
+        parts = _SENTENCE_END.split(self._carry + text)
+        self._carry = parts.pop()
+        for sentence in parts:
+            self._add(sentence)
+        while len(self._carry) > MAX_SENTENCE_CHARS:
+            self._add(self._carry[:MAX_SENTENCE_CHARS])
+            self._carry = self._carry[MAX_SENTENCE_CHARS:]
+
+    def _add(self, sentence):
+        for start in range(0, len(sentence), MAX_SENTENCE_CHARS):
+            self._add_one(sentence[start:start + MAX_SENTENCE_CHARS].strip())
+
+    def _add_one(self, sentence):
+        if not sentence:
+            return
+        index = self._index
+        self._index += 1
+        if self._lead_open:
+            tokens = count_tokens(sentence, self.model)
+            if self._lead_tokens + tokens <= self.lead_budget:
+                self._lead.append((index, sentence, tokens))
+                self._lead_tokens += tokens
+                return
+            self._lead_open = False
+
+        room = self.budget - self._lead_tokens
+        priority = len(SENTENCE_CUES.scan(sentence))
+        if priority:
+            tokens = count_tokens(sentence, self.model)
+            heapq.heappush(self._cues, (priority, -index, sentence, tokens))
+            self._cue_tokens += tokens
+            # Drop the weakest (then latest) cue sentences once over budget
+            while self._cue_tokens > room:
+                self._cue_tokens -= heapq.heappop(self._cues)[3]
+        elif self._fill_tokens < room:
+            tokens = count_tokens(sentence, self.model)
+            self._fill.append((index, sentence, tokens))
+            self._fill_tokens += tokens
+
+    def finish(self):
+        if self._carry:
+            self._add(self._carry)
+            self._carry = ""
+        chosen = list(self._lead)
+        used = self._lead_tokens
+        for _, neg_index, sentence, tokens in sorted(self._cues, key=lambda c: (-c[0], -c[1])):
+            if used + tokens <= self.budget:
+                chosen.append((-neg_index, sentence, tokens))
+                used += tokens
+        for index, sentence, tokens in self._fill:
+            if used + tokens <= self.budget:
+                chosen.append((index, sentence, tokens))
+                used += tokens
+
+        pieces = []
+        previous = -1
+        for index, sentence, _ in sorted(chosen):
+            if pieces:
+                pieces.append(" " if index == previous + 1 else GAP)
+            pieces.append(sentence)
+            previous = index
+        snippet = "".join(pieces)
+        return snippet, count_tokens(snippet, self.model)
+
+
+def select_snippet(text, budget_tokens=SNIPPET_TOKENS, model="gpt-4o"):
+    """(snippet, tokens) for a whole page text."""
+    selector = SnippetSelector(budget_tokens, model)
+    selector.feed(text)
+    return selector.finish()
@@ -0,0 +1,489 @@
+from fair_eval.consistency import consistency_columns, scored_text
+from fair_eval.parsing import (
+    JSON_FIELDS,
+    check_fair_score_consistency,
+    check_valid,
+    extract_scores,
+    extract_scores_from_markdown,
+    parse_scores,
+    split_score_rows,
+)
+from fair_eval.rubric import (
+    FEWSHOT_EXAMPLE,
+    ONESHOT_EXAMPLE_EPA,
+    ONESHOT_EXAMPLE_NE,
+    SCORING_RULES,
+)
+from fair_eval.router import routing_columns
+from fair_eval.telemetry import telemetry
+from fair_eval.tokens import count_tokens
+
+# ================================
+# Prompting Strategies
+# ================================
+# Each strategy bundles the request it sends (exactly as the original scripts
+# built it) with the parser/validator used on its answer and the wide result
+# row its script writes. The CLI fans one scraped page out to several of them.
+
+
+# ================================
+# Zero-shot CoT
+# ================================
+ZERO_SHOT_SYSTEM = "You are an expert in FAIR data assessment. Follow the rubric exactly and be consistent."
+
+ZERO_SHOT_INSTRUCTIONS = """
+Using ONLY the extracted webpage content in the user message, evaluate the FAIR principles for the dataset it names.
+
+First, think step-by-step internally using the rubric to decide the scores.
+Then, provide ONLY the final answer as a markdown table in this exact format:
+
+| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |
+
+Do not include any explanations, reasoning text, or additional commentary in your final output.
+"""
+
+
+def zero_shot_page(scraped_data):
+    return f"""
+### Extracted Website Content
+- Title: {scraped_data['title']}
+- Description: {scraped_data['description']}
+- License: {scraped_data['license_info']}
+- Persistent Identifiers: {scraped_data['identifier_info']}
+- File Formats: {scraped_data['file_formats']}
+- Download Links: {scraped_data['download_links']}
+- Raw Page Text Snippet:
+{scraped_data['raw_text_snippet']}
+"""
+
+
+def zero_shot_messages(dataset_name, website_link, scraped_data):
+    """
+    Zero-shot CoT:
+    - No examples
+    - Ask model to think step-by-step internally
+    - But only output the final markdown table (for parsing)
+    """
+    user_content = (
+        SCORING_RULES
+        + zero_shot_page(scraped_data)
+        + f"""
+Using ONLY the extracted webpage content above, evaluate the FAIR principles for:
+
+Dataset: "{dataset_name}"
+URL: {website_link}
+
+First, think step-by-step internally using the rubric to decide the scores.
+Then, provide ONLY the final answer as a markdown table in this exact format:
+
+| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |
+
+Do not include any explanations, reasoning text, or additional commentary in your final output.
+"""
+    )
+
+    return [
+        {
+            "role": "system",
+            "content": ZERO_SHOT_SYSTEM
+        },
+        {"role": "user", "content": user_content}
+    ]
+
+
+def count_parse(parse_success):
+    """Count one scored answer as parsed / unparsed in the telemetry."""
+    telemetry.count("extract_total", result="parsed" if parse_success else "unparsed")
+
+
+def zero_shot_score(fair_output):
+    parsed = extract_scores(fair_output)
+    count_parse(parsed["Parse Success"])
+    return {
+        "Parse Success": parsed["Parse Success"],
+        "Valid Scores": check_valid(parsed),
+        "Parsed Dataset Name": parsed["Dataset Name (Parsed)"],
+        "F-Score": parsed["F-Score"],
+        "A-Score": parsed["A-Score"],
+        "I-Score": parsed["I-Score"],
+        "R-Score": parsed["R-Score"]
+    }
+
+
+def zero_shot_row(dataset_name, website_link, scraped, fair_output):
+    result = {
+        "Dataset Name": dataset_name,
+        "Website Link": website_link,
+        "FAIR Raw Output": fair_output,
+        "Scraped Title": scraped["title"],
+        "Scraped License": scraped["license_info"],
+        "Scraped File Formats": ", ".join(scraped["file_formats"]),
+    }
+    result.update(zero_shot_score(scored_text(fair_output)))
+    result.update(consistency_columns(fair_output))
+    result.update(routing_columns(fair_output))
+    return result
+
+
+# ================================
+# One-shot / Few-shot CoT
+# ================================
+EXAMPLE_SYSTEM = "You are an expert in dataset evaluation and FAIR principles assessment."
+
+EXAMPLE_INSTRUCTIONS = """
+Evaluate the dataset in the user message using its extracted website content and the FAIR rubric.
+Return ONLY the markdown table:
+| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |
+"""
+
+
+def example_page(scraped_data):
+    return f"""
+### Extracted Website Content for LLM Evaluation
+- Title: {scraped_data['title']}
+- Description: {scraped_data['description']}
+- License Detected: {scraped_data['license_info']}
+- Persistent Identifiers: {scraped_data['identifier_info']}
+- File Formats: {", ".join(scraped_data['file_formats'])}
+- Downloadable Links: {scraped_data['download_links']}
+- Raw Page Text Snippet:
+{scraped_data['raw_text_snippet']}
+"""
+
+
+def example_messages(example):
+    """Message builder for a one-shot or few-shot example block."""
+
+    def build(dataset_name, website_link, scraped_data):
+        return [
+            {"role": "system", "content": EXAMPLE_SYSTEM},
+            {
+                "role": "user",
+                "content": SCORING_RULES
+                           + example
+                           + example_page(scraped_data)
+                           + f"""
+Dataset: "{dataset_name}"
+URL: {website_link}
+
+Evaluate the dataset using the extracted website content and the FAIR rubric.
+Return ONLY the markdown table:
+| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |
+"""
+            }
+        ]
+
+    return build
+
+
+def example_score(fair_output):
+    parsed = extract_scores_from_markdown(fair_output)
+    checks = check_fair_score_consistency(parsed)
+    count_parse(parsed["F-Score"] is not None)
+    return {
+        "Parse Success": parsed["F-Score"] is not None,
+        "Valid Scores": checks["All Valid"],
+        "Parsed Dataset Name": parsed["Dataset Name (Parsed)"],
+        "F-Score": parsed["F-Score"],
+        "A-Score": parsed["A-Score"],
+        "I-Score": parsed["I-Score"],
+        "R-Score": parsed["R-Score"]
+    }
+
+
+def example_checks(fair_output):
+    """Parsed scores plus per-score validity checks: the score columns of example_row."""
+    parsed = extract_scores_from_markdown(fair_output)
+    checks = check_fair_score_consistency(parsed)
+    count_parse(parsed["F-Score"] is not None)
+    return {**parsed, **checks}
+
+
+def example_row(dataset_name, website_link, scraped, fair_output):
+    result = {
+        "Dataset Name": dataset_name,
+        "Website Link": website_link,
+        "FAIR Evaluation Raw Output": fair_output,
+        "Scraped Title": scraped["title"],
+        "Scraped License": scraped["license_info"],
+        "Scraped File Formats": scraped["file_formats"],
+    }
+    # Parse and check scores
+    result.update(example_checks(scored_text(fair_output)))
+    result.update(consistency_columns(fair_output))
+    result.update(routing_columns(fair_output))
+    return result
+
+
+# ================================
+# Cache-friendly Prefix Layout
+# ================================
+# Providers cache the longest prompt prefix they have already seen (from 1024
+# tokens up, in 128-token steps) and bill/serve it at a discount. The "prefix"
+# layout puts everything that is the same for every dataset (system prompt,
+# rubric, examples, output instructions) into one byte-identical system
+# message; only the scraped page and the dataset name follow in the user
+# message. "inline" keeps everything in one user message, as the original
+# prompts did; the page block in it is the current one (identifier line, cue
+# snippet), so neither layout reproduces the original prompt text. The static
+# prefixes are still below PROVIDER_CACHE_MIN_TOKENS, so nothing is cached
+# yet: "inline" stays the default and "prefix" is opt-in for when the rubric
+# or examples grow.
+
+LAYOUTS = ("inline", "prefix")
+DEFAULT_LAYOUT = "inline"
+PROVIDER_CACHE_MIN_TOKENS = 1024
+
+
+def prefix_messages(static_prefix, page):
+    """Message builder that sends static_prefix first and the dataset-specific page last."""
+
+    def build(dataset_name, website_link, scraped_data):
+        return [
+            {"role": "system", "content": static_prefix},
+            {
+                "role": "user",
+                "content": page(scraped_data)
+                           + f"""
+Dataset: "{dataset_name}"
+URL: {website_link}
+"""
+            }
+        ]
+
+    return build
+
+
+# ================================
+# Multi-dataset Requests
+# ================================
+# group_size > 1 packs several datasets behind one copy of the static prefix
+# and asks for a table with one row per dataset, so the rubric and examples
+# are paid for once per group instead of once per dataset.
+
+GROUP_MAX_TOKENS = 4096
+
+GROUP_INSTRUCTIONS = """
+Score each of the {count} datasets above separately, using only its own extracted content.
+Return ONLY one markdown table with exactly {count} rows, one per dataset, and each dataset name exactly as given:
+| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |
+| <Dataset Name> | F-Score (<F>/17) | A-Score (<A>/10) | I-Score (<I>/8) | R-Score (<R>/7) |
+"""
+
+
+def group_messages(static_prefix, page, items):
+    """Prefix-layout messages for (dataset_name, website_link, scraped_data) items."""
+    blocks = [
+        f"""
+## Dataset {k} of {len(items)}
+{page(scraped_data)}
+Dataset: "{dataset_name}"
+URL: {website_link}
+"""
+        for k, (dataset_name, website_link, scraped_data) in enumerate(items, 1)
+    ]
+    return [
+        {"role": "system", "content": static_prefix},
+        {"role": "user", "content": "".join(blocks) + GROUP_INSTRUCTIONS.format(count=len(items))}
+    ]
+
+
+# ================================
+# Structured Output
+# ================================
+# With structured=True the request carries a JSON schema (response_format) and
+# the model returns a score object instead of a markdown table, so no table
+# parsing is involved. Needs a deployment and api-version that support
+# json_schema response formats (2024-08-01-preview or later on Azure).
+# Ranges are checked by the validators, not the schema.
+
+SCORE_OBJECT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "dataset_name": {"type": "string"},
+        **{key: {"type": "integer", "description": f"{field} (0-{top})"}
+           for (field, key), top in zip(JSON_FIELDS.items(), (17, 10, 8, 7))},
+    },
+    "required": ["dataset_name", *JSON_FIELDS.values()],
+    "additionalProperties": False,
+}
+
+STRUCTURED_INSTRUCTIONS = """
+Return the scores as a JSON object matching the response schema instead of a markdown table.
+"""
+
+STRUCTURED_GROUP_INSTRUCTIONS = """
+Return the scores as a JSON object matching the response schema instead of a markdown table, with one entry per dataset in "datasets".
+"""
+
+
+def score_response_format(group=False):
+    """response_format for one score object, or {"datasets": [...]} for a group."""
+    schema = SCORE_OBJECT_SCHEMA
+    if group:
+        schema = {
+            "type": "object",
+            "properties": {"datasets": {"type": "array", "items": SCORE_OBJECT_SCHEMA}},
+            "required": ["datasets"],
+            "additionalProperties": False,
+        }
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "fair_scores_group" if group else "fair_scores", "strict": True, "schema": schema},
+    }
+
+
+def _structured(request, instructions, group=False):
+    """request with a JSON schema and a note after the last (dataset-specific) message."""
+    messages = list(request["messages"])
+    messages[-1] = dict(messages[-1], content=messages[-1]["content"] + instructions)
+    return dict(request, messages=messages, response_format=score_response_format(group))
+
+
+# ================================
+# Re-ask on Parse Failure
+# ================================
+# An answer whose scores cannot be parsed gets exactly one follow-up in the
+# same conversation asking for only the scores, instead of an empty row.
+
+REASK_INSTRUCTIONS = """
+Your answer could not be parsed. Reply with ONLY this one-row markdown table for Dataset: "{dataset_name}", and nothing else:
+| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |
+| {dataset_name} | F-Score (<F>/17) | A-Score (<A>/10) | I-Score (<I>/8) | R-Score (<R>/7) |
+"""
+
+STRUCTURED_REASK_INSTRUCTIONS = """
+Your answer was not a valid score object. Reply with ONLY the JSON object for Dataset: "{dataset_name}" matching the response schema.
+"""
+
+
+def reask_request(request, dataset_name, fair_output):
+    """Follow-up request asking for just the scores after an unparseable answer."""
+    instructions = STRUCTURED_REASK_INSTRUCTIONS if "response_format" in request else REASK_INSTRUCTIONS
+    messages = request["messages"] + [
+        {"role": "assistant", "content": fair_output or ""},
+        {"role": "user", "content": instructions.format(dataset_name=dataset_name)},
+    ]
+    return dict(request, messages=messages)
+
+
+# ================================
+# Strategy Registry
+# ================================
+class Strategy:
+    """A prompting strategy: the request it sends and how its answer is scored."""
+
+    def __init__(self, name, description, build_messages, static_prefix, page, max_tokens, score,
+                 legacy_row, temperature=0.2):
+        self.name = name
+        self.description = description
+        self.build_messages = build_messages
+        self.static_prefix = static_prefix
+        self.page = page
+        self.build_prefix_messages = prefix_messages(static_prefix, page)
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.score = score
+        self.legacy_row = legacy_row
+
+    def request(self, model, dataset_name, website_link, scraped_data, layout=DEFAULT_LAYOUT,
+                structured=False):
+        """
+        Chat-completions request dict for one dataset ("prefix" or "inline" layout).
+        - structured: ask for a JSON score object (response_format) instead of a table
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown prompt layout {layout!r}; choose from {', '.join(LAYOUTS)}")
+        build = self.build_prefix_messages if layout == "prefix" else self.build_messages
+        with telemetry.span("prompt", strategy=self.name):
+            request = {
+                "model": model,
+                "messages": build(dataset_name, website_link, scraped_data),
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens
+            }
+        return _structured(request, STRUCTURED_INSTRUCTIONS) if structured else request
+
+    def group_request(self, model, items, structured=False):
+        """One request scoring several (dataset_name, website_link, scraped_data) items."""
+        with telemetry.span("prompt", strategy=self.name):
+            messages = group_messages(self.static_prefix, self.page, items)
+        request = {
+            "model": model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": min(self.max_tokens * len(items), GROUP_MAX_TOKENS)
+        }
+        return _structured(request, STRUCTURED_GROUP_INSTRUCTIONS, group=True) if structured else request
+
+    @staticmethod
+    def answer(request, dataset_name, complete):
+        """
+        Assistant content for request, where complete(request) -> content.
+        - If no scores can be parsed from it, asks once more for just the scores
+          and returns that answer when it parses (else the first one)
+        """
+        fair_output = complete(request)
+        if parse_scores(fair_output)["Parse Success"]:
+            return fair_output
+        print(f"🔁 Could not parse scores for {dataset_name}; asking once more")
+        retry = complete(reask_request(request, dataset_name, fair_output))
+        if parse_scores(retry)["Parse Success"]:
+            return retry
+        print(f"⚠️ Still no parseable scores for {dataset_name}")
+        return fair_output
+
+    @staticmethod
+    def split_group_answer(fair_output, dataset_names):
+        """Per-dataset outputs of a group answer; None for datasets it left out."""
+        return split_score_rows(fair_output, dataset_names)
+
+    def prefix_tokens(self, model):
+        """Tokens in the static prefix; below PROVIDER_CACHE_MIN_TOKENS nothing is cached."""
+        return count_tokens(self.static_prefix, model)
+
+    def long_row(self, model, dataset_name, website_link, scraped, fair_output):
+        """One row of the combined long-format table (same columns for every strategy)."""
+        result = {
+            "Dataset Name": dataset_name,
+            "Website Link": website_link,
+            "Strategy": self.name,
+            "Model": model,
+            "FAIR Raw Output": fair_output,
+            "Scraped Title": scraped["title"],
+            "Scraped License": scraped["license_info"],
+            "Scraped File Formats": ", ".join(scraped["file_formats"]),
+            "Snippet Tokens": scraped.get("snippet_tokens"),
+        }
+        result.update(self.score(scored_text(fair_output)))
+        result.update(consistency_columns(fair_output))
+        result.update(routing_columns(fair_output))
+        return result
+
+
+STRATEGIES = {
+    s.name: s for s in [
+        Strategy("zero-shot-cot", "Zero-shot CoT FAIR evaluation",
+                 zero_shot_messages, ZERO_SHOT_SYSTEM + "\n" + SCORING_RULES + ZERO_SHOT_INSTRUCTIONS,
+                 zero_shot_page, 700, zero_shot_score, zero_shot_row),
+        Strategy("one-shot-cot-epa", "One-shot CoT (EPA UCMR3 example) FAIR evaluation",
+                 example_messages(ONESHOT_EXAMPLE_EPA),
+                 EXAMPLE_SYSTEM + "\n" + SCORING_RULES + ONESHOT_EXAMPLE_EPA + EXAMPLE_INSTRUCTIONS,
+                 example_page, 800, example_score, example_row),
+        Strategy("one-shot-cot-ne", "One-shot CoT (NE database example) FAIR evaluation",
+                 example_messages(ONESHOT_EXAMPLE_NE),
+                 EXAMPLE_SYSTEM + "\n" + SCORING_RULES + ONESHOT_EXAMPLE_NE + EXAMPLE_INSTRUCTIONS,
+                 example_page, 800, example_score, example_row),
+        Strategy("few-shot-cot", "Few-shot CoT FAIR evaluation",
+                 example_messages(FEWSHOT_EXAMPLE),
+                 EXAMPLE_SYSTEM + "\n" + SCORING_RULES + FEWSHOT_EXAMPLE + EXAMPLE_INSTRUCTIONS,
+                 example_page, 800, example_score, example_row),
+    ]
+}
+
+
+def get_strategy(name):
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy {name!r}; choose from {', '.join(STRATEGIES)}") from None
@@ -0,0 +1,167 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from fair_eval.rubric import SCORE_MAXIMA
+
+# ================================
+# Result Table Validation & Summary
+# ================================
+# Column-wise counterparts of the per-row checks in fair_eval.parsing, for
+# whole result tables (a CSV, the CLI's long table, or the Parquet dataset).
+# Everything is computed with vectorized pandas / numpy operations and a
+# single groupby per summary, so millions of rows take milliseconds, not a
+# Python loop per row.
+#   python -m fair_eval.summary fair_scores_long.csv -o summary.csv
+
+SCORES = list(SCORE_MAXIMA)
+TOTAL_MAX = sum(SCORE_MAXIMA.values())
+GROUP_COLUMNS = ("Strategy", "Model", "strategy", "model")
+# A dataset is its name and link: two different "NMED" datasets share a name
+DATASET_COLUMNS = ("Dataset Name", "Website Link")
+
+
+def score_frame(df):
+    """The four score columns as floats (unparsed / non-numeric -> NaN)."""
+    return df[SCORES].apply(pd.to_numeric, errors="coerce").astype(float)
+
+
+def validity_masks(df):
+    """Boolean "<score> Valid" columns and "All Valid", like check_fair_score_consistency."""
+    scores = score_frame(df).to_numpy()
+    maxima = np.array([SCORE_MAXIMA[s] for s in SCORES], dtype=float)
+    # NaN compares False, so missing scores are invalid
+    valid = (scores >= 0) & (scores <= maxima)
+    masks = pd.DataFrame(valid, columns=[f"{s} Valid" for s in SCORES], index=df.index)
+    masks["All Valid"] = valid.all(axis=1)
+    return masks
+
+
+def score_table(df):
+    """
+    df plus validity masks, "Total Score" (out of 42), per-principle
+    percentages ("F %", ...) and the overall "FAIR %".
+    - Out-of-range scores count as missing; rows without all four valid
+      scores get no total
+    """
+    scores = score_frame(df)
+    masks = validity_masks(df)
+    valid_scores = scores.where(masks[[f"{s} Valid" for s in SCORES]].to_numpy())
+    maxima = pd.Series(SCORE_MAXIMA)
+
+    out = df.drop(columns=[c for c in masks.columns if c in df.columns]).join(masks)
+    percents = valid_scores.div(maxima) * 100
+    percents.columns = [f"{s[0]} %" for s in SCORES]
+    out = out.join(percents)
+    # NaN in any score leaves the total NaN, matching "All Valid"
+    out["Total Score"] = valid_scores.to_numpy().sum(axis=1)
+    out["FAIR %"] = out["Total Score"] / TOTAL_MAX * 100
+    return out
+
+
+def _group_columns(df, by):
+    if by is not None:
+        return list(by)
+    return [c for c in GROUP_COLUMNS if c in df.columns]
+
+
+def _moments(codes, values, size):
+    """Count, mean and sample std of values per group code (NaN skipped), via bincount."""
+    ok = ~np.isnan(values)
+    if not ok.all():
+        codes, values = codes[ok], values[ok]
+    count = np.bincount(codes, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(codes, weights=values, minlength=size) / count
+        # Two passes (squared deviations from the mean), so equal values give exactly 0
+        deviations = values - mean[codes]
+        var = np.bincount(codes, weights=deviations * deviations, minlength=size) / (count - 1)
+    var[count < 2] = np.nan
+    return count, mean, np.sqrt(var)
+
+
+def summarize(df, by=None, dataset_columns=DATASET_COLUMNS):
+    """
+    One row per group (default: Strategy / Model, whichever are present).
+    - rows, valid_rate, mean / std of each score, Total Score and FAIR %
+    - With repeated runs of a dataset in a group: agreement (share of
+      datasets whose four scores are identical in every run) and the mean
+      within-dataset std of each score; datasets are told apart by
+      dataset_columns (those present in df)
+    """
+    table = score_table(df)
+    keys = _group_columns(table, by)
+    if not keys:
+        table = table.assign(_all="all")
+        keys = ["_all"]
+    # Scores as numbers: non-numeric cells (e.g. from a hand-edited CSV) are NaN
+    numeric = score_frame(table).join(table[["Total Score", "FAIR %"]])
+
+    # Integer group codes once; every aggregate is then a bincount over them
+    groups = table.groupby(keys, observed=True, sort=True)
+    group_codes = groups.ngroup().to_numpy()
+    n_groups = groups.ngroups
+    summary = pd.DataFrame(index=groups.size().index)
+    summary["rows"] = np.bincount(group_codes, minlength=n_groups)
+    summary["valid_rate"] = np.bincount(
+        group_codes, weights=table["All Valid"].to_numpy(float), minlength=n_groups) / summary["rows"]
+    for column in numeric.columns:
+        _, mean, std = _moments(group_codes, numeric[column].to_numpy(float), n_groups)
+        summary[f"{column} mean"] = mean
+        summary[f"{column} std"] = std
+
+    # Inter-run agreement: per (group, dataset), did every run give the same scores?
+    datasets = table.groupby([c for c in dataset_columns if c in table.columns], sort=False, dropna=False)
+    dataset_codes, n_datasets = datasets.ngroup().to_numpy(), datasets.ngroups
+    pair_codes, pairs = pd.factorize(group_codes.astype(np.int64) * n_datasets + dataset_codes)
+    runs = np.bincount(pair_codes)
+    repeated = runs > 1
+    if repeated.any():
+        owner = pairs[repeated] // n_datasets
+        same = np.ones(repeated.sum(), dtype=bool)
+        for score in SCORES:
+            _, _, std = _moments(pair_codes, numeric[score].to_numpy(float), len(pairs))
+            std = std[repeated]
+            # NaN std (fewer than two parsed runs) does not count as disagreement
+            same &= ~(std > 0)
+            summary[f"{score} run std"] = _moments(owner, std, n_groups)[1]
+        summary["repeated_datasets"] = np.bincount(owner, minlength=n_groups)
+        summary["agreement"] = np.bincount(owner, weights=same, minlength=n_groups) / summary["repeated_datasets"]
+    summary = summary.reset_index()
+    return summary.drop(columns=["_all"]) if "_all" in summary.columns else summary
+
+
+def load_table(path):
+    """Result table from a CSV file or a Parquet file / dataset directory."""
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        from fair_eval.columnar import load_results
+        return load_results(path, columns=None)
+    return pd.read_csv(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m fair_eval.summary",
+        description="Validate a FAIR result table and summarize it per strategy / model.",
+    )
+    parser.add_argument("results", help="result CSV, or a Parquet file / dataset directory")
+    parser.add_argument("-b", "--by", default=None,
+                        help="comma-separated group columns (default: Strategy / Model when present)")
+    parser.add_argument("-o", "--output", default=None, help="write the summary CSV here instead of stdout")
+    args = parser.parse_args(argv)
+
+    by = [c.strip() for c in args.by.split(",") if c.strip()] if args.by else None
+    summary = summarize(load_table(args.results), by=by)
+    if args.output:
+        summary.to_csv(args.output, index=False)
+        print("✅ Summary saved to:", args.output)
+    else:
+        with pd.option_context("display.max_columns", None, "display.width", 200):
+            print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
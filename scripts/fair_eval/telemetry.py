@@ -0,0 +1,299 @@
+import bisect
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+
+# ================================
+# Stage Instrumentation
+# ================================
+# One process-wide Telemetry object (`telemetry`) that the pipeline stages
+# report to:
+#   fetch     Scraper.fetch_html, labelled by host
+#   parse     the engine's parse stage
+#   evaluate  one engine LLM task (a dataset, or a group of datasets)
+#   prompt    Strategy.request / group_request, labelled by strategy
+#   llm       create_completion, labelled by deployment (with token usage)
+#   extract   parse_scores (parsed / unparsed counts)
+#   write     checkpoint appends and the final result files
+# Every span adds to a latency histogram; counters cover tokens, retries and
+# parse failures. Export with write_metrics() as JSON (*.json) or Prometheus
+# text (anything else). With tracing on, finished spans are also kept in an
+# OpenTelemetry-like shape for write_trace() (JSONL), and with otel=True they
+# are mirrored to the opentelemetry tracer when that package is installed.
+
+STAGES = ("fetch", "parse", "evaluate", "prompt", "llm", "extract", "write")
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+METRIC_PREFIX = "fair_eval_"
+DEFAULT_MAX_SPANS = 100000
+
+_current_span = contextvars.ContextVar("fair_eval_span", default=None)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _prometheus_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _otel_tracer():
+    # Imported only when asked for, so plain runs never load opentelemetry
+    try:
+        from opentelemetry import trace as otel_trace
+    except ImportError:  # pragma: no cover - optional dependency
+        print("⚠️ opentelemetry is not installed; spans are only kept locally")
+        return None
+    return otel_trace.get_tracer("fair_eval")
+
+
+class Histogram:
+    """Cumulative-bucket histogram with count, sum and max."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (max for the overflow bucket)."""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts)),
+        }
+
+
+class Telemetry:
+    """
+    Counters, histograms and (optionally) trace spans for one run.
+    - trace: keep finished spans (up to max_spans) for write_trace()
+    - otel: also open opentelemetry spans when the package is installed
+    """
+
+    def __init__(self, trace=False, otel=False, max_spans=DEFAULT_MAX_SPANS):
+        self._lock = threading.Lock()
+        self.configure(trace=trace, otel=otel, max_spans=max_spans)
+        self.reset()
+
+    def configure(self, trace=None, otel=None, max_spans=None):
+        if trace is not None:
+            self.trace = trace
+        if otel is not None:
+            self._tracer = _otel_tracer() if otel else None
+        if max_spans is not None:
+            self.max_spans = max_spans
+        return self
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.spans = []
+            self.dropped_spans = 0
+
+    # ---------- Recording ----------
+    def count(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextlib.contextmanager
+    def span(self, stage, **labels):
+        """
+        Time a block as one `stage` span; labels become metric labels and span
+        attributes. Yields a dict for extra trace-only attributes (e.g. the dataset).
+        """
+        attributes = {}
+        parent = _current_span.get()
+        span_id = os.urandom(8).hex()
+        trace_id = parent["trace_id"] if parent else os.urandom(16).hex()
+        token = _current_span.set({"trace_id": trace_id, "span_id": span_id})
+        otel_span = self._tracer.start_as_current_span(stage) if self._tracer else contextlib.nullcontext()
+        start_ns = time.time_ns()
+        start = time.perf_counter()
+        error = None
+        try:
+            with otel_span as current:
+                try:
+                    yield attributes
+                finally:
+                    if current is not None:
+                        for k, v in {**labels, **attributes}.items():
+                            current.set_attribute(k, v if isinstance(v, (bool, int, float, str)) else str(v))
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            seconds = time.perf_counter() - start
+            self.observe("stage_seconds", seconds, stage=stage, **labels)
+            if error is not None:
+                self.count("stage_errors_total", stage=stage, error=type(error).__name__)
+            if self.trace:
+                self._keep({
+                    "traceId": trace_id,
+                    "spanId": span_id,
+                    "parentSpanId": parent["span_id"] if parent else None,
+                    "name": stage,
+                    "startTimeUnixNano": start_ns,
+                    "endTimeUnixNano": start_ns + int(seconds * 1e9),
+                    "attributes": {**labels, **attributes},
+                    "status": {"code": "ERROR", "message": repr(error)} if error is not None else {"code": "OK"},
+                })
+
+    def _keep(self, span):
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped_spans += 1
+
+    def record_usage(self, usage, deployment=None):
+        """Token counters and per-call histograms from a response.usage object or dict."""
+        if usage is None:
+            return
+
+        def field(obj, name):
+            return (obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)) or 0
+
+        prompt, completion = field(usage, "prompt_tokens"), field(usage, "completion_tokens")
+        details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(
+            usage, "prompt_tokens_details", None)
+        cached = field(details, "cached_tokens") if details is not None else 0
+        for kind, value in (("prompt", prompt), ("completion", completion), ("cached_prompt", cached)):
+            self.count("llm_tokens_total", value, deployment=deployment, kind=kind)
+        self.observe("llm_prompt_tokens", prompt, buckets=TOKEN_BUCKETS, deployment=deployment)
+        self.observe("llm_completion_tokens", completion, buckets=TOKEN_BUCKETS, deployment=deployment)
+
+    # ---------- Export ----------
+    def snapshot(self):
+        """JSON-ready counters and histograms."""
+        with self._lock:
+            counters = [{"name": n, "labels": dict(k), "value": v} for (n, k), v in sorted(self.counters.items())]
+            histograms = [{"name": n, "labels": dict(k), **h.snapshot()}
+                          for (n, k), h in sorted(self.histograms.items())]
+        return {"counters": counters, "histograms": histograms, "dropped_spans": self.dropped_spans}
+
+    def prometheus(self):
+        """Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        for name in sorted({n for (n, _), _ in counters}):
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} counter")
+            lines.extend(f"{METRIC_PREFIX}{name}{_prometheus_labels(k)} {v}" for (n, k), v in counters if n == name)
+        for name in sorted({n for (n, _), _ in histograms}):
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} histogram")
+            for (n, k), h in histograms:
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip([*map(str, h.buckets), "+Inf"], h.counts):
+                    cumulative += count
+                    lines.append(f"{METRIC_PREFIX}{name}_bucket{_prometheus_labels(k, [('le', bound)])} {cumulative}")
+                lines.append(f"{METRIC_PREFIX}{name}_sum{_prometheus_labels(k)} {h.sum}")
+                lines.append(f"{METRIC_PREFIX}{name}_count{_prometheus_labels(k)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path):
+        """JSON for *.json paths, Prometheus text otherwise."""
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                json.dump(self.snapshot(), f, indent=2)
+                f.write("\n")
+            else:
+                f.write(self.prometheus())
+        print("📈 Metrics saved to:", path)
+
+    def write_trace(self, path):
+        """Finished spans as JSON lines (OpenTelemetry span fields)."""
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, default=str) + "\n")
+        print(f"🧵 {len(spans)} spans saved to: {path}")
+
+    def report(self, slowest=3):
+        """
+        Short per-stage summary for the end of a run:
+        - calls, mean / p95 / max latency and errors per stage
+        - slowest hosts (fetch) and deployments (llm) by mean latency
+        - parsed vs. unparsed answers
+        """
+        stages = {}
+        by_label = {"host": {}, "deployment": {}}
+        with self._lock:
+            for (name, key), h in self.histograms.items():
+                if name != "stage_seconds":
+                    continue
+                labels = dict(key)
+                stage = stages.setdefault(labels["stage"], Histogram(LATENCY_BUCKETS))
+                for i, n in enumerate(h.counts):
+                    stage.counts[i] += n
+                stage.count, stage.sum, stage.max = stage.count + h.count, stage.sum + h.sum, max(stage.max, h.max)
+                for label in by_label:
+                    if label in labels:
+                        by_label[label][labels[label]] = h
+            errors = {}
+            for (name, key), v in self.counters.items():
+                if name == "stage_errors_total":
+                    stage = dict(key)["stage"]
+                    errors[stage] = errors.get(stage, 0) + v
+            parsed = {dict(k).get("result"): v for (n, k), v in self.counters.items() if n == "extract_total"}
+
+        for stage in sorted(stages, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+            h = stages[stage]
+            print(f"⏱️ {stage}: {h.count} calls, mean {h.sum / h.count * 1000:.1f} ms, "
+                  f"p95 ≤{h.quantile(0.95) * 1000:.0f} ms, max {h.max * 1000:.0f} ms"
+                  + (f", {errors[stage]} errors" if errors.get(stage) else ""))
+        for label, histograms in by_label.items():
+            if len(histograms) > 1:
+                top = sorted(histograms.items(), key=lambda item: -item[1].sum / item[1].count)[:slowest]
+                print(f"🐢 Slowest {label}s: "
+                      + ", ".join(f"{name} ({h.sum / h.count * 1000:.0f} ms mean)" for name, h in top))
+        if parsed:
+            print(f"🧾 Answers parsed: {parsed.get('parsed', 0)}, unparsed: {parsed.get('unparsed', 0)}")
+
+
+telemetry = Telemetry()
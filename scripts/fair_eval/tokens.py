@@ -0,0 +1,104 @@
+import functools
+import threading
+
+# ================================
+# Token Counting
+# ================================
+# tiktoken is optional: when it is not installed we fall back to the usual
+# ~4 characters per token estimate, which is close enough for quota control.
+# It is imported on the first count, so parse-only users never load it. The
+# same estimate is used when its encoding files cannot be loaded (offline).
+
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MESSAGE = 4  # role + separators added by the chat format
+
+
+@functools.lru_cache(maxsize=None)
+def _tiktoken():
+    try:
+        import tiktoken
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return tiktoken
+
+
+_encodings_unavailable = False
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding_for(model):
+    global _encodings_unavailable
+    tiktoken = _tiktoken()
+    if tiktoken is None or _encodings_unavailable:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base" if "4o" in (model or "") else "cl100k_base")
+    except Exception as e:
+        # The BPE files are downloaded on first use; offline, every later count
+        # (for any model) estimates instead of retrying the download
+        _encodings_unavailable = True
+        print(f"⚠️ tiktoken encoding unavailable ({type(e).__name__}: {e}); "
+              f"estimating {CHARS_PER_TOKEN} characters per token")
+        return None
+
+
+def count_tokens(text, model="gpt-4o"):
+    """Number of tokens in text for the given model."""
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_prompt_tokens(messages, model="gpt-4o"):
+    """Prompt tokens for a chat-completions messages list."""
+    total = 3  # every reply is primed with the assistant header
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + count_tokens(message["content"], model)
+    return total
+
+
+# ================================
+# Prompt Token Usage
+# ================================
+def _field(obj, name):
+    if obj is None:
+        return None
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+class UsageMeter:
+    """
+    Run totals from response.usage, split into cached and uncached prompt tokens.
+    - Only API responses are recorded; completion-cache hits cost nothing
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, usage):
+        if usage is None:
+            return
+        cached = _field(_field(usage, "prompt_tokens_details"), "cached_tokens") or 0
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += _field(usage, "prompt_tokens") or 0
+            self.cached_tokens += cached
+            self.completion_tokens += _field(usage, "completion_tokens") or 0
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_tokens,
+            "uncached_prompt_tokens": self.prompt_tokens - self.cached_tokens,
+            "cached_rate": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+            "completion_tokens": self.completion_tokens,
+        }
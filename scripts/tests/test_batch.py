@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+openai = pytest.importorskip("openai")
+
+from fair_eval.batch import BatchJob, parse_output_lines, run_batch  # noqa: E402
+from fair_eval.checkpoint import CheckpointLog  # noqa: E402
+from fair_eval.llm_cache import CompletionCache, prompt_key  # noqa: E402
+from fair_eval.mock_server import MockLLMServer, completion_body, synthetic_content  # noqa: E402
+
+DF = pd.DataFrame({
+    "Dataset Name": ["UCMR5", "NMED", "UCMR3"],
+    "Website Link": ["https://example.org/ucmr5", "https://example.org/nmed", "https://example.org/ucmr3"],
+})
+
+
+def build_request(name, url, scraped):
+    return {"model": "gpt-4o", "messages": [{"role": "user", "content": f'Dataset: "{name}"\n{scraped["title"]}'}]}
+
+
+def run(server, tmp_path, **kwargs):
+    client = openai.OpenAI(base_url=server.url, api_key="mock")
+    job = BatchJob(client, str(tmp_path / "out.batch.jsonl"), poll_seconds=0)
+    return run_batch(
+        DF, job, build_request=build_request,
+        build_result=lambda name, url, scraped, output: {"Dataset Name": name, "Output": output},
+        scrape=lambda url: {"title": url}, **kwargs,
+    )
+
+
+def test_parse_output_lines():
+    text = "\n".join([
+        json.dumps({"custom_id": "a", "response": {"status_code": 200, "body": {"id": "x"}}, "error": None}),
+        json.dumps({"custom_id": "b", "response": {"status_code": 429, "body": {"error": "slow down"}}}),
+        json.dumps({"custom_id": "c", "response": None, "error": {"code": "server_error"}}),
+        "",
+    ])
+    assert parse_output_lines(text) == {
+        "a": ({"id": "x"}, None), "b": (None, "slow down"), "c": (None, {"code": "server_error"}),
+    }
+
+
+def test_run_batch_scores_every_row(tmp_path):
+    with MockLLMServer(batch_polls=2) as server:
+        results = run(server, tmp_path)
+        assert server.stats()["requests"] == 3
+    assert [row["Dataset Name"] for row in results] == ["UCMR5", "NMED", "UCMR3"]
+    assert all("F-Score (" in row["Output"] for row in results)
+    assert not (tmp_path / "out.batch.jsonl.state.json").exists()
+
+
+def test_cached_prompts_are_not_submitted(tmp_path):
+    cache = CompletionCache(str(tmp_path / "llm.sqlite"))
+    prompt = build_request("NMED", DF["Website Link"][1], {"title": DF["Website Link"][1]})
+    cache.put(prompt, completion_body(prompt, ["cached answer"]))
+    with MockLLMServer() as server:
+        results = run(server, tmp_path, completion_cache=cache)
+        assert server.stats()["requests"] == 2
+    assert results[1]["Output"] == "cached answer"
+    # Batch answers are cached for the next run
+    assert cache.get(build_request("UCMR5", DF["Website Link"][0], {"title": DF["Website Link"][0]})) is not None
+    cache.close()
+
+
+def test_failed_requests_are_retried_on_resume(tmp_path):
+    checkpoint_path = str(tmp_path / "out.checkpoint.jsonl")
+    # Only UCMR5's answer is recorded, so the replay-only server fails the other two
+    prompt = build_request("UCMR5", DF["Website Link"][0], {"title": DF["Website Link"][0]})
+    recorded = {prompt_key(prompt): completion_body(prompt, [synthetic_content(prompt)])}
+    checkpoint = CheckpointLog(checkpoint_path, strategy="s", model="m")
+    with MockLLMServer(recorded=recorded, replay_only=True) as server:
+        results = run(server, tmp_path, checkpoint=checkpoint)
+    checkpoint.close()
+    assert [bool(row["Output"]) for row in results] == [True, False, False]
+
+    checkpoint = CheckpointLog(checkpoint_path, strategy="s", model="m", resume=True)
+    with MockLLMServer() as server:
+        results = run(server, tmp_path, checkpoint=checkpoint, resume=True)
+        assert server.stats()["requests"] == 2
+    checkpoint.close()
+    assert all(row["Output"] for row in results)
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from fair_eval.checkpoint import CheckpointLog
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_loads_logged_rows(tmp_path):
+    path = str(tmp_path / "out.checkpoint.jsonl")
+    log = CheckpointLog(path, strategy="few-shot-cot", model="gpt-4o")
+    log.append("UCMR5", "https://www.epa.gov/dwucmr", {"F-Score": 12})
+    log.close()
+
+    resumed = CheckpointLog(path, strategy="few-shot-cot", model="gpt-4o", resume=True)
+    assert resumed.get("UCMR5", "https://www.epa.gov/dwucmr") == {"F-Score": 12}
+    assert resumed.get("UCMR5", "https://www.epa.gov/dwucmr", ("zero-shot-cot", "gpt-4o")) is None
+    assert resumed.get("NMED", "https://www.env.nm.gov") is None
+    resumed.close()
+
+
+def test_without_resume_the_old_log_is_moved_aside(tmp_path):
+    path = str(tmp_path / "out.checkpoint.jsonl")
+    for run in (1, 2, 3):
+        log = CheckpointLog(path, strategy="s", model="m")
+        assert log.get("A", "https://example.org/a") is None
+        log.append("A", "https://example.org/a", {"F-Score": run})
+        log.close()
+    assert read_lines(path)[0]["result"] == {"F-Score": 3}
+    # Earlier runs are kept, oldest first
+    assert read_lines(path + ".1.bak")[0]["result"] == {"F-Score": 1}
+    assert read_lines(path + ".2.bak")[0]["result"] == {"F-Score": 2}
+
+
+def test_empty_log_is_not_backed_up(tmp_path):
+    path = str(tmp_path / "out.checkpoint.jsonl")
+    CheckpointLog(path, strategy="s", model="m").close()
+    CheckpointLog(path, strategy="s", model="m").close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.checkpoint.jsonl"]
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = str(tmp_path / "out.checkpoint.jsonl")
+    log = CheckpointLog(path, strategy="s", model="m")
+    log.append("A", "https://example.org/a", {"F-Score": 1})
+    log.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "[\\"B\\"')
+    resumed = CheckpointLog(path, strategy="s", model="m", resume=True)
+    assert resumed.get("A", "https://example.org/a") == {"F-Score": 1}
+    resumed.close()
+
+
+def test_compact_keeps_the_latest_entry_per_key(tmp_path):
+    path = str(tmp_path / "out.checkpoint.jsonl")
+    log = CheckpointLog(path, strategy="s", model="m")
+    log.append("A", "https://example.org/a", {"F-Score": 1})
+    log.append("A", "https://example.org/a", {"F-Score": 2})
+    log.append("B", "https://example.org/b", {"F-Score": 3})
+    log.compact()
+    log.close()
+    assert [line["result"] for line in read_lines(path)] == [{"F-Score": 2}, {"F-Score": 3}]
+
+
+def test_pipeline_resumes_from_the_checkpoint(tmp_path):
+    pd = pytest.importorskip("pandas")
+    from fair_eval.engine import run_pipeline
+
+    df = pd.DataFrame({
+        "Dataset Name": ["A", "B", "C"],
+        "Website Link": ["https://example.org/a", "https://example.org/b", "https://example.org/c"],
+    })
+    path = str(tmp_path / "out.checkpoint.jsonl")
+
+    def pipeline(checkpoint, evaluate):
+        return run_pipeline(
+            df, scrape=lambda url: {"url": url}, evaluate=evaluate,
+            build_result=lambda name, url, scraped, output: {"Dataset Name": name, "Answer": output},
+            checkpoint=checkpoint, llm_concurrency=1,
+        )
+
+    # First run crashes on B, after A is logged
+    def flaky(name, url, scraped):
+        if name == "B":
+            raise RuntimeError("API down")
+        return f"first {name}"
+
+    log = CheckpointLog(path, strategy="s", model="m")
+    with pytest.raises(RuntimeError):
+        pipeline(log, flaky)
+    log.close()
+    logged = {line["result"]["Dataset Name"] for line in read_lines(path)}
+    assert logged == {"A"}
+
+    rerun = []
+
+    def evaluate(name, url, scraped):
+        rerun.append(name)
+        return f"second {name}"
+
+    log = CheckpointLog(path, strategy="s", model="m", resume=True)
+    results = pipeline(log, evaluate)
+    log.close()
+    assert sorted(rerun) == ["B", "C"]
+    assert [row["Dataset Name"] for row in results] == ["A", "B", "C"]
+    assert results[0]["Answer"] == "first A"
+    assert results[1]["Answer"] == "second B"
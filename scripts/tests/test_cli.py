@@ -0,0 +1,58 @@
+import pytest
+
+from fair_eval.checkpoint import side_path
+from fair_eval.cli import main
+
+
+def test_side_path_never_replaces_the_output():
+    assert side_path("results.csv", ".checkpoint.jsonl") == "results.checkpoint.jsonl"
+    assert side_path("results", ".checkpoint.jsonl") == "results.checkpoint.jsonl"
+    assert side_path("runs/results.csv", ".few-shot-cot.batch.jsonl") == "runs/results.few-shot-cot.batch.jsonl"
+    with pytest.raises(ValueError):
+        side_path("results.jsonl", ".jsonl")
+
+
+@pytest.mark.parametrize("argv", [
+    ["in.csv", "-s", "no-such-strategy"],
+    ["in.csv", "--samples", "3", "--batch"],
+    ["in.csv", "-o", "results.jsonl"],  # the checkpoint log would overwrite the output
+])
+def test_bad_arguments_are_rejected(argv):
+    with pytest.raises(SystemExit):
+        main(argv)
+
+
+def test_each_page_is_scraped_once_for_all_variants(tmp_path, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("openai")
+    pytest.importorskip("lxml")
+    from fair_eval.mock_server import MockLLMServer, PageStub
+
+    pages = {
+        f"https://example.org/{name}": {
+            "body": f"<html><title>{name}</title><body><p>{name} data under CC-BY 4.0.</p></body></html>",
+            "etag": None, "last_modified": None,
+        }
+        for name in ("ucmr5", "nmed")
+    }
+    input_csv = tmp_path / "in.csv"
+    pd.DataFrame({"Dataset Name": ["UCMR5", "NMED"], "Website Link": list(pages)}).to_csv(input_csv, index=False)
+    output_csv = tmp_path / "long.csv"
+
+    with MockLLMServer() as server, PageStub(pages) as stub:
+        monkeypatch.setenv("AZURE_OPENAI_API_KEY", "mock")
+        monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", server.url)
+        assert main([
+            str(input_csv), "-o", str(output_csv), "-s", "zero-shot-cot,few-shot-cot", "-d", "gpt-4o",
+            "--page-stub", stub.url, "--llm-cache", str(tmp_path / "llm.sqlite"),
+            "--http-cache", str(tmp_path / "http.sqlite"), "--http-politeness-delay", "0",
+            "--parse-workers", "0",
+        ]) == 0
+        assert stub.stats()["served"] == 2
+        assert server.stats()["requests"] == 4
+
+    written = pd.read_csv(output_csv)
+    assert list(zip(written["Dataset Name"], written["Strategy"])) == [
+        ("UCMR5", "zero-shot-cot"), ("UCMR5", "few-shot-cot"), ("NMED", "zero-shot-cot"), ("NMED", "few-shot-cot"),
+    ]
+    assert set(written["Model"]) == {"gpt-4o"}
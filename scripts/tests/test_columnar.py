@@ -0,0 +1,77 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pd = pytest.importorskip("pandas")
+
+from fair_eval.checkpoint import CheckpointLog  # noqa: E402
+from fair_eval.columnar import RESULT_COLUMNS, ParquetDatasetWriter, load_results, write_parquet_dataset  # noqa: E402
+from fair_eval.engine import run_pipeline  # noqa: E402
+from fair_eval.strategies import get_strategy  # noqa: E402
+
+SCRAPED = {"title": "UCMR 5", "license_info": "public domain", "file_formats": ["CSV", "ZIP"], "snippet_tokens": 40}
+
+
+def answer(f):
+    return f"| UCMR5 | F-Score ({f}/17) | A-Score (8/10) | I-Score (5/8) | R-Score (6/7) |"
+
+
+def test_round_trip_across_strategies_and_runs(tmp_path):
+    root = str(tmp_path / "parquet")
+    zero_shot = get_strategy("zero-shot-cot")
+    few_shot = get_strategy("few-shot-cot")
+    # Legacy rows of different strategies have different columns and types
+    write_parquet_dataset([zero_shot.legacy_row("UCMR5", "https://www.epa.gov/dwucmr", SCRAPED, answer(12))],
+                          root, strategy=zero_shot.name, model="gpt-4o", run_id="r1")
+    write_parquet_dataset([few_shot.legacy_row("UCMR5", "https://www.epa.gov/dwucmr", SCRAPED, answer(14))],
+                          root, strategy=few_shot.name, model="gpt-4o", run_id="r1")
+    write_parquet_dataset([few_shot.long_row("gpt-4o-mini", "NMED", "https://www.env.nm.gov", SCRAPED, answer(9))],
+                          root, run_id="r2")
+
+    scores = load_results(root).sort_values(["run", "strategy"]).reset_index(drop=True)
+    assert list(scores["F-Score"]) == [14, 12, 9]
+    assert list(scores["strategy"]) == ["few-shot-cot", "zero-shot-cot", "few-shot-cot"]
+    assert list(scores["model"]) == ["gpt-4o", "gpt-4o", "gpt-4o-mini"]
+
+    everything = load_results(root, columns=None)
+    assert set(RESULT_COLUMNS) <= set(everything.columns)
+    assert sorted(map(list, everything["Scraped File Formats"])) == [["CSV", "ZIP"]] * 3
+
+
+def test_full_batches_are_written_as_rows_arrive(tmp_path):
+    root = str(tmp_path / "parquet")
+    row = get_strategy("zero-shot-cot").legacy_row("UCMR5", "https://www.epa.gov/dwucmr", SCRAPED, answer(12))
+    writer = ParquetDatasetWriter(root, strategy="zero-shot-cot", model="gpt-4o", batch_rows=2)
+    writer.write(row)
+    assert writer.paths == []
+    writer.write(row)
+    assert len(writer.paths) == 1  # first batch is out before the run ends
+    writer.write(row)
+    writer.close()
+    assert len(load_results(root)) == 3
+
+
+def test_unknown_columns_are_rejected(tmp_path):
+    writer = ParquetDatasetWriter(str(tmp_path / "parquet"), strategy="s", model="m")
+    with pytest.raises(ValueError):
+        writer.write({"Dataset Name": "UCMR5", "Surprise": 1})
+    writer.close()
+
+
+def test_pipeline_streams_new_and_resumed_rows(tmp_path):
+    df = pd.DataFrame({
+        "Dataset Name": ["UCMR5", "NMED"],
+        "Website Link": ["https://www.epa.gov/dwucmr", "https://www.env.nm.gov"],
+    })
+    strategy = get_strategy("few-shot-cot")
+    checkpoint = CheckpointLog(str(tmp_path / "out.checkpoint.jsonl"), strategy=strategy.name, model="gpt-4o")
+    checkpoint.append("UCMR5", "https://www.epa.gov/dwucmr",
+                      strategy.legacy_row("UCMR5", "https://www.epa.gov/dwucmr", SCRAPED, answer(12)))
+    root = str(tmp_path / "parquet")
+    with ParquetDatasetWriter(root, strategy=strategy.name, model="gpt-4o") as writer:
+        run_pipeline(
+            df, scrape=lambda url: SCRAPED, evaluate=lambda name, url, scraped: answer(7),
+            build_result=strategy.legacy_row, checkpoint=checkpoint, on_result=writer.write,
+        )
+    checkpoint.close()
+    scores = load_results(root).sort_values("Dataset Name")
+    assert list(zip(scores["Dataset Name"], scores["F-Score"])) == [("NMED", 7), ("UCMR5", 12)]
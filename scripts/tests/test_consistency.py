@@ -0,0 +1,113 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from fair_eval.consistency import SAMPLES_COLUMN, SelfConsistency, consistency_columns
+from fair_eval.reparse import rescore_rows
+from fair_eval.router import confident
+from fair_eval.script import run_script
+from fair_eval.strategies import get_strategy
+
+
+def responder(answers, cached=()):
+    """respond(request) handing out the given answers in order (n per call); calls in cached are cache hits."""
+    answers = iter(answers)
+    calls = iter(range(1000))
+
+    def respond(request):
+        choices = [SimpleNamespace(message=SimpleNamespace(content=next(answers))) for _ in range(request.get("n", 1))]
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20 * len(choices))
+        response = SimpleNamespace(choices=choices, usage=usage)
+        if next(calls) in cached:
+            response.from_cache = True
+        return response
+
+    return respond
+
+
+def row(f):
+    return f"| UCMR5 | F-Score ({f}/17) | A-Score (8/10) | I-Score (5/8) | R-Score (6/7) |"
+
+
+REQUEST = {"model": "gpt-4o", "messages": [{"role": "user", "content": "score"}]}
+
+
+def test_unanimous_samples_agree_without_stopping_early():
+    answer = SelfConsistency(3, min_samples=3).answer(REQUEST, "UCMR5", responder([row(12)] * 3))
+    columns = consistency_columns(answer)
+    assert columns["Samples"] == 3
+    assert columns["Early Stop"] is False
+    assert columns["Agreed"] is True
+    assert confident(answer)
+
+
+def test_agreement_reached_on_the_last_round():
+    sampler = SelfConsistency(4, min_samples=3, tolerance=1)
+    answer = sampler.answer(REQUEST, "UCMR5", responder(["no table", row(12), row(12), row(13)]))
+    # Only two samples parse in the first round; the last allowed one makes three that agree
+    assert answer.stats["samples"] == 4
+    assert answer.stats["early_stop"] is False
+    assert answer.stats["agreed"] is True
+    assert confident(answer)
+
+
+def test_spread_samples_are_not_confident():
+    answer = SelfConsistency(3, min_samples=3).answer(REQUEST, "UCMR5", responder([row(2), row(9), row(16)]))
+    assert answer.stats["agreed"] is False
+    assert not confident(answer)
+
+
+SCRAPED = {"title": "UCMR 5", "license_info": "public domain", "file_formats": ["CSV"], "snippet_tokens": 40}
+
+
+def test_rows_keep_raw_samples_and_consensus_scores():
+    samples = [row(12), row(14), row(13)]
+    answer = SelfConsistency(3, min_samples=3, tolerance=5).answer(REQUEST, "UCMR5", responder(samples))
+    result = get_strategy("few-shot-cot").long_row("gpt-4o", "UCMR5", "https://www.epa.gov/dwucmr", SCRAPED, answer)
+    assert result["FAIR Raw Output"] == samples[0]
+    assert json.loads(result[SAMPLES_COLUMN]) == samples
+    assert result["Aggregate"] == "median"
+    assert result["F-Score"] == 13
+
+
+def test_reparse_recovers_the_consensus():
+    samples = [row(12), row(16), row(16)]
+    answer = SelfConsistency(3, min_samples=3, tolerance=5, aggregate="majority").answer(
+        REQUEST, "UCMR5", responder(samples))
+    result = get_strategy("zero-shot-cot").long_row("gpt-4o", "UCMR5", "https://www.epa.gov/dwucmr", SCRAPED, answer)
+    stored = {**result, "F-Score": None}
+    assert rescore_rows([stored])[0]["F-Score"] == result["F-Score"] == 16
+
+
+def test_extra_tokens_count_fetched_responses_only():
+    # One n=3 round of 100 prompt + 60 completion tokens; a single call costs 100 + 20
+    fetched = SelfConsistency(3, min_samples=3).answer(REQUEST, "UCMR5", responder([row(12)] * 3))
+    assert fetched.stats["extra_tokens"] == 40
+    replayed = SelfConsistency(3, min_samples=3).answer(REQUEST, "UCMR5", responder([row(12)] * 3, cached={0}))
+    assert replayed.stats["extra_tokens"] == 0
+
+
+def test_completion_cache_hits_are_marked(tmp_path):
+    from fair_eval.llm_cache import CompletionCache
+
+    cache = CompletionCache(str(tmp_path / "llm.sqlite"))
+    response = responder([row(12)])(REQUEST)
+    assert cache.get_or_create(REQUEST, lambda: response) is response
+    assert cache.get_or_create(REQUEST, lambda: response).from_cache is True
+    cache.close()
+
+
+def test_extra_tokens_after_a_cached_first_round():
+    # Round one (n=3) is replayed from the cache, round two (n=2) is fetched in full
+    sampler = SelfConsistency(5, min_samples=3, tolerance=0)
+    answer = sampler.answer(REQUEST, "UCMR5", responder([row(2), row(9), row(16), row(9), row(9)], cached={0}))
+    assert answer.stats["calls"] == 2
+    assert answer.stats["extra_tokens"] == 100 + 40
+
+
+@pytest.mark.parametrize("argv, group_size", [(["--batch"], 1), ([], 4)])
+def test_scripts_refuse_sampling_with_batch_or_groups(argv, group_size):
+    settings = {"SELF_CONSISTENCY_SAMPLES": 5, "GROUP_SIZE": group_size}
+    with pytest.raises(SystemExit):
+        run_script("few-shot-cot", "in.csv", "out.csv", settings, description="test", argv=argv)
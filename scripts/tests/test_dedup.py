@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from fair_eval.dedup import canonical_url, page_key  # noqa: E402
+from fair_eval.engine import run_pipeline  # noqa: E402
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["Dataset Name", "Website Link"])
+
+
+class Calls:
+    """Thread-safe record of fetch / evaluate calls."""
+
+    def __init__(self):
+        self.fetched = []
+        self.evaluated = []
+        self._lock = threading.Lock()
+
+    def fetch(self, url):
+        with self._lock:
+            self.fetched.append(url)
+        return f"<html><title>{url}</title></html>"
+
+    def evaluate(self, name, url, scraped, *variant):
+        with self._lock:
+            self.evaluated.append((name, url) + variant)
+        return f"answer for {name} {variant}"
+
+
+def run(df, calls, parse=lambda html: {"title": "same page"}, **kwargs):
+    return run_pipeline(
+        df, fetch=calls.fetch, parse=parse, on_scrape_error=lambda e: {"title": "error"},
+        evaluate=calls.evaluate, build_result=lambda name, url, scraped, output, *variant: (name, url, output),
+        parse_workers=0, **kwargs,
+    )
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.epa.gov/dwucmr/data#3", "https://www.epa.gov/dwucmr/data"),
+    ("  https://www.epa.gov/dwucmr/data  ", "https://www.epa.gov/dwucmr/data"),
+    ("HTTPS://WWW.EPA.GOV/dwucmr/Data", "https://www.epa.gov/dwucmr/Data"),
+    ("https://www.epa.gov:443/data", "https://www.epa.gov/data"),
+    ("http://example.org:8080/data", "http://example.org:8080/data"),
+    ("https://example.org/data?utm_source=x&id=7&gclid=abc", "https://example.org/data?id=7"),
+    ("https://example.org/data?b=2&a=1", "https://example.org/data?b=2&a=1"),
+    ("https://example.org", "https://example.org/"),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_canonical_url_leaves_non_urls_alone():
+    assert pd.isna(canonical_url(float("nan")))
+    assert canonical_url(None) is None
+    assert canonical_url(" not a url ") == "not a url"
+
+
+def test_page_key_ignores_key_order():
+    assert page_key({"title": "UCMR", "formats": ["CSV"]}) == page_key({"formats": ["CSV"], "title": "UCMR"})
+    assert page_key({"title": "UCMR"}) != page_key({"title": "UCMR 5"})
+
+
+def test_url_dedup_fetches_each_canonical_url_once():
+    calls = Calls()
+    df = frame([
+        ("UCMR3", "https://www.epa.gov/dwucmr/data#3"),
+        ("UCMR5", " https://WWW.EPA.GOV/dwucmr/data?utm_source=x#5"),
+        ("NMED", "https://www.env.nm.gov/data"),
+    ])
+    results = run(df, calls, dedup="url")
+    assert sorted(calls.fetched) == ["https://www.env.nm.gov/data", "https://www.epa.gov/dwucmr/data"]
+    # Every row is still scored and keeps its own link
+    assert len(calls.evaluated) == 3
+    assert [(name, url) for name, url, _ in results] == list(zip(df["Dataset Name"], df["Website Link"]))
+
+
+def test_dedup_off_fetches_every_row():
+    calls = Calls()
+    df = frame([("UCMR3", "https://www.epa.gov/dwucmr/data#3"), ("UCMR5", "https://www.epa.gov/dwucmr/data#5")])
+    run(df, calls, dedup="off")
+    assert len(calls.fetched) == 2
+
+
+def test_content_dedup_fans_one_answer_out_within_a_dataset():
+    calls = Calls()
+    df = frame([
+        ("UCMR3", "https://www.epa.gov/dwucmr/data#3"),
+        ("UCMR5", "https://www.epa.gov/dwucmr/data#5"),
+        ("UCMR3", "https://mirror.example.org/ucmr"),
+    ])
+    results = run(df, calls, dedup="content")
+    # Same content everywhere, but UCMR5 is another dataset and gets its own call
+    assert sorted(name for name, _ in calls.evaluated) == ["UCMR3", "UCMR5"]
+    assert [output for _, _, output in results] == ["answer for UCMR3 ()", "answer for UCMR5 ()", "answer for UCMR3 ()"]
+    assert [url for _, url, _ in results] == list(df["Website Link"])
+
+
+def test_content_dedup_keeps_different_pages_apart():
+    calls = Calls()
+    df = frame([("NMED", "https://www.env.nm.gov/a"), ("NMED", "https://www.env.nm.gov/b")])
+    run(df, calls, parse=lambda html: {"title": html}, dedup="content")
+    assert len(calls.evaluated) == 2
+
+
+def test_content_dedup_with_groups():
+    calls = Calls()
+    df = frame([("A", "https://example.org/a"), ("A", "https://mirror.example.org/a"), ("B", "https://example.org/b")])
+    groups = []
+
+    def evaluate_group(items):
+        groups.append([name for name, _, _ in items])
+        return [f"grouped {name}" for name, _, _ in items]
+
+    results = run(df, calls, dedup="content", group_size=2, evaluate_group=evaluate_group)
+    assert sorted(name for group in groups for name in group) == ["A", "B"]
+    assert [output for _, _, output in results] == ["grouped A", "grouped A", "grouped B"]
+
+
+def test_failed_fetches_are_not_shared():
+    df = frame([("A", "https://example.org/a"), ("A", "https://mirror.example.org/a")])
+    evaluated = []
+
+    def fetch(url):
+        raise OSError("connection refused")
+
+    run_pipeline(
+        df, fetch=fetch, parse=lambda html: {}, on_scrape_error=lambda e: {"title": "Error scraping website"},
+        evaluate=lambda name, url, scraped: evaluated.append(url) or "answer",
+        build_result=lambda name, url, scraped, output: output, parse_workers=0, dedup="content",
+    )
+    assert len(evaluated) == 2
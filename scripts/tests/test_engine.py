@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from fair_eval.engine import run_pipeline  # noqa: E402
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["Dataset Name", "Website Link"])
+
+
+class Calls:
+    """Thread-safe record of fetch / evaluate calls."""
+
+    def __init__(self):
+        self.fetched = []
+        self.evaluated = []
+        self._lock = threading.Lock()
+
+    def fetch(self, url):
+        with self._lock:
+            self.fetched.append(url)
+        return f"<html><title>{url}</title></html>"
+
+    def evaluate(self, name, url, scraped, *variant):
+        with self._lock:
+            self.evaluated.append((name, url) + variant)
+        return f"answer for {name} {variant}"
+
+
+def run(df, calls, parse=lambda html: {"title": "same page"}, **kwargs):
+    return run_pipeline(
+        df, fetch=calls.fetch, parse=parse, on_scrape_error=lambda e: {"title": "error"},
+        evaluate=calls.evaluate, build_result=lambda name, url, scraped, output, *variant: (name, url, output),
+        parse_workers=0, **kwargs,
+    )
+
+
+def test_results_keep_input_order():
+    # Earlier rows take longer, so they finish last
+    names = [f"D{i}" for i in range(8)]
+    df = frame([(name, f"https://example.org/{name}") for name in names])
+
+    def evaluate(name, url, scraped):
+        time.sleep(0.01 * (8 - int(name[1:])))
+        return name
+
+    results = run_pipeline(
+        df, scrape=lambda url: {"url": url}, evaluate=evaluate,
+        build_result=lambda name, url, scraped, output: (name, url, scraped["url"], output),
+        llm_concurrency=8, scrape_concurrency=8,
+    )
+    assert results == [(name, f"https://example.org/{name}", f"https://example.org/{name}", name) for name in names]
+
+
+def test_variants_are_row_major():
+    calls = Calls()
+    df = frame([("A", "https://example.org/a"), ("B", "https://example.org/b")])
+    variants = [("zero-shot-cot", "gpt-4o"), ("few-shot-cot", "gpt-4o")]
+    results = run(df, calls, variants=variants)
+    assert [(name, output) for name, _, output in results] == [
+        ("A", f"answer for A {(variants[0],)}"), ("A", f"answer for A {(variants[1],)}"),
+        ("B", f"answer for B {(variants[0],)}"), ("B", f"answer for B {(variants[1],)}"),
+    ]
+    assert len(calls.fetched) == 2
+
+
+def test_scrape_errors_go_through_on_scrape_error():
+    df = frame([("A", "https://example.org/a"), ("B", "https://example.org/b")])
+
+    def scrape(url):
+        if url.endswith("/a"):
+            raise OSError("connection refused")
+        return {"title": "B page"}
+
+    results = run_pipeline(
+        df, scrape=scrape, on_scrape_error=lambda e: {"title": "Error scraping website", "description": str(e)},
+        evaluate=lambda name, url, scraped: scraped["title"],
+        build_result=lambda name, url, scraped, output: (name, output),
+    )
+    assert results == [("A", "Error scraping website"), ("B", "B page")]
+
+
+def test_scrape_errors_without_handler_stop_the_run():
+    def scrape(url):
+        raise OSError("connection refused")
+
+    with pytest.raises(OSError):
+        run_pipeline(
+            frame([("A", "https://example.org/a")]), scrape=scrape,
+            evaluate=lambda name, url, scraped: "answer", build_result=lambda name, url, scraped, output: output,
+        )
+
+
+def test_failed_scrapes_are_not_shared():
+    # Scrape-only path: error pages all look alike but must each be scored
+    df = frame([("A", "https://example.org/a"), ("A", "https://mirror.example.org/a")])
+    evaluated = []
+
+    def scrape(url):
+        raise OSError("connection refused")
+
+    run_pipeline(
+        df, scrape=scrape, on_scrape_error=lambda e: {"title": "Error scraping website"},
+        evaluate=lambda name, url, scraped: evaluated.append(url) or "answer",
+        build_result=lambda name, url, scraped, output: output, dedup="content",
+    )
+    assert sorted(evaluated) == ["https://example.org/a", "https://mirror.example.org/a"]
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("bs4")
+
+from fair_eval.benchmarks.pipeline import synthetic_page  # noqa: E402
+from fair_eval.scraper import parse_html  # noqa: E402
+
+PAGES = [synthetic_page(i) for i in range(5)] + [
+    """<html><head><title> UCMR 5 Data </title>
+    <meta name="description" content=" Occurrence data for 29 PFAS ">
+    <script>var license = 'MIT';</script><style>p { color: red; }</style></head>
+    <body><p>Released under the <b>CC0</b> public domain dedication &amp; free to reuse.</p>
+    <p>Cite as https://doi.org/10.5066/P9ABC123 or hdl:2027/abc123.</p>
+    <a href="data/ucmr5.zip">zip</a> <a href="/files/ucmr5.xlsx">xlsx</a> <a href="about.html">About</a>
+    <!-- CC-BY 4.0 in a comment is not page text --></body></html>""",
+    "<html><body><p>No title or description here.</p></body></html>",
+    "",
+    "  \n",
+]
+
+
+@pytest.mark.parametrize("snippet_tokens", [None, 120])
+@pytest.mark.parametrize("html", PAGES)
+def test_streaming_matches_beautifulsoup(html, snippet_tokens):
+    streaming = parse_html(html, streaming=True, snippet_tokens=snippet_tokens)
+    tree = parse_html(html, streaming=False, snippet_tokens=snippet_tokens)
+    assert streaming == tree
+
+
+def test_extracted_fields():
+    scraped = parse_html(PAGES[5])
+    assert scraped["title"] == "UCMR 5 Data"
+    assert scraped["description"] == "Occurrence data for 29 PFAS"
+    assert scraped["license_info"] == "public domain"
+    assert "DOI" in scraped["identifier_info"]
+    assert scraped["download_links"] == ["data/ucmr5.zip", "/files/ucmr5.xlsx"]
+    assert "MIT" not in scraped["raw_text_snippet"]
+
+
+@pytest.mark.parametrize("html", ["", "  \n"])
+def test_blank_page_is_empty_not_an_error(html):
+    scraped = parse_html(html)
+    assert scraped["title"] == scraped["description"] == "Not found"
+    assert scraped["download_links"] == ["None detected"]
+    assert scraped["raw_text_snippet"] == ""
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+
+from fair_eval.http_cache import HttpCache, cached_get
+from fair_eval.mock_server import PageStub
+
+URL = "https://www.epa.gov/dwucmr/data"
+
+
+class FakeSession:
+    """Serves one page with an ETag, answering 304 when If-None-Match matches."""
+
+    def __init__(self, body="<html>UCMR</html>", etag='"v1"'):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, timeout=10, headers=None):
+        self.requests.append(dict(headers or {}))
+        if headers and headers.get("If-None-Match") == self.etag:
+            return SimpleNamespace(status_code=304, text="", headers={"ETag": self.etag})
+        return SimpleNamespace(status_code=200, text=self.body, headers={"ETag": self.etag})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HttpCache(str(tmp_path / "http_cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_fresh_entry_needs_no_request(cache):
+    session = FakeSession()
+    assert cached_get(URL, cache, session=session) == "<html>UCMR</html>"
+    assert cached_get(URL, cache, session=session) == "<html>UCMR</html>"
+    assert len(session.requests) == 1
+    assert cache.stats() == {"hits": 1, "revalidated": 0, "fetched": 1}
+
+
+def test_stale_entry_is_revalidated_with_its_etag(cache):
+    session = FakeSession()
+    cached_get(URL, cache, session=session)
+    cache.ttl_seconds = 0
+    assert cached_get(URL, cache, session=session) == "<html>UCMR</html>"
+    assert session.requests[1] == {"If-None-Match": '"v1"'}
+    assert cache.stats() == {"hits": 0, "revalidated": 1, "fetched": 1}
+
+
+def test_changed_page_replaces_the_entry(cache):
+    cached_get(URL, cache, session=FakeSession())
+    cache.ttl_seconds = 0
+    assert cached_get(URL, cache, session=FakeSession(body="<html>v2</html>", etag='"v2"')) == "<html>v2</html>"
+    assert cache.lookup(URL)["etag"] == '"v2"'
+
+
+def test_errors_are_not_cached(cache):
+    class Failing:
+        def get(self, url, timeout=10, headers=None):
+            return SimpleNamespace(status_code=503, text="Service Unavailable", headers={})
+
+    assert cached_get(URL, cache, session=Failing()) == "Service Unavailable"
+    assert cache.lookup(URL) is None
+
+
+def test_revalidation_against_page_stub(cache):
+    pytest.importorskip("requests")
+    from fair_eval.http_client import PooledClient
+
+    pages = {URL: {"body": "<html><title>UCMR</title></html>", "etag": '"abc"', "last_modified": None}}
+    with PageStub(pages) as stub:
+        client = PooledClient(rewrite=stub.rewrite)
+        try:
+            first = cached_get(URL, cache, session=client)
+            cache.ttl_seconds = 0
+            second = cached_get(URL, cache, session=client)
+        finally:
+            client.close()
+        assert first == second == "<html><title>UCMR</title></html>"
+        assert stub.stats() == {"served": 1, "not_modified": 1, "missing": 0, "errors": 0}
+    assert cache.stats()["revalidated"] == 1
@@ -0,0 +1,91 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from fair_eval.llm_cache import CompletionCache
+from fair_eval.mock_server import MockLLMServer, completion_body, load_recorded, synthetic_content
+from fair_eval.parsing import check_valid, parse_scores
+
+
+def request(name):
+    return {"model": "gpt-4o", "messages": [{"role": "user", "content": f'Dataset: "{name}"\nURL: https://example.org'}]}
+
+
+def post(server, body):
+    req = urllib.request.Request(server.url + "/chat/completions", data=json.dumps(body).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, json.load(response), dict(response.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e), dict(e.headers)
+
+
+def test_synthetic_scores_depend_only_on_the_dataset():
+    first = parse_scores(synthetic_content(request("UCMR5")))
+    assert first == parse_scores(synthetic_content(request("UCMR5")))
+    assert first["Parse Success"] and check_valid(first)
+    assert first["Dataset Name (Parsed)"] == "UCMR5"
+
+
+def test_recorded_responses_are_replayed(tmp_path):
+    recorded_path = tmp_path / "recorded.jsonl"
+    body = completion_body(request("UCMR5"), "recorded answer")
+    recorded_path.write_text(json.dumps({"request": request("UCMR5"), "response": body}) + "\n", encoding="utf-8")
+    with MockLLMServer(recorded=str(recorded_path)) as server:
+        status, payload, _ = post(server, request("UCMR5"))
+        assert status == 200
+        assert payload["choices"][0]["message"]["content"] == "recorded answer"
+        status, payload, _ = post(server, request("NMED"))
+        assert status == 200 and "NMED" in payload["choices"][0]["message"]["content"]
+        assert server.stats() == {"requests": 2, "replayed": 1, "synthetic": 1, "missing": 0,
+                                  "rate_limited": 0, "malformed": 0}
+
+
+def test_replay_only_answers_unknown_requests_with_404(tmp_path):
+    cache_path = str(tmp_path / "llm.sqlite")
+    cache = CompletionCache(cache_path)
+    cache.put(request("UCMR5"), completion_body(request("UCMR5"), "cached answer"))
+    cache.close()
+    with MockLLMServer(recorded=load_recorded(cache_path), replay_only=True) as server:
+        assert post(server, request("UCMR5"))[1]["choices"][0]["message"]["content"] == "cached answer"
+        status, payload, _ = post(server, request("NMED"))
+        assert status == 404
+        assert payload["error"]["code"] == "not_recorded"
+        assert server.stats()["missing"] == 1
+
+
+def test_rate_limits_carry_retry_after():
+    with MockLLMServer(rate_limit_rate=1.0, retry_after=2.5) as server:
+        status, _, headers = post(server, request("UCMR5"))
+    assert status == 429
+    assert headers["Retry-After"] == "2.5"
+
+
+def faults(seed):
+    server = MockLLMServer(rate_limit_rate=0.3, malformed_rate=0.3, seed=seed)
+    try:
+        outcomes = []
+        for i in range(30):
+            status, payload, _ = server.handle_completion(request(f"D{i}"))
+            outcomes.append((status, payload["choices"][0]["message"]["content"] if status == 200 else None))
+        return outcomes, server.stats()
+    finally:
+        server.stop()
+
+
+def test_injected_faults_are_reproducible_with_a_seed():
+    outcomes, stats = faults(seed=7)
+    assert (outcomes, stats) == faults(seed=7)
+    assert stats["rate_limited"] > 0 and stats["malformed"] > 0
+    assert stats["requests"] + stats["rate_limited"] == 30
+
+
+def test_malformed_answers_do_not_score_cleanly():
+    with MockLLMServer(malformed_rate=1.0, seed=1) as server:
+        for i in range(10):
+            content = server.complete(request(f"D{i}"))["choices"][0]["message"]["content"]
+            assert not check_valid(parse_scores(content))
+        assert server.stats()["malformed"] == 10
@@ -0,0 +1,146 @@
+import json
+import time
+
+import pytest
+
+from fair_eval.parsing import (
+    check_valid,
+    extract_scores_from_markdown,
+    parse_scores,
+    split_score_rows,
+)
+
+HEADER = (
+    "| Dataset Name | F-Score (X/17) | A-Score (X/10) | I-Score (X/8) | R-Score (X/7) |\n"
+    "|---|---|---|---|---|\n"
+)
+EXPECTED = {"F-Score": 12, "A-Score": 8, "I-Score": 5, "R-Score": 6}
+
+
+def scores(parsed):
+    return {score: parsed[score] for score in EXPECTED}
+
+
+@pytest.mark.parametrize("row", [
+    "| UCMR5 | F-Score (12/17) | A-Score (8/10) | I-Score (5/8) | R-Score (6/7) |",
+    "| **UCMR5** | **F-Score (12/17)** | **A-Score (8/10)** | **I-Score (5/8)** | **R-Score (6/7)** |",
+    "| UCMR5 | **F-Score**: 12/17 | **A-Score**: 8/10 | **I-Score**: 5/8 | **R-Score**: 6/7 |",
+    "| UCMR5 | F-Score: 12/17 | A-Score: 8/10 | I-Score: 5/8 | R-Score: 6/7 |",
+    "| UCMR5 | F Score (12 / 17) | A Score (8 / 10) | I Score (5 / 8) | R Score (6 / 7) |",
+    "| UCMR5 | 12/17 | 8/10 | 5/8 | 6/7 |",
+    "UCMR5 | 12/17 | 8/10 | 5/8 | 6/7 |",
+])
+def test_table_row_variants(row):
+    answer = "Step 1: the page has a DOI.\n\n" + HEADER + row + "\n\nDone."
+    parsed = parse_scores(answer)
+    assert parsed["Parse Success"]
+    assert parsed["Dataset Name (Parsed)"] == "UCMR5"
+    assert scores(parsed) == EXPECTED
+
+
+def test_first_complete_row_wins_over_later_rows():
+    answer = HEADER + "| UCMR5 | 12/17 | 8/10 | 5/8 | 6/7 |\n| UCMR5 | 1/17 | 1/10 | 1/8 | 1/7 |"
+    assert scores(parse_scores(answer)) == EXPECTED
+
+
+def test_scores_written_out_in_text_use_the_last_mention():
+    answer = (
+        "**Step 1:** F-Score so far (3/17).\n"
+        "**F-Score:** 12 out of 17 because the DOI resolves.\n"
+        "**A-Score:** 8/10\n"
+        "The I-Score = 5/8 and the R-Score (6/7) reflect the open license."
+    )
+    parsed = parse_scores(answer)
+    assert parsed["Parse Success"]
+    assert parsed["Dataset Name (Parsed)"] is None
+    assert scores(parsed) == EXPECTED
+
+
+def test_missing_score_mention_fails_the_whole_parse():
+    parsed = parse_scores("F-Score: 12/17, A-Score: 8/10, I-Score: 5/8")
+    assert not parsed["Parse Success"]
+    assert all(parsed[score] is None for score in EXPECTED)
+
+
+@pytest.mark.parametrize("answer", [
+    '{"dataset_name": "UCMR5", "f_score": 12, "a_score": 8, "i_score": 5, "r_score": 6}',
+    '```json\n{"dataset_name": "UCMR5", "f_score": 12, "a_score": 8, "i_score": 5, "r_score": 6}\n```',
+])
+def test_json_answer(answer):
+    parsed = parse_scores(answer)
+    assert parsed["Parse Success"]
+    assert parsed["Dataset Name (Parsed)"] == "UCMR5"
+    assert scores(parsed) == EXPECTED
+
+
+@pytest.mark.parametrize("answer", [
+    '{"dataset_name": "UCMR5", "f_score": 12, "a_score": 8, "i_score": 5}',
+    '{"dataset_name": "UCMR5", "f_score": true, "a_score": 8, "i_score": 5, "r_score": 6}',
+    '{"dataset_name": "UCMR5", "f_score": "12", "a_score": 8, "i_score": 5, "r_score": 6}',
+    '{"dataset_name": "UCMR5", "f_score": 12,',
+])
+def test_malformed_json_answer_does_not_parse(answer):
+    assert not parse_scores(answer)["Parse Success"]
+
+
+@pytest.mark.parametrize("answer", [None, "", "I cannot access the website."])
+def test_unparseable_answer(answer):
+    parsed = parse_scores(answer)
+    assert not parsed["Parse Success"]
+    assert not check_valid(parsed)
+
+
+def test_markdown_variant_has_no_parse_success_key():
+    parsed = extract_scores_from_markdown(HEADER + "| UCMR5 | 12/17 | 8/10 | 5/8 | 6/7 |")
+    assert "Parse Success" not in parsed
+    assert scores(parsed) == EXPECTED
+
+
+def test_out_of_range_scores_parse_but_are_not_valid():
+    parsed = parse_scores("| UCMR5 | 12/17 | 8/10 | 9/8 | 6/7 |")
+    assert parsed["Parse Success"]
+    assert not check_valid(parsed)
+
+
+def test_split_group_rows_by_name():
+    answer = HEADER + (
+        "| **ucmr5** | 12/17 | 8/10 | 5/8 | 6/7 |\n"
+        "| NMED | F-Score (9/17) | A-Score (7/10) | I-Score (4/8) | R-Score (5/7) |\n"
+    )
+    ucmr5, nmed, missing = split_score_rows(answer, ["UCMR5", "NMED", "EJScreen"])
+    assert scores(parse_scores(ucmr5)) == EXPECTED
+    assert parse_scores(nmed)["F-Score"] == 9
+    assert missing is None
+
+
+def test_split_group_rows_leaves_duplicate_names_unassigned():
+    answer = HEADER + "| NMED | 9/17 | 7/10 | 4/8 | 5/7 |\n| NMED | 8/17 | 6/10 | 3/8 | 4/7 |\n"
+    assert split_score_rows(answer, ["NMED", "NMED"]) == [None, None]
+
+
+def test_split_group_json_answer():
+    entries = [
+        {"dataset_name": "UCMR5", "f_score": 12, "a_score": 8, "i_score": 5, "r_score": 6},
+        {"dataset_name": "NMED", "f_score": 9, "a_score": 7, "i_score": 4, "r_score": 5},
+    ]
+    nmed, ucmr5 = split_score_rows(json.dumps({"datasets": entries}), ["NMED", "UCMR5"])
+    assert parse_scores(nmed)["F-Score"] == 9
+    assert scores(parse_scores(ucmr5)) == EXPECTED
+
+
+@pytest.mark.parametrize("padding", [" ", "*", " *", "\t"])
+def test_long_padding_parses_in_linear_time(padding):
+    # Runs like these used to backtrack quadratically (seconds at 10k characters)
+    run = padding * (40000 // len(padding))
+    answer = "\n".join([
+        run + "|",
+        "| UCMR5 |" + run + "x",
+        "F-Score" + run + "x",
+        "F-Score:" + run + "x",
+        HEADER + "| UCMR5 |" + run + "12/17" + run + "| 8/10 | 5/8 | 6/7 |",
+    ])
+    start = time.perf_counter()
+    parsed = parse_scores(answer)
+    assert time.perf_counter() - start < 1.0
+    assert parsed["Dataset Name (Parsed)"] == "UCMR5"
+    assert scores(parsed) == EXPECTED
@@ -0,0 +1,96 @@
+import email.utils
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from fair_eval.ratelimit import RateLimiter, TokenBucket, create_completion, retry_after_seconds
+
+
+def error(headers):
+    return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "7"}, 7.0),
+    ({"retry-after-ms": "soon", "retry-after": "2"}, 2.0),
+    ({"retry-after": "soon"}, None),
+    ({"retry-after": ""}, None),
+    ({}, None),
+])
+def test_retry_after_seconds(headers, expected):
+    assert retry_after_seconds(error(headers)) == expected
+
+
+def test_retry_after_http_date():
+    value = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= retry_after_seconds(error({"retry-after": value})) <= 30
+
+
+def test_error_without_response():
+    assert retry_after_seconds(RuntimeError("boom")) is None
+
+
+def test_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=60, window_seconds=10)  # 1 per second, capacity 10
+    now = bucket.updated
+    assert bucket.wait_time(10, now) == 0.0
+    bucket.take(10)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+
+
+def test_oversized_amount_waits_for_a_full_bucket():
+    bucket = TokenBucket(per_minute=60, window_seconds=10)
+    now = bucket.updated
+    bucket.take(5)
+    assert bucket.wait_time(1000, now) == pytest.approx(5.0)
+
+
+def test_pause_holds_the_limiter():
+    limiter = RateLimiter(rpm=6000, tpm=10**6)
+    assert limiter.wait_time(10) == 0.0
+    limiter.pause(30)
+    assert 29 <= limiter.wait_time(10) <= 30
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self):
+        super().__init__("rate limited")
+        self.response = SimpleNamespace(headers={"retry-after-ms": "10"})
+
+
+class FlakyClient:
+    """Answers with a 429 `failures` times, then succeeds."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **prompt):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RateLimited()
+        return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3))
+
+
+PROMPT = {"model": "gpt-4o", "messages": [{"role": "user", "content": "Score this page"}], "max_tokens": 100}
+
+
+def test_create_completion_retries_after_429():
+    client = FlakyClient(failures=2)
+    limiter = RateLimiter(rpm=6000, tpm=10**6)
+    response = create_completion(client, PROMPT, limiter)
+    assert client.calls == 3
+    assert response.usage.prompt_tokens == 12
+
+
+def test_create_completion_gives_up_after_max_retries():
+    client = FlakyClient(failures=5)
+    with pytest.raises(RateLimited):
+        create_completion(client, PROMPT, RateLimiter(rpm=6000, tpm=10**6), max_retries=1)
+    assert client.calls == 2
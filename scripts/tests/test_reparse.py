@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from fair_eval.reparse import main, reparse, rescore_rows  # noqa: E402
+from fair_eval.strategies import get_strategy  # noqa: E402
+
+SCRAPED = {"title": "UCMR 5", "license_info": "public domain", "file_formats": ["CSV"], "snippet_tokens": 40}
+
+
+def answer(name, f):
+    return f"| {name} | F-Score ({f}/17) | A-Score (8/10) | I-Score (5/8) | R-Score (6/7) |"
+
+
+def stale(row):
+    """A row as an older parser left it: the answer is stored, the scores are missing."""
+    return {**row, "Parse Success": False, "F-Score": None, "A-Score": None, "I-Score": None, "R-Score": None}
+
+
+def long_rows(n=6):
+    strategy = get_strategy("few-shot-cot")
+    return [stale(strategy.long_row("gpt-4o", f"D{i}", f"https://example.org/{i}", SCRAPED, answer(f"D{i}", i)))
+            for i in range(n)]
+
+
+def test_rescore_rows_rebuilds_the_score_columns():
+    zero_shot = stale(get_strategy("zero-shot-cot").legacy_row("UCMR5", "https://www.epa.gov", SCRAPED,
+                                                                answer("UCMR5", 12)))
+    few_shot = get_strategy("few-shot-cot").legacy_row("UCMR5", "https://www.epa.gov", SCRAPED, answer("UCMR5", 99))
+    few_shot["FAIR Evaluation Raw Output"] = answer("UCMR5", 13)
+    rescored = rescore_rows([zero_shot, few_shot])
+    assert rescored[0]["F-Score"] == 12 and rescored[0]["Parse Success"] is True
+    assert rescored[1]["F-Score"] == 13 and rescored[1]["F-Score Valid"] is True
+
+
+def test_rows_without_a_raw_answer_are_rejected():
+    with pytest.raises(ValueError):
+        rescore_rows([{"Dataset Name": "UCMR5", "F-Score": 12}])
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_csv_is_rescored_in_chunks(tmp_path, workers):
+    src, dst = str(tmp_path / "long.csv"), str(tmp_path / "long.reparsed.csv")
+    pd.DataFrame(long_rows()).to_csv(src, index=False)
+    changes = reparse(src, dst, workers=workers, chunk_rows=2)
+    assert changes.stats() == {"rows": 6, "changed": 6, "newly_parsed": 6, "no_longer_parsed": 0}
+    out = pd.read_csv(dst)
+    assert list(out["F-Score"]) == list(range(6))
+    assert list(out.columns) == list(pd.read_csv(src).columns)
+
+
+def test_in_place_and_existing_outputs(tmp_path):
+    src = str(tmp_path / "long.csv")
+    pd.DataFrame(long_rows(2)).to_csv(src, index=False)
+    assert main([src, "--in-place", "-j", "0"]) == 0
+    assert list(pd.read_csv(src)["F-Score"]) == [0, 1]
+    assert not os.path.exists(src + ".reparse-tmp")
+    open(tmp_path / "long.reparsed.csv", "w").close()
+    with pytest.raises(SystemExit):
+        main([src, "-j", "0"])
+
+
+def test_parquet_dataset_keeps_its_layout(tmp_path):
+    pytest.importorskip("pyarrow")
+    from fair_eval.columnar import load_results, write_parquet_dataset
+
+    src, dst = str(tmp_path / "parquet"), str(tmp_path / "reparsed")
+    write_parquet_dataset(long_rows(4), src, run_id="r1")
+    changes = reparse(src, dst, workers=0)
+    assert changes.stats()["newly_parsed"] == 4
+    assert sorted(os.listdir(os.path.join(dst, "run=r1"))) == ["strategy=few-shot-cot"]
+    scores = load_results(dst).sort_values("Dataset Name")
+    assert list(scores["F-Score"]) == [0, 1, 2, 3]
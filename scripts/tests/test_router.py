@@ -0,0 +1,136 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from fair_eval.router import Deployment, Router, build_router, routing_columns
+
+_names = itertools.count()
+
+
+class ApiError(Exception):
+    def __init__(self, status, retry_after_ms="1"):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(headers={"retry-after-ms": retry_after_ms})
+
+
+class FakeClient:
+    """chat.completions.create that fails with the given statuses first, then answers."""
+
+    def __init__(self, failures=(), content="answer", retry_after_ms="1"):
+        self.failures = list(failures)
+        self.retry_after_ms = retry_after_ms
+        self.content = content
+        self.models = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **prompt):
+        self.models.append(prompt["model"])
+        if self.failures:
+            raise ApiError(self.failures.pop(0), self.retry_after_ms)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)],
+                               usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5))
+
+
+def deployment(client, model="gpt-4o", price=None):
+    # Limiters are shared per label, so every test gets fresh deployment names
+    return Deployment(model, f"{model}-{next(_names)}", client, rpm=6000, tpm=10**6, price=price)
+
+
+PROMPT = {"model": "gpt-4o", "messages": [{"role": "user", "content": "Score UCMR5"}], "max_tokens": 50}
+
+
+def test_cheapest_deployment_wins_when_equally_fast():
+    cheap, dear = FakeClient(), FakeClient()
+    router = Router({"gpt-4o": [deployment(dear, price=5.0), deployment(cheap, price=2.5)]})
+    router.create(PROMPT)
+    assert len(cheap.models) == 1 and not dear.models
+
+
+def test_429_fails_over_to_the_next_deployment():
+    # Retry-After keeps the busy (cheaper) deployment paused beyond the router's slack
+    busy, idle = FakeClient(failures=[429], retry_after_ms="5000"), FakeClient()
+    pool = [deployment(busy, price=1.0), deployment(idle, price=2.0)]
+    router = Router({"gpt-4o": pool})
+    response = router.create(PROMPT)
+    assert response.choices[0].message.content == "answer"
+    # Requests go out under the deployment name, not the model name
+    assert busy.models == [pool[0].name] and idle.models == [pool[1].name]
+    stats = router.stats()
+    assert stats["failovers"] == 1
+    assert stats["deployments"][pool[0].label]["errors"] == 1
+
+
+def test_client_errors_are_not_retried():
+    broken, idle = FakeClient(failures=[400]), FakeClient()
+    router = Router({"gpt-4o": [deployment(broken, price=1.0), deployment(idle, price=2.0)]})
+    with pytest.raises(ApiError):
+        router.create(PROMPT)
+    assert not idle.models
+
+
+def test_gives_up_after_every_deployment_and_retry_failed():
+    clients = [FakeClient(failures=[503] * 5) for _ in range(2)]
+    router = Router({"gpt-4o": [deployment(c) for c in clients]}, max_retries=1)
+    with pytest.raises(ApiError):
+        router.create(PROMPT)
+    assert sum(len(c.models) for c in clients) == 3
+
+
+def test_unknown_model_is_rejected():
+    router = Router({"gpt-4o": [deployment(FakeClient())]})
+    with pytest.raises(ValueError):
+        router.create(dict(PROMPT, model="gpt-5"))
+
+
+TABLE = "| UCMR5 | F-Score ({}/17) | A-Score (8/10) | I-Score (5/8) | R-Score (6/7) |"
+EASY = {"snippet_tokens": 120, "license_info": "CC-BY 4.0"}
+HARD = {"snippet_tokens": 900, "license_info": "Not detected"}
+
+
+def cascade_router():
+    return Router({"gpt-4o": [deployment(FakeClient())],
+                   "gpt-4o-mini": [deployment(FakeClient(), model="gpt-4o-mini")]}, easy_model="gpt-4o-mini")
+
+
+def test_confident_easy_answers_stay_on_the_cheap_model():
+    router = cascade_router()
+    tried = []
+    answer = router.cascade("gpt-4o", EASY, lambda model: tried.append(model) or TABLE.format(12))
+    assert tried == ["gpt-4o-mini"]
+    assert routing_columns(answer) == {"Answered By": "gpt-4o-mini"}
+
+
+def test_out_of_range_answers_escalate():
+    router = cascade_router()
+    answers = {"gpt-4o-mini": TABLE.format(99), "gpt-4o": TABLE.format(12)}
+    answer = router.cascade("gpt-4o", EASY, answers.get)
+    assert answer == TABLE.format(12)
+    assert routing_columns(answer) == {"Answered By": "gpt-4o"}
+    assert router.stats()["escalations"] == 1
+
+
+def test_hard_pages_go_straight_to_the_main_model():
+    tried = []
+    cascade_router().cascade("gpt-4o", HARD, lambda model: tried.append(model) or TABLE.format(12))
+    assert tried == ["gpt-4o"]
+
+
+def test_cascade_off_leaves_answers_untouched():
+    router = Router({"gpt-4o": [deployment(FakeClient())]})
+    assert routing_columns(router.cascade("gpt-4o", EASY, lambda model: TABLE.format(12))) == {}
+
+
+def test_build_router_pools_entries_by_model():
+    client = FakeClient()
+    router = build_router([
+        {"model": "gpt-4o", "deployment": f"east-{next(_names)}", "rpm": 60, "tpm": 80000},
+        {"model": "gpt-4o", "deployment": f"west-{next(_names)}", "rpm": 60, "tpm": 80000, "price": 2.5},
+        {"model": "gpt-4o-mini", "rpm": 60, "tpm": 80000},
+    ], client, "2024-02-01", easy_model="gpt-4o-mini")
+    assert router.width == 2
+    assert [d.client for d in router.pools["gpt-4o"]] == [client, client]
+    with pytest.raises(ValueError):
+        Router(router.pools, easy_model="gpt-3.5")
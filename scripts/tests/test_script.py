@@ -0,0 +1,66 @@
+import glob
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = sorted(glob.glob(os.path.join(SCRIPTS_DIR, "LLM_FAIR_Final_*.py")))
+HEAVY = ("openai", "pandas", "requests", "lxml", "bs4", "tiktoken", "pyarrow")
+
+
+def load_script(path):
+    spec = importlib.util.spec_from_file_location("fair_script", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("path", SCRIPTS, ids=os.path.basename)
+def test_importing_a_script_loads_no_heavy_dependency(path):
+    code = (
+        "import importlib.util, sys\n"
+        f"spec = importlib.util.spec_from_file_location('fair_script', {path!r})\n"
+        "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_run_script_end_to_end(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("openai")
+    pytest.importorskip("lxml")
+    from fair_eval.mock_server import MockLLMServer, PageStub
+    from fair_eval.script import run_script
+
+    script = load_script(os.path.join(SCRIPTS_DIR, "LLM_FAIR_Final_3_FewShotCoT.py"))
+    pages = {
+        f"https://example.org/{name}": {
+            "body": f"<html><title>{name}</title><body><p>{name} data under CC-BY 4.0.</p></body></html>",
+            "etag": None, "last_modified": None,
+        }
+        for name in ("ucmr5", "nmed")
+    }
+    input_csv = tmp_path / "in.csv"
+    pd.DataFrame({"Dataset Name": ["UCMR5", "NMED"], "Website Link": list(pages)}).to_csv(input_csv, index=False)
+    output_csv = tmp_path / "out.csv"
+
+    with MockLLMServer() as server, PageStub(pages) as stub:
+        settings = dict(
+            vars(script), AZURE_OPENAI_ENDPOINT=server.url, AZURE_OPENAI_API_KEY="mock", PAGE_STUB_URL=stub.url,
+            LLM_CACHE_PATH=str(tmp_path / "llm.sqlite"), HTTP_CACHE_PATH=str(tmp_path / "http.sqlite"),
+            HTTP_POLITENESS_DELAY=0, PARSE_WORKERS=0,
+        )
+        results = run_script(script.STRATEGY, str(input_csv), str(output_csv), settings,
+                             description="test", argv=[])
+        assert server.stats()["requests"] == 2
+
+    written = pd.read_csv(output_csv)
+    assert list(written["Dataset Name"]) == ["UCMR5", "NMED"]
+    assert len(results) == 2
+    assert written["F-Score"].notna().all()
+    assert (tmp_path / "out.few-shot-cot.checkpoint.jsonl").exists()
@@ -0,0 +1,51 @@
+import pytest
+
+from fair_eval.snippet import GAP, MAX_SENTENCE_CHARS, SnippetSelector, select_snippet
+from fair_eval.tokens import count_tokens
+
+FILLER = [f"Filler sentence number {i} talks about the weather in town." for i in range(200)]
+LICENSE = "All files are released under the CC-BY 4.0 license with a DOI for citation."
+ACCESS = "A REST API gives access to the same data."
+
+
+def test_short_text_is_kept_whole():
+    text = "UCMR 5 occurrence data. Released under CC0."
+    assert select_snippet(text, 500)[0] == text
+
+
+@pytest.mark.parametrize("budget", [20, 60, 200])
+def test_snippet_fits_the_budget(budget):
+    snippet, tokens = select_snippet(" ".join(FILLER[:100] + [LICENSE] + FILLER[100:]), budget)
+    assert tokens == count_tokens(snippet)
+    assert tokens <= budget
+
+
+def test_cue_sentences_beat_filler():
+    text = " ".join(FILLER[:150] + [ACCESS] + FILLER[150:] + [LICENSE])
+    snippet, _ = select_snippet(text, 120)
+    assert snippet.startswith(FILLER[0])  # leading context
+    assert LICENSE in snippet and ACCESS in snippet
+    assert GAP in snippet
+    # Page order is kept
+    assert snippet.index(ACCESS) < snippet.index(LICENSE)
+
+
+def test_richer_cue_sentences_win_when_space_is_short():
+    weak = [f"Data source {i} is listed below." for i in range(40)]
+    text = " ".join(FILLER[:20] + weak + [LICENSE])
+    snippet, _ = select_snippet(text, 60)
+    assert LICENSE in snippet  # license + identifier + provenance cues
+
+
+def test_feeding_in_pieces_matches_one_feed():
+    text = " ".join(FILLER[:80] + [LICENSE] + FILLER[80:120] + [ACCESS])
+    selector = SnippetSelector(100)
+    for start in range(0, len(text), 37):
+        selector.feed(text[start:start + 37])
+    assert selector.finish() == select_snippet(text, 100)
+
+
+def test_long_runs_without_punctuation_are_cut():
+    snippet, tokens = select_snippet("x" * 5000, 250)
+    assert 0 < tokens <= 250
+    assert all(len(piece) <= MAX_SENTENCE_CHARS for piece in snippet.split())
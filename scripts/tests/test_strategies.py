@@ -0,0 +1,38 @@
+import pytest
+
+from fair_eval.strategies import DEFAULT_LAYOUT, SCORING_RULES, STRATEGIES, get_strategy
+
+SCRAPED = {
+    "title": "UCMR 5 Data", "description": "Occurrence data", "license_info": "public domain",
+    "identifier_info": "DOI", "file_formats": ["CSV"], "download_links": ["data/ucmr5.zip"],
+    "raw_text_snippet": "UCMR 5 occurrence data.",
+}
+
+
+def test_inline_is_the_default_layout():
+    assert DEFAULT_LAYOUT == "inline"
+
+
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_inline_keeps_the_rubric_in_the_user_message(name):
+    strategy = get_strategy(name)
+    request = strategy.request("gpt-4o", "UCMR5", "https://www.epa.gov/dwucmr", SCRAPED)
+    assert request == strategy.request("gpt-4o", "UCMR5", "https://www.epa.gov/dwucmr", SCRAPED, layout="inline")
+    system, user = request["messages"]
+    assert system["content"] != strategy.static_prefix
+    assert SCORING_RULES.strip() in user["content"]
+    assert "UCMR5" in user["content"]
+
+
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_prefix_layout_shares_one_static_system_message(name):
+    strategy = get_strategy(name)
+    first = strategy.request("gpt-4o", "UCMR5", "https://www.epa.gov/dwucmr", SCRAPED, layout="prefix")
+    second = strategy.request("gpt-4o", "NMED", "https://www.env.nm.gov", SCRAPED, layout="prefix")
+    assert first["messages"][0] == second["messages"][0] == {"role": "system", "content": strategy.static_prefix}
+    assert 'Dataset: "UCMR5"' in first["messages"][-1]["content"]
+
+
+def test_unknown_layout_is_rejected():
+    with pytest.raises(ValueError):
+        get_strategy("few-shot-cot").request("gpt-4o", "UCMR5", "https://www.epa.gov/dwucmr", SCRAPED, layout="json")
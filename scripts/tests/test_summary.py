@@ -0,0 +1,60 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from fair_eval.summary import score_table, summarize  # noqa: E402
+
+
+def run_rows(name, link, scores, runs):
+    return [
+        {"Strategy": "few-shot-cot", "Model": "gpt-4o", "Dataset Name": name, "Website Link": link,
+         "F-Score": f, "A-Score": a, "I-Score": i, "R-Score": r}
+        for f, a, i, r in [scores] * runs
+    ]
+
+
+def test_datasets_sharing_a_name_are_told_apart_by_link():
+    # Two different NMED datasets, each scored identically in both runs
+    df = pd.DataFrame(
+        run_rows("NMED", "https://www.env.nm.gov/a", (12, 8, 5, 6), 2)
+        + run_rows("NMED", "https://www.env.nm.gov/b", (3, 2, 1, 1), 2)
+    )
+    summary = summarize(df)
+    assert summary.loc[0, "repeated_datasets"] == 2
+    assert summary.loc[0, "agreement"] == 1.0
+    assert summary.loc[0, "F-Score run std"] == 0.0
+
+
+def test_disagreeing_runs_lower_agreement():
+    df = pd.DataFrame(
+        run_rows("UCMR5", "https://www.epa.gov/ucmr5", (12, 8, 5, 6), 1)
+        + run_rows("UCMR5", "https://www.epa.gov/ucmr5", (13, 8, 5, 6), 1)
+        + run_rows("NMED", "https://www.env.nm.gov/a", (3, 2, 1, 1), 2)
+    )
+    summary = summarize(df)
+    assert summary.loc[0, "rows"] == 4
+    assert summary.loc[0, "agreement"] == 0.5
+
+
+def test_out_of_range_and_unparsed_scores_are_invalid():
+    df = pd.DataFrame(
+        run_rows("UCMR5", "https://www.epa.gov/ucmr5", (17, 10, 8, 7), 1)
+        + run_rows("NMED", "https://www.env.nm.gov/a", (99, 8, 5, 6), 1)
+        + run_rows("UCMR3", "https://www.epa.gov/ucmr3", ("not parsed", 8, 5, 6), 1)
+    )
+    table = score_table(df)
+    assert list(table["All Valid"]) == [True, False, False]
+    assert table.loc[0, "FAIR %"] == 100.0
+    assert table["Total Score"].isna().tolist() == [False, True, True]
+    summary = summarize(df)
+    assert summary.loc[0, "valid_rate"] == pytest.approx(1 / 3)
+    assert summary.loc[0, "Total Score mean"] == 42.0
+
+
+def test_groups_per_strategy_and_model():
+    rows = run_rows("UCMR5", "https://www.epa.gov/ucmr5", (12, 8, 5, 6), 2)
+    rows[1] = {**rows[1], "Strategy": "zero-shot-cot", "F-Score": 10}
+    summary = summarize(pd.DataFrame(rows))
+    assert list(summary["Strategy"]) == ["few-shot-cot", "zero-shot-cot"]
+    assert list(summary["F-Score mean"]) == [12.0, 10.0]
+    assert "agreement" not in summary.columns  # no dataset was scored twice within a group